@@ -0,0 +1,283 @@
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+import calendar
+
+import numpy as np
+
+from bitmap import HabitLogBitmap
+
+# Windows (in days) of the rolling completion rates
+ROLLING_WINDOWS = (7, 30, 90)
+
+def completion_matrix(completed_dates: Mapping[int, Iterable[date]], start_date: date,
+                      end_date: date) -> Tuple[List[int], np.ndarray]:
+    """
+    Build a dense habits x days completion matrix from completed days.
+    
+    Args:
+        completed_dates (Mapping[int, Iterable[date]]): {habit_id: [completed day, ...]}
+        start_date (date): First day (column 0)
+        end_date (date): Last day
+    
+    Returns:
+        Tuple[List[int], np.ndarray]: Habit IDs in row order and a uint8 matrix
+        with 1 for completed days
+    """
+    habit_ids = list(completed_dates)
+    days = (end_date - start_date).days + 1
+    matrix = np.zeros((len(habit_ids), days), dtype=np.uint8)
+    start = start_date.toordinal()
+    for row, habit_id in enumerate(habit_ids):
+        offsets = np.fromiter((day.toordinal() - start for day in completed_dates[habit_id]), dtype=np.int64)
+        offsets = offsets[(offsets >= 0) & (offsets < days)]
+        matrix[row, offsets] = 1
+    return habit_ids, matrix
+
+def matrix_from_bitmaps(bitmaps: Dict[int, HabitLogBitmap], start_date: date,
+                        end_date: date) -> Tuple[List[int], np.ndarray]:
+    """
+    Build a dense habits x days completion matrix from resident bitmaps.
+    
+    The bit storage is unpacked with np.unpackbits, so no per-day Python work is done.
+    
+    Args:
+        bitmaps (Dict[int, HabitLogBitmap]): {habit_id: bitmap}
+        start_date (date): First day (column 0)
+        end_date (date): Last day
+    
+    Returns:
+        Tuple[List[int], np.ndarray]: Habit IDs in row order and a uint8 matrix
+    """
+    habit_ids = list(bitmaps)
+    days = (end_date - start_date).days + 1
+    matrix = np.zeros((len(habit_ids), days), dtype=np.uint8)
+    start = start_date.toordinal()
+    for row, habit_id in enumerate(habit_ids):
+        bitmap = bitmaps[habit_id]
+        bits = np.unpackbits(np.frombuffer(bytes(bitmap.bits), dtype=np.uint8), bitorder='little')
+        # Column c of the matrix is bit (start - origin + c) of the bitmap
+        shift = start - bitmap.origin_ordinal
+        first_column = max(-shift, 0)
+        first_bit = shift + first_column
+        count = min(days - first_column, len(bits) - first_bit)
+        if count > 0:
+            matrix[row, first_column:first_column + count] = bits[first_bit:first_bit + count]
+    return habit_ids, matrix
+
+def active_mask(start_date: date, days: int, habit_starts: Optional[List[date]] = None,
+                rows: int = 0) -> np.ndarray:
+    """
+    Mark the days each habit existed, so rates are not diluted before creation.
+    
+    Args:
+        start_date (date): First day (column 0)
+        days (int): Number of columns
+        habit_starts (List[date], optional): First tracked day per row; all days count if omitted
+        rows (int): Number of rows when habit_starts is omitted
+    
+    Returns:
+        np.ndarray: Boolean rows x days matrix
+    """
+    if habit_starts is None:
+        return np.ones((rows, days), dtype=bool)
+    offsets = np.array([day.toordinal() - start_date.toordinal() for day in habit_starts], dtype=np.int64)
+    return np.arange(days)[np.newaxis, :] >= offsets[:, np.newaxis]
+
+def _rates(completed: np.ndarray, active: np.ndarray) -> np.ndarray:
+    """Completion percentage per cell, 0 where nothing was active."""
+    completed = completed.astype(np.float64)
+    active = active.astype(np.float64)
+    return np.divide(completed * 100.0, active, out=np.zeros_like(completed), where=active > 0)
+
+def rolling_rates(matrix: np.ndarray, active: np.ndarray, window: int) -> np.ndarray:
+    """
+    Rolling completion rate ending on every day.
+    
+    Args:
+        matrix (np.ndarray): habits x days completion matrix
+        active (np.ndarray): habits x days active mask
+        window (int): Window length in days
+    
+    Returns:
+        np.ndarray: habits x days percentages; early days use the available history
+    """
+    pad = np.zeros((matrix.shape[0], 1), dtype=np.int64)
+    completed = np.concatenate([pad, np.cumsum(matrix, axis=1, dtype=np.int64)], axis=1)
+    counted = np.concatenate([pad, np.cumsum(active, axis=1, dtype=np.int64)], axis=1)
+    lower = np.maximum(np.arange(1, matrix.shape[1] + 1) - window, 0)
+    upper = np.arange(1, matrix.shape[1] + 1)
+    return _rates(completed[:, upper] - completed[:, lower], counted[:, upper] - counted[:, lower])
+
+def weekday_distribution(matrix: np.ndarray, active: np.ndarray, start_date: date) -> np.ndarray:
+    """
+    Completion rate per weekday.
+    
+    Args:
+        matrix (np.ndarray): habits x days completion matrix
+        active (np.ndarray): habits x days active mask
+        start_date (date): Day of column 0
+    
+    Returns:
+        np.ndarray: habits x 7 percentages, Monday first
+    """
+    weekdays = (start_date.weekday() + np.arange(matrix.shape[1])) % 7
+    one_hot = (weekdays[:, np.newaxis] == np.arange(7)[np.newaxis, :]).astype(np.int64)
+    return _rates(matrix.astype(np.int64) @ one_hot, active.astype(np.int64) @ one_hot)
+
+def month_starts(start_date: date, days: int) -> Tuple[List[Tuple[int, int]], np.ndarray]:
+    """
+    Find the column where every month in the range begins.
+    
+    Returns:
+        Tuple[List[Tuple[int, int]], np.ndarray]: (year, month) labels and start columns
+    """
+    labels = [(start_date.year, start_date.month)]
+    columns = [0]
+    year, month = start_date.year, start_date.month
+    while True:
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        column = (date(year, month, 1) - start_date).days
+        if column >= days:
+            break
+        labels.append((year, month))
+        columns.append(column)
+    return labels, np.array(columns, dtype=np.int64)
+
+def monthly_rates(matrix: np.ndarray, active: np.ndarray,
+                  start_date: date) -> Tuple[List[Tuple[int, int]], np.ndarray]:
+    """
+    Completion rate per calendar month.
+    
+    Returns:
+        Tuple[List[Tuple[int, int]], np.ndarray]: (year, month) labels and habits x months percentages
+    """
+    labels, columns = month_starts(start_date, matrix.shape[1])
+    completed = np.add.reduceat(matrix.astype(np.int64), columns, axis=1)
+    counted = np.add.reduceat(active.astype(np.int64), columns, axis=1)
+    return labels, _rates(completed, counted)
+
+def consistency_scores(matrix: np.ndarray, active: np.ndarray) -> np.ndarray:
+    """
+    Score how evenly completions are spread over time, from 0 to 100.
+    
+    The score is the mean weekly completion rate scaled down by the spread
+    of weekly rates: steady 60% weeks score higher than alternating 100%
+    and 20% weeks with the same average.
+    
+    Returns:
+        np.ndarray: One score per habit
+    """
+    columns = np.arange(0, matrix.shape[1], 7)
+    completed = np.add.reduceat(matrix.astype(np.int64), columns, axis=1)
+    counted = np.add.reduceat(active.astype(np.int64), columns, axis=1)
+    weekly = np.divide(completed, counted, out=np.full(completed.shape, np.nan), where=counted > 0)
+    scores = np.zeros(matrix.shape[0])
+    has_weeks = (counted > 0).any(axis=1)
+    if has_weeks.any():
+        mean = np.nanmean(weekly[has_weeks], axis=1)
+        spread = np.nanstd(weekly[has_weeks], axis=1)
+        # The std of rates in [0, 1] is at most 0.5
+        scores[has_weeks] = mean * (1.0 - 2.0 * spread) * 100.0
+    return np.clip(scores, 0.0, 100.0)
+
+def compute_analytics(habit_ids: List[int], matrix: np.ndarray, start_date: date,
+                      habit_starts: Optional[List[date]] = None) -> Dict[int, Dict[str, Any]]:
+    """
+    Compute every statistic for every habit in one vectorized pass.
+    
+    Args:
+        habit_ids (List[int]): Habit IDs in row order
+        matrix (np.ndarray): habits x days completion matrix
+        start_date (date): Day of column 0
+        habit_starts (List[date], optional): First tracked day per habit
+    
+    Returns:
+        Dict[int, Dict]: {habit_id: statistics} with plain Python values:
+        completion_rate, rolling_7/30/90 (rate over the last N days),
+        weekday_rates (Monday first), monthly ({'month', 'percentage', 'delta'}
+        per month) and consistency
+    """
+    days = matrix.shape[1]
+    if days == 0:
+        return {habit_id: {} for habit_id in habit_ids}
+    active = active_mask(start_date, days, habit_starts, len(habit_ids))
+    # Days completed before the recorded start still count as tracked
+    active |= np.maximum.accumulate(matrix, axis=1).astype(bool)
+    
+    overall = _rates(matrix.sum(axis=1), active.sum(axis=1))
+    rolling = {window: rolling_rates(matrix, active, window)[:, -1] for window in ROLLING_WINDOWS}
+    weekday = weekday_distribution(matrix, active, start_date)
+    labels, monthly = monthly_rates(matrix, active, start_date)
+    deltas = np.diff(monthly, axis=1, prepend=monthly[:, :1])
+    consistency = consistency_scores(matrix, active)
+    
+    analytics = {}
+    for row, habit_id in enumerate(habit_ids):
+        statistics: Dict[str, Any] = {
+            'completion_rate': round(float(overall[row]), 1),
+            'weekday_rates': [round(float(rate), 1) for rate in weekday[row]],
+            'monthly': [{
+                'month': f"{calendar.month_abbr[month]} {year}",
+                'percentage': round(float(monthly[row, col]), 1),
+                'delta': round(float(deltas[row, col]), 1)
+            } for col, (year, month) in enumerate(labels)],
+            'consistency': round(float(consistency[row]), 1)
+        }
+        for window in ROLLING_WINDOWS:
+            statistics[f'rolling_{window}'] = round(float(rolling[window][row]), 1)
+        analytics[habit_id] = statistics
+    return analytics
+
+def correlation_matrix(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pairwise Pearson correlation and co-occurrence of habits.
+    
+    Both come from a single matrix product over the centred (or raw)
+    completion matrix, so the cost is one BLAS call rather than a Python
+    loop over pairs.
+    
+    Args:
+        matrix (np.ndarray): habits x days completion matrix
+    
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: habits x habits correlation (0 where a
+        habit never or always completed) and co-occurrence counts (days both
+        habits were completed)
+    """
+    values = matrix.astype(np.float64)
+    cooccurrence = (values @ values.T).astype(np.int64)
+    if matrix.shape[1] == 0:
+        return np.zeros((matrix.shape[0], matrix.shape[0])), cooccurrence
+    
+    centred = values - values.mean(axis=1, keepdims=True)
+    covariance = centred @ centred.T
+    spread = np.sqrt(np.diag(covariance))
+    scale = np.outer(spread, spread)
+    correlation = np.divide(covariance, scale, out=np.zeros_like(covariance), where=scale > 0)
+    np.clip(correlation, -1.0, 1.0, out=correlation)
+    return correlation, cooccurrence
+
+def top_pairs(correlation: np.ndarray, k: int = 10) -> List[Tuple[int, int, float]]:
+    """
+    Find the k most positively correlated pairs of distinct habits.
+    
+    Args:
+        correlation (np.ndarray): habits x habits correlation matrix
+        k (int): Number of pairs
+    
+    Returns:
+        List[Tuple[int, int, float]]: (row, column, correlation), strongest first
+    """
+    rows, columns = np.triu_indices(correlation.shape[0], 1)
+    if k <= 0 or rows.size == 0:
+        return []
+    values = correlation[rows, columns]
+    k = min(k, values.size)
+    best = np.argpartition(-values, k - 1)[:k]
+    best = best[np.argsort(-values[best], kind='stable')]
+    return [(int(rows[i]), int(columns[i]), float(values[i])) for i in best]
+
+def analytics_window(days: int, end_date: Optional[date] = None) -> Tuple[date, date]:
+    """Return the (start, end) dates of a window of days ending today or at end_date."""
+    end_date = end_date or date.today()
+    return end_date - timedelta(days=days - 1), end_date
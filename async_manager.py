@@ -0,0 +1,128 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+import logging
+import queue
+
+from habit_manager import HabitManager
+
+logger = logging.getLogger(__name__)
+
+# Result polling interval while requests are outstanding (~60 fps)
+POLL_INTERVAL_MS = 16
+
+class AsyncHabitManager:
+    """Executor-backed front end to HabitManager for the Tk GUI.
+    
+    Every call runs on a single worker thread, which keeps the database
+    connection and the HabitManager caches single-threaded, and returns a
+    Future. Callbacks are invoked on the Tk thread by a root.after() poll that
+    only runs while requests are outstanding. A request made on a channel
+    supersedes earlier requests on the same channel; their results are dropped.
+    """
+    
+    def __init__(self, root: Any, habit_manager: HabitManager,
+                 poll_interval_ms: int = POLL_INTERVAL_MS):
+        """
+        Initialize the async layer.
+        
+        Args:
+            root: Tk root used to deliver results on the Tk thread
+            habit_manager (HabitManager): Manager whose methods are run in the background
+            poll_interval_ms (int): Result polling interval in milliseconds
+        """
+        self.root = root
+        self.habit_manager = habit_manager
+        self.poll_interval_ms = poll_interval_ms
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="habit-db")
+        self._done: "queue.Queue[Tuple[Future, Optional[str], int, Optional[Callable], Optional[Callable]]]" = queue.Queue()
+        self._latest: Dict[str, int] = {}  # {channel: token of the newest request}
+        self._outstanding = 0
+        self._polling = False
+    
+    def submit(self, fn: Callable, *args: Any, on_success: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               channel: Optional[str] = None) -> Future:
+        """
+        Run a callable on the worker thread.
+        
+        Must be called from the Tk thread.
+        
+        Args:
+            fn (Callable): Function to run in the background
+            *args: Positional arguments for fn
+            on_success (Callable, optional): Called on the Tk thread with the result
+            on_error (Callable, optional): Called on the Tk thread with the exception
+            channel (str, optional): Requests on the same channel supersede each other
+        
+        Returns:
+            Future: Future for the result
+        """
+        token = 0
+        if channel is not None:
+            token = self._latest.get(channel, 0) + 1
+            self._latest[channel] = token
+        
+        future = self.executor.submit(fn, *args)
+        self._outstanding += 1
+        future.add_done_callback(
+            lambda f: self._done.put((f, channel, token, on_success, on_error)))
+        
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_interval_ms, self._deliver)
+        return future
+    
+    def call(self, method: str, *args: Any, **callbacks: Any) -> Future:
+        """
+        Run a HabitManager method on the worker thread.
+        
+        Args:
+            method (str): HabitManager method name
+            *args: Positional arguments for the method
+            **callbacks: on_success, on_error and channel, as for submit()
+        
+        Returns:
+            Future: Future for the result
+        """
+        return self.submit(getattr(self.habit_manager, method), *args, **callbacks)
+    
+    def dispatch(self, fn: Callable, *args: Any) -> None:
+        """Run a callable on the worker thread from any thread, ignoring its result."""
+        self.executor.submit(fn, *args)
+    
+    def cancel(self, channel: str) -> None:
+        """Drop the results of every outstanding request on a channel."""
+        self._latest[channel] = self._latest.get(channel, 0) + 1
+    
+    def run_sync(self, fn: Callable, *args: Any, timeout: Optional[float] = None) -> Any:
+        """Run a callable on the worker thread and wait for its result."""
+        return self.executor.submit(fn, *args).result(timeout)
+    
+    def shutdown(self) -> None:
+        """Wait for queued work to finish and stop the worker thread."""
+        self.executor.shutdown(wait=True)
+    
+    def _deliver(self) -> None:
+        """Tk thread: invoke callbacks of finished requests."""
+        while True:
+            try:
+                future, channel, token, on_success, on_error = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._outstanding -= 1
+            if channel is not None and self._latest.get(channel) != token:
+                continue  # Superseded by a newer request on the same channel
+            
+            error = future.exception()
+            if error is not None:
+                if on_error is not None:
+                    on_error(error)
+                else:
+                    logger.error(f"Background database call failed: {error}")
+            elif on_success is not None:
+                on_success(future.result())
+        
+        if self._outstanding > 0:
+            self.root.after(self.poll_interval_ms, self._deliver)
+        else:
+            self._polling = False
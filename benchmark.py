@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the habit tracker.
+
+Synthetic accounts are generated in a temporary SQLite database and the
+HabitManager operations behind the calendar and charts are timed against
+them. Results are written as JSON with sorted keys, so two runs (e.g. before
+and after a change) can be diffed or compared with --compare.
+
+Usage:
+    python benchmark.py                                  # 10/100/1,000 habits x 1/5/10 years
+    python benchmark.py --habits 100 --years 5 --density 0.3 --output after.json
+    python benchmark.py --habits 100 --years 5 --compare before.json
+    python benchmark.py --startup-only                   # only check the startup budget
+
+Every run also times a cold start of the application in fresh interpreters
+and exits non-zero when it exceeds the startup budget or loads the charting
+stack before the charts tab is opened.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import argparse
+import calendar
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+from habit_manager import HabitManager
+from storage import StorageBackend, create_storage
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of the JSON output changes
+RESULT_FORMAT = 1
+
+DEFAULT_HABITS = [10, 100, 1000]
+DEFAULT_YEARS = [1, 5, 10]
+DEFAULT_DENSITY = 0.5
+
+# Entries per write_completion_batches() call while generating an account
+GENERATE_BATCH_ROWS = 50000
+
+# Cold start: dependency check plus importing the GUI, before the window is created
+STARTUP_BUDGET_MS = 250.0
+STARTUP_RUNS = 5
+# Modules that must not be imported until the charts tab or analytics need them
+STARTUP_DEFERRED_MODULES = ['matplotlib', 'numpy']
+STARTUP_SCRIPT = '''
+import json, sys, time
+started = time.perf_counter()
+import main
+main.check_dependencies()
+import gui
+elapsed = time.perf_counter() - started
+print(json.dumps({'seconds': elapsed, 'modules': sorted(sys.modules)}))
+'''
+
+def generate_account(db_manager: StorageBackend, habits: int, years: int, density: float,
+                     seed: int = 0, end_date: Optional[date] = None) -> Tuple[List[int], int]:
+    """
+    Fill the database with a synthetic account.
+    
+    Every habit is completed on each day of the history with probability
+    density; the same seed always produces the same account.
+    
+    Args:
+        db_manager (StorageBackend): Connected, empty storage backend
+        habits (int): Number of habits
+        years (int): Length of the history, ending at end_date
+        density (float): Probability that a habit is completed on a day (0-1)
+        seed (int): Random seed
+        end_date (date, optional): Last day of the history (default: today)
+    
+    Returns:
+        Tuple[List[int], int]: Habit IDs and number of completed days written
+    
+    Raises:
+        RuntimeError: If the account could not be written
+    """
+    rng = random.Random(seed)
+    end_date = end_date or date.today()
+    start_date = end_date - timedelta(days=365 * years - 1)
+    days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    
+    names = [f"Habit {index:04d}" for index in range(habits)]
+    ids, _ = db_manager.ensure_habits(names)
+    if len(ids) != habits:
+        raise RuntimeError("Could not create the benchmark habits")
+    habit_ids = [ids[name] for name in names]
+    
+    rows = 0
+    batch: List[Tuple[int, date, bool]] = []
+    for habit_id in habit_ids:
+        batch.extend((habit_id, day, True) for day in days if rng.random() < density)
+        if len(batch) >= GENERATE_BATCH_ROWS:
+            if not db_manager.write_completion_batches([batch]):
+                raise RuntimeError("Could not write the benchmark logs")
+            rows += len(batch)
+            batch = []
+    if batch:
+        if not db_manager.write_completion_batches([batch]):
+            raise RuntimeError("Could not write the benchmark logs")
+        rows += len(batch)
+    return habit_ids, rows
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    """Reduce timings in seconds to milliseconds statistics."""
+    ordered = sorted(samples)
+    count = len(ordered)
+    return {
+        'runs': count,
+        'min_ms': round(ordered[0] * 1000, 4),
+        'median_ms': round(ordered[count // 2] * 1000, 4),
+        'mean_ms': round(sum(ordered) / count * 1000, 4),
+        'p95_ms': round(ordered[min(count - 1, int(count * 0.95))] * 1000, 4),
+        'max_ms': round(ordered[-1] * 1000, 4)
+    }
+
+def measure(operation: Callable[[], Any], repeat: int,
+            setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """
+    Time an operation repeatedly; setup runs untimed before every run.
+    
+    Args:
+        operation (Callable): Operation to time
+        repeat (int): Number of timed runs
+        setup (Callable, optional): Untimed preparation, e.g. clearing caches
+    
+    Returns:
+        Dict: Statistics from summarize()
+    """
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+def benchmark_calendar_render(habits: List[Dict[str, Any]], month_data: Dict[int, Dict[int, bool]],
+                              days_in_month: int, repeat: int) -> Dict[str, Any]:
+    """
+    Time drawing a month on the canvas calendar, including Tk's idle redraw.
+    
+    Returns:
+        Dict: Statistics from summarize(), or {'skipped': reason} without a display
+    """
+    try:
+        import tkinter as tk
+        from calendar_grid import CalendarCanvas
+        root = tk.Tk()
+    except Exception as e:  # No tkinter or no display
+        return {'skipped': str(e)}
+    
+    try:
+        root.geometry("1400x900")
+        grid = CalendarCanvas(root, on_toggle=lambda habit_id, day: None)
+        grid.pack(fill=tk.BOTH, expand=True)
+        root.update()
+        
+        def render():
+            grid.set_data(habits, days_in_month, month_data)
+            root.update_idletasks()
+        
+        return measure(render, repeat)
+    finally:
+        root.destroy()
+
+def run_scenario(habits: int, years: int, density: float, repeat: int, seed: int,
+                 directory: str) -> Dict[str, Any]:
+    """
+    Generate one account in a fresh SQLite database and time every operation.
+    
+    Args:
+        habits (int): Number of habits
+        years (int): Years of history
+        density (float): Completion probability per habit and day
+        repeat (int): Timed runs per operation
+        seed (int): Random seed for the account and the probed habits/days
+        directory (str): Directory for the database file
+    
+    Returns:
+        Dict: Scenario parameters, dataset size and per-operation statistics
+    """
+    name = f"h{habits}_y{years}_d{density:g}"
+    path = os.path.join(directory, f"{name}.db")
+    db_manager = create_storage({'backend': 'sqlite', 'sqlite_path': path})
+    if not db_manager.connect():
+        raise RuntimeError(f"Could not open {path}")
+    
+    try:
+        started = time.perf_counter()
+        habit_ids, rows = generate_account(db_manager, habits, years, density, seed)
+        generate_seconds = time.perf_counter() - started
+        
+        habit_manager = HabitManager(db_manager)
+        all_habits = habit_manager.get_habits()
+        today = date.today()
+        year, month = today.year, today.month
+        days_in_month = calendar.monthrange(year, month)[1]
+        
+        # Probe habits and days come from their own generator so every
+        # commit measures exactly the same calls
+        rng = random.Random(seed + 1)
+        probes = [(rng.choice(habit_ids), today - timedelta(days=rng.randrange(365 * years)))
+                  for _ in range(repeat)]
+        probe_iter = iter(probes * 3)
+        
+        def next_habit() -> int:
+            return next(probe_iter)[0]
+        
+        operations: Dict[str, Any] = {}
+        operations['get_all_habits'] = measure(habit_manager.get_habits, repeat)
+        operations['get_month_data_cold'] = measure(
+            lambda: habit_manager.get_month_data(year, month, all_habits), repeat,
+            setup=habit_manager.clear_cache)
+        operations['get_month_data_warm'] = measure(
+            lambda: habit_manager.get_month_data(year, month, all_habits), repeat)
+        
+        toggle_probes = iter(probes)
+        
+        def toggle_twice() -> None:
+            # Two toggles leave the account unchanged for the next operation
+            habit_id, day = next(toggle_probes)
+            habit_manager.toggle_habit_completion(habit_id, day)
+            habit_manager.toggle_habit_completion(habit_id, day)
+        
+        operations['toggle_habit_completion_x2'] = measure(toggle_twice, repeat)
+        
+        operations['get_habit_chart_data_cold'] = measure(
+            lambda: habit_manager.get_habit_chart_data(next_habit(), 12), repeat,
+            setup=habit_manager.clear_cache)
+        operations['get_habit_statistics_cold'] = measure(
+            lambda: habit_manager.get_habit_statistics(next_habit(), year, month), repeat,
+            setup=habit_manager.clear_cache)
+        
+        # Resident history, as loaded by the GUI once the habits are known
+        operations['load_log_bitmaps'] = measure(
+            lambda: habit_manager.load_log_bitmaps(all_habits), repeat, setup=habit_manager.clear_cache)
+        
+        def drop_derived_data() -> None:
+            # Keeps the bitmaps but nothing computed from them
+            habit_manager.month_cache.clear()
+            habit_manager.streak_index.clear()
+        
+        operations['get_month_data_resident'] = measure(
+            lambda: habit_manager.get_month_data(year, month, all_habits), repeat, setup=drop_derived_data)
+        operations['get_habit_statistics_resident'] = measure(
+            lambda: habit_manager.get_habit_statistics(next_habit(), year, month), repeat,
+            setup=drop_derived_data)
+        
+        month_data = habit_manager.get_month_data(year, month, all_habits)
+        operations['render_calendar_canvas'] = benchmark_calendar_render(
+            all_habits, month_data, days_in_month, repeat)
+        
+        return {
+            'name': name,
+            'habits': habits,
+            'years': years,
+            'density': density,
+            'log_rows': rows,
+            'generate_seconds': round(generate_seconds, 3),
+            'operations': operations
+        }
+    finally:
+        db_manager.close_connection()
+
+def measure_startup(runs: int = STARTUP_RUNS, budget_ms: float = STARTUP_BUDGET_MS) -> Dict[str, Any]:
+    """
+    Time the application's cold start in fresh interpreters.
+    
+    Args:
+        runs (int): Number of interpreters started
+        budget_ms (float): Allowed median startup time
+    
+    Returns:
+        Dict: Statistics from summarize() plus budget_ms, deferred_loaded (deferred
+        modules that were imported anyway) and within_budget
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    samples = []
+    loaded: Set[str] = set()
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT], capture_output=True,
+                                text=True, check=True, cwd=directory)
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        samples.append(result['seconds'])
+        loaded.update(module for module in STARTUP_DEFERRED_MODULES if module in result['modules'])
+    
+    stats = summarize(samples)
+    stats['budget_ms'] = budget_ms
+    stats['deferred_loaded'] = sorted(loaded)
+    stats['within_budget'] = stats['median_ms'] <= budget_ms and not loaded
+    return stats
+
+def git_commit() -> Optional[str]:
+    """Return the current commit hash, or None outside a git checkout."""
+    try:
+        output = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        return output.stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(habit_counts: List[int], year_counts: List[int], density: float = DEFAULT_DENSITY,
+                   repeat: int = 20, seed: int = 0,
+                   startup_budget_ms: float = STARTUP_BUDGET_MS) -> Dict[str, Any]:
+    """
+    Run every habits x years scenario.
+    
+    Args:
+        habit_counts (List[int]): Numbers of habits
+        year_counts (List[int]): Years of history
+        density (float): Completion probability per habit and day
+        repeat (int): Timed runs per operation
+        seed (int): Random seed
+        startup_budget_ms (float): Allowed median cold start time
+    
+    Returns:
+        Dict: {'format', 'environment', 'parameters', 'startup', 'scenarios'}
+    """
+    logger.info("Measuring cold start")
+    startup = measure_startup(budget_ms=startup_budget_ms)
+    
+    scenarios = []
+    with tempfile.TemporaryDirectory(prefix='habit-benchmark-') as directory:
+        for habits in habit_counts:
+            for years in year_counts:
+                logger.info(f"Benchmarking {habits} habits x {years} years")
+                scenarios.append(run_scenario(habits, years, density, repeat, seed, directory))
+    
+    return {
+        'format': RESULT_FORMAT,
+        'environment': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sqlite': sqlite3.sqlite_version
+        },
+        'parameters': {'density': density, 'repeat': repeat, 'seed': seed},
+        'startup': startup,
+        'scenarios': scenarios
+    }
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    tolerance: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    Compare median timings of two benchmark results.
+    
+    Args:
+        baseline (Dict): Earlier result
+        current (Dict): New result
+        tolerance (float): Relative slowdown reported as a regression
+    
+    Returns:
+        List[Dict]: One dict per operation present in both: scenario,
+        operation, baseline_ms, current_ms, ratio and regression
+    """
+    previous = {scenario['name']: scenario['operations'] for scenario in baseline.get('scenarios', [])}
+    rows = []
+    for scenario in current.get('scenarios', []):
+        for operation, stats in sorted(scenario['operations'].items()):
+            old = previous.get(scenario['name'], {}).get(operation)
+            if not old or 'median_ms' not in old or 'median_ms' not in stats:
+                continue
+            ratio = stats['median_ms'] / old['median_ms'] if old['median_ms'] else 1.0
+            rows.append({
+                'scenario': scenario['name'],
+                'operation': operation,
+                'baseline_ms': old['median_ms'],
+                'current_ms': stats['median_ms'],
+                'ratio': round(ratio, 3),
+                'regression': ratio > 1 + tolerance
+            })
+    return rows
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(',') if item.strip()]
+
+def main() -> int:
+    """Run the benchmarks from the command line."""
+    logging.basicConfig(level=logging.WARNING,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logger.setLevel(logging.INFO)
+    parser = argparse.ArgumentParser(description="Habit tracker benchmarks")
+    parser.add_argument('--habits', type=_int_list, default=DEFAULT_HABITS,
+                        help="Comma-separated habit counts (default: 10,100,1000)")
+    parser.add_argument('--years', type=_int_list, default=DEFAULT_YEARS,
+                        help="Comma-separated history lengths in years (default: 1,5,10)")
+    parser.add_argument('--density', type=float, default=DEFAULT_DENSITY,
+                        help="Probability that a habit is completed on a day")
+    parser.add_argument('--repeat', type=int, default=20, help="Timed runs per operation")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the synthetic accounts")
+    parser.add_argument('--output', help="Write the JSON result to this file instead of stdout")
+    parser.add_argument('--compare', metavar='BASELINE', help="Compare medians with an earlier result")
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help="Relative slowdown counted as a regression (default: 0.1)")
+    parser.add_argument('--startup-budget', type=float, default=STARTUP_BUDGET_MS,
+                        help=f"Allowed median cold start in milliseconds (default: {STARTUP_BUDGET_MS:g})")
+    parser.add_argument('--startup-only', action='store_true',
+                        help="Only measure the cold start, skipping the scenarios")
+    args = parser.parse_args()
+    
+    if args.startup_only:
+        args.habits = args.years = []
+    results = run_benchmarks(args.habits, args.years, args.density, max(1, args.repeat), args.seed,
+                             args.startup_budget)
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            handle.write(text + '\n')
+    else:
+        print(text)
+    
+    startup = results['startup']
+    if not startup['within_budget']:
+        print(f"Startup over budget: median {startup['median_ms']:.1f} ms "
+              f"(budget {startup['budget_ms']:g} ms), "
+              f"loaded early: {', '.join(startup['deferred_loaded']) or 'none'}", file=sys.stderr)
+        return 1
+    if not args.compare:
+        return 0
+    with open(args.compare, encoding='utf-8') as handle:
+        baseline = json.load(handle)
+    rows = compare_results(baseline, results, args.tolerance)
+    for row in rows:
+        flag = "SLOWER" if row['regression'] else "ok    "
+        print(f"{flag} {row['scenario']:<18} {row['operation']:<28} "
+              f"{row['baseline_ms']:>10.3f} ms -> {row['current_ms']:>10.3f} ms ({row['ratio']:.2f}x)",
+              file=sys.stderr)
+    return 1 if any(row['regression'] for row in rows) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
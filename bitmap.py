@@ -0,0 +1,156 @@
+from datetime import date, timedelta
+from typing import Iterable, Iterator, Optional
+
+# Number of set bits in every possible byte value, used with bytes.translate()
+POPCOUNT_TABLE = bytes(bin(value).count("1") for value in range(256))
+# Positions of the set bits in every possible byte value
+SET_BITS_TABLE = [tuple(bit for bit in range(8) if value & (1 << bit)) for value in range(256)]
+
+class HabitLogBitmap:
+    """Completion history of one habit stored as one bit per day.
+    
+    Bit i (little bit order within each byte) is day origin + i. The origin is
+    aligned down to a multiple of 8 date ordinals so the bitmap can grow in
+    both directions by whole bytes. Ten years of history take about 460 bytes.
+    """
+    
+    def __init__(self, start: date):
+        """
+        Create an empty bitmap.
+        
+        Args:
+            start (date): First day expected to be stored, usually the habit's created_date
+        """
+        ordinal = start.toordinal()
+        self.origin_ordinal = ordinal - ordinal % 8
+        self.bits = bytearray()
+    
+    @classmethod
+    def from_dates(cls, start: date, completed_dates: Iterable[date]) -> "HabitLogBitmap":
+        """
+        Build a bitmap from completed days.
+        
+        Args:
+            start (date): First day expected to be stored
+            completed_dates (Iterable[date]): Days the habit was completed
+        
+        Returns:
+            HabitLogBitmap: Populated bitmap
+        """
+        completed_dates = list(completed_dates)
+        if completed_dates:
+            start = min(start, min(completed_dates))
+        bitmap = cls(start)
+        if completed_dates:
+            bitmap._grow_to(max(completed_dates).toordinal() - bitmap.origin_ordinal)
+        for completed in completed_dates:
+            offset = completed.toordinal() - bitmap.origin_ordinal
+            bitmap.bits[offset >> 3] |= 1 << (offset & 7)
+        return bitmap
+    
+    @property
+    def origin(self) -> date:
+        """First day covered by the bitmap."""
+        return date.fromordinal(self.origin_ordinal)
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the bit storage."""
+        return len(self.bits)
+    
+    def _grow_to(self, offset: int) -> None:
+        """Extend the storage so that offset (>= 0) is addressable."""
+        needed = (offset >> 3) + 1
+        if needed > len(self.bits):
+            self.bits.extend(bytes(needed - len(self.bits)))
+    
+    def _grow_back_to(self, day: date) -> None:
+        """Move the origin back so that day is addressable."""
+        ordinal = day.toordinal()
+        new_origin = ordinal - ordinal % 8
+        self.bits[0:0] = bytes((self.origin_ordinal - new_origin) >> 3)
+        self.origin_ordinal = new_origin
+    
+    def get(self, day: date) -> bool:
+        """Check whether the habit was completed on a day."""
+        offset = day.toordinal() - self.origin_ordinal
+        if offset < 0 or (offset >> 3) >= len(self.bits):
+            return False
+        return bool(self.bits[offset >> 3] & (1 << (offset & 7)))
+    
+    def set(self, day: date, completed: bool) -> None:
+        """
+        Set the completion status of a day, growing the bitmap if needed.
+        
+        Args:
+            day (date): Day to update
+            completed (bool): New completion status
+        """
+        offset = day.toordinal() - self.origin_ordinal
+        if offset < 0 or (offset >> 3) >= len(self.bits):
+            if not completed:
+                return  # Days outside the bitmap already read as not completed
+            if offset < 0:
+                self._grow_back_to(day)
+                offset = day.toordinal() - self.origin_ordinal
+            self._grow_to(offset)
+        if completed:
+            self.bits[offset >> 3] |= 1 << (offset & 7)
+        else:
+            self.bits[offset >> 3] &= ~(1 << (offset & 7)) & 0xFF
+    
+    def count(self, start_date: date, end_date: date) -> int:
+        """
+        Count completed days in an inclusive date range.
+        
+        Whole bytes are counted with a popcount lookup table; only the two
+        edge bytes are masked.
+        
+        Args:
+            start_date (date): Start date
+            end_date (date): End date
+        
+        Returns:
+            int: Number of completed days
+        """
+        first = max(start_date.toordinal() - self.origin_ordinal, 0)
+        last = min(end_date.toordinal() - self.origin_ordinal, len(self.bits) * 8 - 1)
+        if first > last:
+            return 0
+        
+        first_byte, last_byte = first >> 3, last >> 3
+        first_mask = (0xFF << (first & 7)) & 0xFF
+        last_mask = 0xFF >> (7 - (last & 7))
+        if first_byte == last_byte:
+            return POPCOUNT_TABLE[self.bits[first_byte] & first_mask & last_mask]
+        
+        total = POPCOUNT_TABLE[self.bits[first_byte] & first_mask]
+        total += sum(self.bits[first_byte + 1:last_byte].translate(POPCOUNT_TABLE))
+        total += POPCOUNT_TABLE[self.bits[last_byte] & last_mask]
+        return total
+    
+    def completed_dates(self, start_date: Optional[date] = None,
+                        end_date: Optional[date] = None) -> Iterator[date]:
+        """
+        Iterate over completed days in ascending order.
+        
+        Args:
+            start_date (date, optional): First day to include
+            end_date (date, optional): Last day to include
+        
+        Yields:
+            date: Completed day
+        """
+        first = 0 if start_date is None else max(start_date.toordinal() - self.origin_ordinal, 0)
+        last = len(self.bits) * 8 - 1
+        if end_date is not None:
+            last = min(end_date.toordinal() - self.origin_ordinal, last)
+        origin = self.origin
+        for byte_index in range(first >> 3, (last >> 3) + 1 if last >= first else 0):
+            value = self.bits[byte_index]
+            if not value:
+                continue
+            for bit in SET_BITS_TABLE[value]:
+                offset = (byte_index << 3) + bit
+                if first <= offset <= last:
+                    yield origin + timedelta(days=offset)
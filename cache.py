@@ -0,0 +1,47 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Iterator, Optional, Tuple
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry when full."""
+    
+    def __init__(self, max_entries: int = 24):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries (int): Maximum number of entries kept
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the entry for key and mark it as most recently used."""
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+    
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store an entry, evicting the least recently used one if needed."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """Remove and return the entry for key, if any."""
+        return self._entries.pop(key, None)
+    
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """Iterate over entries without changing their recency."""
+        return iter(list(self._entries.items()))
+    
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._entries.clear()
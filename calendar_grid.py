@@ -0,0 +1,208 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Dict, List, Optional, Tuple, Any
+
+class CalendarCanvas(tk.Frame):
+    """Habits x days calendar grid drawn on a single canvas.
+    
+    Only the rows inside the viewport are drawn, so the number of canvas items
+    stays constant no matter how many habits there are. Clicks are mapped back
+    to (habit_id, day) and handed to the on_toggle callback.
+    """
+    
+    HEADER_HEIGHT = 40
+    ROW_HEIGHT = 45
+    NAME_WIDTH = 150
+    DAY_WIDTH = 35
+    TOTAL_WIDTH = 80
+    BOX_SIZE = 16
+    
+    def __init__(self, parent, on_toggle: Callable[[int, int], None]):
+        """
+        Initialize the canvas calendar.
+        
+        Args:
+            parent: Parent widget
+            on_toggle (Callable): Called with (habit_id, day) when a cell is clicked
+        """
+        super().__init__(parent, bg='white')
+        self.on_toggle = on_toggle
+        self.habits: List[Dict[str, Any]] = []
+        self.days_in_month = 0
+        self.cells: Dict[Tuple[int, int], bool] = {}  # {(habit_id, day): completed}
+        self.totals: Dict[int, int] = {}  # {habit_id: completed days}
+        self.row_index: Dict[int, int] = {}  # {habit_id: row}
+        self.top = 0  # Scroll offset in pixels
+        
+        self.canvas = tk.Canvas(self, bg='white', highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        self.canvas.bind("<Configure>", lambda e: self.render())
+        self.canvas.bind("<Button-1>", self._on_click)
+    
+    def set_data(self, habits: List[Dict[str, Any]], days_in_month: int,
+                 month_data: Dict[int, Dict[int, bool]]) -> None:
+        """
+        Replace the habits, month length and completion data, then redraw.
+        
+        Args:
+            habits (List[Dict]): Habits in display order
+            days_in_month (int): Number of day columns
+            month_data (Dict): {day: {habit_id: completion_status}}
+        """
+        self.habits = list(habits)
+        self.days_in_month = days_in_month
+        self.row_index = {habit['id']: idx for idx, habit in enumerate(self.habits)}
+        self.top = min(self.top, self._max_top())
+        self.set_month_data(month_data)
+    
+    def set_month_data(self, month_data: Dict[int, Dict[int, bool]]) -> None:
+        """Refresh completion data for the current habits and redraw."""
+        self.cells.clear()
+        self.totals = {habit['id']: 0 for habit in self.habits}
+        for day in range(1, self.days_in_month + 1):
+            day_data = month_data.get(day, {})
+            for habit in self.habits:
+                if day_data.get(habit['id'], False):
+                    self.cells[(habit['id'], day)] = True
+                    self.totals[habit['id']] += 1
+        self.render()
+    
+    def get_cell(self, habit_id: int, day: int) -> bool:
+        """Return the completion state currently shown for a cell."""
+        return self.cells.get((habit_id, day), False)
+    
+    def set_cell(self, habit_id: int, day: int, completed: bool) -> None:
+        """Update a single cell and redraw its row if it is visible."""
+        if habit_id not in self.row_index:
+            return
+        was_completed = self.cells.get((habit_id, day), False)
+        if was_completed == completed:
+            return
+        if completed:
+            self.cells[(habit_id, day)] = True
+        else:
+            self.cells.pop((habit_id, day), None)
+        self.totals[habit_id] += 1 if completed else -1
+        
+        row = self.row_index[habit_id]
+        first, last = self._visible_rows()
+        if first <= row < last:
+            self.canvas.delete(f"row{row}")
+            self._draw_row(row)
+    
+    def cell_at(self, x: int, y: int) -> Optional[Tuple[int, int]]:
+        """
+        Map canvas coordinates to a calendar cell.
+        
+        Args:
+            x (int): Canvas x coordinate
+            y (int): Canvas y coordinate
+        
+        Returns:
+            Optional[Tuple[int, int]]: (habit_id, day), or None outside the day columns
+        """
+        if y < self.HEADER_HEIGHT:
+            return None
+        row = (y - self.HEADER_HEIGHT + self.top) // self.ROW_HEIGHT
+        if not 0 <= row < len(self.habits):
+            return None
+        offset = x - self.NAME_WIDTH
+        if offset < 0 or offset >= self.days_in_month * self.DAY_WIDTH:
+            return None
+        return self.habits[row]['id'], offset // self.DAY_WIDTH + 1
+    
+    def yview(self, *args) -> None:
+        """Scrollbar protocol: handle 'moveto' and 'scroll' commands."""
+        viewport = self._viewport_height()
+        if args[0] == 'moveto':
+            self.top = int(float(args[1]) * len(self.habits) * self.ROW_HEIGHT)
+        elif args[0] == 'scroll':
+            step = viewport if args[2] == 'pages' else self.ROW_HEIGHT
+            self.top += int(args[1]) * step
+        self.top = max(0, min(self.top, self._max_top()))
+        self.render()
+    
+    def yview_scroll(self, number: int, what: str) -> None:
+        """Scroll by a number of rows ('units') or viewports ('pages')."""
+        self.yview('scroll', number, what)
+    
+    def render(self) -> None:
+        """Redraw the header and the rows inside the viewport."""
+        self.canvas.delete("all")
+        first, last = self._visible_rows()
+        for row in range(first, last):
+            self._draw_row(row)
+        self._draw_header()
+        self._update_scrollbar()
+    
+    def _viewport_height(self) -> int:
+        return max(self.canvas.winfo_height() - self.HEADER_HEIGHT, 0)
+    
+    def _max_top(self) -> int:
+        return max(len(self.habits) * self.ROW_HEIGHT - self._viewport_height(), 0)
+    
+    def _visible_rows(self) -> Tuple[int, int]:
+        """Return the [first, last) range of rows inside the viewport."""
+        first = self.top // self.ROW_HEIGHT
+        last = (self.top + self._viewport_height()) // self.ROW_HEIGHT + 1
+        return first, min(last, len(self.habits))
+    
+    def _update_scrollbar(self) -> None:
+        total = len(self.habits) * self.ROW_HEIGHT
+        if total <= 0:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        self.scrollbar.set(self.top / total, min((self.top + self._viewport_height()) / total, 1.0))
+    
+    def _draw_header(self) -> None:
+        total_x = self.NAME_WIDTH + self.days_in_month * self.DAY_WIDTH
+        self.canvas.create_rectangle(0, 0, total_x + self.TOTAL_WIDTH, self.HEADER_HEIGHT,
+                                     fill='#e9ecef', outline='', tags="header")
+        mid_y = self.HEADER_HEIGHT // 2
+        self.canvas.create_text(10, mid_y, text="HABIT", anchor='w',
+                                font=("Arial", 10, "bold"), tags="header")
+        for day in range(1, self.days_in_month + 1):
+            x = self.NAME_WIDTH + (day - 1) * self.DAY_WIDTH + self.DAY_WIDTH // 2
+            self.canvas.create_text(x, mid_y, text=str(day), font=("Arial", 9, "bold"), tags="header")
+        self.canvas.create_text(total_x + self.TOTAL_WIDTH // 2, mid_y, text="TOTAL",
+                                font=("Arial", 10, "bold"), tags="header")
+    
+    def _draw_row(self, row: int) -> None:
+        """Draw one habit row, tagged so it can be redrawn on its own."""
+        habit = self.habits[row]
+        habit_id = habit['id']
+        tag = f"row{row}"
+        y0 = self.HEADER_HEIGHT + row * self.ROW_HEIGHT - self.top
+        mid_y = y0 + self.ROW_HEIGHT // 2
+        row_bg = '#f8f9fa' if row % 2 == 0 else 'white'
+        total_x = self.NAME_WIDTH + self.days_in_month * self.DAY_WIDTH
+        
+        self.canvas.create_rectangle(0, y0 + 1, total_x + self.TOTAL_WIDTH, y0 + self.ROW_HEIGHT,
+                                     fill=row_bg, outline='', tags=tag)
+        self.canvas.create_text(10, mid_y, text=habit['name'], anchor='w',
+                                font=("Arial", 11), tags=tag)
+        
+        half = self.BOX_SIZE // 2
+        for day in range(1, self.days_in_month + 1):
+            x = self.NAME_WIDTH + (day - 1) * self.DAY_WIDTH + self.DAY_WIDTH // 2
+            completed = self.cells.get((habit_id, day), False)
+            self.canvas.create_rectangle(x - half, mid_y - half, x + half, mid_y + half,
+                                         fill='#007bff' if completed else 'white',
+                                         outline='#6c757d', tags=tag)
+            if completed:
+                self.canvas.create_text(x, mid_y, text="✓", fill='white',
+                                        font=("Arial", 9, "bold"), tags=tag)
+        
+        self.canvas.create_text(total_x + self.TOTAL_WIDTH // 2, mid_y,
+                                text=f"{self.totals.get(habit_id, 0)}/{self.days_in_month}",
+                                font=("Arial", 10, "bold"), fill='#007bff', tags=tag)
+        # Keep the fixed header above rows scrolled underneath it
+        self.canvas.tag_raise("header")
+    
+    def _on_click(self, event) -> None:
+        cell = self.cell_at(event.x, event.y)
+        if cell is not None:
+            self.on_toggle(*cell)
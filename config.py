@@ -1,12 +1,68 @@
 # Database Configuration
 # Copy this file to config.py and update with your database settings
 
+# Storage backend: 'mysql' uses DATABASE_CONFIG below, 'sqlite' stores
+# everything in a single local file and needs no server
+STORAGE_CONFIG = {
+    'backend': 'mysql',
+    'sqlite_path': 'habit_tracker.db'
+}
+
 DATABASE_CONFIG = {
     'host': 'localhost',
     'database': 'habit_tracker',
     'user': 'root',
     'password': '',  # Update with your MySQL password
-    'port': 3306
+    'port': 3306,
+    # Connection pool (set pool_size > 0 to borrow a connection per query)
+    'pool_size': 0,
+    'pool_timeout': 10.0,         # Seconds to wait for a free connection
+    'pool_max_lifetime': 3600.0,  # Seconds before a connection is recycled
+    # Store only completed days; unticking a day deletes its row
+    'sparse_logs': True
+}
+
+# Write-behind queue for calendar clicks: toggles of the same cell are merged
+# and written as one batch when flush_interval elapses, max_pending cells are
+# queued, or the application closes.
+WRITE_BEHIND_CONFIG = {
+    'enabled': False,
+    'flush_interval': 2.0,  # Seconds
+    'max_pending': 50
+}
+
+# GUI settings: habit counts at or above canvas_calendar_threshold use the
+# virtualized canvas calendar instead of one Checkbutton per day; prefetch
+# loads the neighbouring months in the background after each render;
+# resident_history keeps every habit's completions in memory as bitmaps once
+# the habits are loaded, serving month grids, statistics and analytics.
+# profiler times view rebuilds and main-loop lag (F12 shows the overlay) and
+# writes a Chrome trace to profiler_trace on exit if set.
+GUI_CONFIG = {
+    'canvas_calendar_threshold': 100,
+    'prefetch': True,
+    'resident_history': True,
+    'profiler': False,
+    'profiler_heartbeat_ms': 50,
+    'profiler_trace': None
+}
+
+# Bulk import (importer.py): rows per multi-row upsert and batches per commit
+IMPORT_CONFIG = {
+    'batch_size': 5000,
+    'commit_interval': 10
+}
+
+# Storage instrumentation (instrumentation.py): per-method latency percentiles,
+# rows and round trips per HabitManager operation, and a log of storage calls
+# slower than slow_query_ms. Statistics are dumped on exit, as JSON to
+# dump_path if set and as a report in the log.
+INSTRUMENTATION_CONFIG = {
+    'enabled': False,
+    'slow_query_ms': 100.0,
+    'slow_log_size': 200,
+    'n_plus_one_threshold': 10,  # Round trips per operation flagged as a likely N+1
+    'dump_path': None
 }
 
 # Alternative configuration for remote database
@@ -1,9 +1,18 @@
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, errorcode
+from contextlib import contextmanager
 from datetime import datetime, date
-from typing import List, Dict, Optional, Tuple, Any, cast
+from typing import List, Dict, Optional, Set, Tuple, Any, Iterator, cast
+import calendar
 import logging
 import os
+import queue
+import threading
+import time
+import unicodedata
+
+import migrations
+from storage import StorageBackend
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,112 +32,347 @@ except ImportError:
     }
     logger.warning("No config.py found. Using default database configuration.")
 
-class DatabaseManager:
+# Maximum number of habit ids sent in a single IN (...) list
+BULK_CHUNK_SIZE = 500
+
+# Bucket expressions for aggregated completion counts; week buckets are ISO weeks
+COUNT_GRANULARITIES = {
+    'week': "YEARWEEK(completion_date, 3) DIV 100, YEARWEEK(completion_date, 3) MOD 100",
+    'month': "YEAR(completion_date), MONTH(completion_date)",
+    'year': "YEAR(completion_date)",
+}
+
+
+def collation_key(name: str) -> str:
+    """
+    Fold a habit name the way MySQL's default collations compare it.
+    
+    Case, accents and trailing spaces are ignored, so a name can be matched
+    with the row a name = %s lookup or the unique index would find.
+    
+    Args:
+        name (str): Habit name
+    
+    Returns:
+        str: Comparison key
+    """
+    decomposed = unicodedata.normalize('NFKD', name.rstrip().casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+class PoolTimeoutError(Error):
+    """Raised when no pooled connection becomes free within the checkout timeout."""
+
+
+class ConnectionPool:
+    """Fixed-size pool of MySQL connections with checkout timeout and max lifetime."""
+    
+    def __init__(self, connect_kwargs: Dict[str, Any], size: int = 5,
+                 timeout: float = 10.0, max_lifetime: float = 3600.0):
+        """
+        Initialize the pool. Connections are opened lazily on first checkout.
+        
+        Args:
+            connect_kwargs (dict): Arguments passed to mysql.connector.connect
+            size (int): Maximum number of open connections
+            timeout (float): Seconds to wait for a free connection
+            max_lifetime (float): Seconds after which a connection is recycled
+        """
+        self.connect_kwargs = connect_kwargs
+        self.size = size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._opened_at: Dict[int, float] = {}
+        self._lock = threading.Lock()
+    
+    def _open(self) -> Any:
+        """Open a new connection and record its creation time."""
+        conn = mysql.connector.connect(**self.connect_kwargs)
+        with self._lock:
+            self._opened_at[id(conn)] = time.monotonic()
+        return conn
+    
+    def _discard(self, conn: Any) -> None:
+        """Close a connection and forget it."""
+        with self._lock:
+            self._opened_at.pop(id(conn), None)
+        try:
+            conn.close()
+        except Error:
+            pass
+    
+    def _is_reusable(self, conn: Any) -> bool:
+        """Check that a connection is alive and younger than max_lifetime."""
+        opened_at = self._opened_at.get(id(conn), 0.0)
+        if time.monotonic() - opened_at > self.max_lifetime:
+            return False
+        return conn.is_connected()
+    
+    def acquire(self) -> Any:
+        """
+        Check out a connection, waiting up to the checkout timeout.
+        
+        Returns:
+            Connection: An open MySQL connection
+        
+        Raises:
+            PoolTimeoutError: If no connection is free within the timeout
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeoutError(msg=f"No pooled connection available after {self.timeout}s")
+        try:
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._open()
+                if self._is_reusable(conn):
+                    return conn
+                self._discard(conn)
+        except BaseException:
+            self._slots.release()
+            raise
+    
+    def release(self, conn: Any, broken: bool = False) -> None:
+        """
+        Return a checked-out connection to the pool.
+        
+        Args:
+            conn: Connection previously returned by acquire()
+            broken (bool): Discard the connection instead of reusing it
+        """
+        try:
+            if broken or not self._is_reusable(conn):
+                self._discard(conn)
+            else:
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+    
+    def close_all(self) -> None:
+        """Close every idle connection held by the pool."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+
+class DatabaseManager(StorageBackend):
     """Handles all database operations for the habit tracker application."""
     
+    latest_schema_version = migrations.LATEST_VERSION
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """
         Initialize database connection parameters.
         
+        Setting 'pool_size' in the configuration enables pooled mode, where
+        every method borrows a connection for its query and returns it
+        afterwards. 'pool_timeout' and 'pool_max_lifetime' (seconds) tune the
+        checkout timeout and connection recycling. 'sparse_logs' (default
+        True) stores only completed days in habit_logs.
+        
         Args:
             config (dict): Database configuration dictionary
         """
         if config is None:
-            config = DATABASE_CONFIG
-            
+            config = cast(Dict[str, Any], DATABASE_CONFIG)
+        
         self.host = config.get('host', 'localhost')
         self.database = config.get('database', 'habit_tracker')
         self.user = config.get('user', 'root')
         self.password = config.get('password', '')
         self.port = config.get('port', 3306)
+        self.pool_size = config.get('pool_size', 0)
+        self.pool_timeout = config.get('pool_timeout', 10.0)
+        self.pool_max_lifetime = config.get('pool_max_lifetime', 3600.0)
+        # Sparse logs: only completed days have a row, unticking deletes it
+        self.sparse_logs = config.get('sparse_logs', True)
         self.connection: Optional[Any] = None
+        self.pool: Optional[ConnectionPool] = None
+    
+    def _connect_kwargs(self, with_database: bool = True) -> Dict[str, Any]:
+        """Build keyword arguments for mysql.connector.connect."""
+        kwargs = {
+            'host': self.host,
+            'user': self.user,
+            'password': self.password,
+            'port': self.port
+        }
+        if with_database:
+            kwargs['database'] = self.database
+        return kwargs
     
     def _check_connection(self) -> bool:
         """Check if database connection is valid."""
+        if self.pool is not None:
+            return True
         return self.connection is not None and self.connection.is_connected()
+    
+    @contextmanager
+    def _cursor(self, **cursor_kwargs: Any) -> Iterator[Tuple[Any, Any]]:
+        """
+        Borrow a connection and open a cursor on it.
+        
+        In pooled mode the connection is checked out for the duration of the
+        block, any open transaction is rolled back, and the connection is
+        returned to the pool. Otherwise the shared connection is used.
         
+        Yields:
+            Tuple: (connection, cursor)
+        """
+        if self.pool is None:
+            conn = cast(Any, self.connection)
+            cursor = self._count_statements(conn.cursor(**cursor_kwargs))
+            try:
+                yield conn, cursor
+            finally:
+                cursor.close()
+            return
+        
+        conn = self.pool.acquire()
+        broken = False
+        try:
+            cursor = self._count_statements(conn.cursor(**cursor_kwargs))
+            try:
+                yield conn, cursor
+            finally:
+                cursor.close()
+        except Error:
+            broken = not conn.is_connected()
+            raise
+        finally:
+            if not broken and conn.in_transaction:
+                # Never hand out a connection with an open transaction or snapshot
+                try:
+                    conn.rollback()
+                except Error:
+                    broken = True
+            self.pool.release(conn, broken=broken)
+    
     def connect(self) -> bool:
         """
         Establish connection to MySQL database.
         
+        The fast path opens one connection straight to the database and reads
+        the schema version with a single query. The database is only created
+        when MySQL reports it unknown, and migrations only run when the schema
+        is missing or older than latest_schema_version.
+        
         Returns:
             bool: True if connection successful, False otherwise
         """
         try:
-            self.connection = mysql.connector.connect(
-                host=self.host,
-                user=self.user,
-                password=self.password,
-                port=self.port
-            )
+            try:
+                self._open_database()
+                version = self._read_schema_version()
+            except Error as e:
+                if e.errno != errorcode.ER_BAD_DB_ERROR:
+                    raise
+                self._create_database()
+                self._open_database()
+                version = 0
             
-            if self.connection and self.connection.is_connected():
-                cursor = self.connection.cursor()
-                cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.database}")
-                cursor.close()
-                
-                # Reconnect to the specific database
-                self.connection.close()
-                self.connection = mysql.connector.connect(
-                    host=self.host,
-                    user=self.user,
-                    password=self.password,
-                    port=self.port,
-                    database=self.database
-                )
-                self._create_tables()
-                logger.info("Successfully connected to MySQL database")
-                return True
-            else:
-                logger.error("Failed to connect to MySQL database")
+            if version < self.latest_schema_version and not self._migrate():
+                self.close_connection()
                 return False
-                
+            logger.info("Successfully connected to MySQL database")
+            return True
+        
         except Error as e:
             logger.error(f"Error connecting to MySQL: {e}")
             return False
     
-    def _create_tables(self) -> None:
-        """Create necessary tables if they don't exist."""
+    def _open_database(self) -> None:
+        """Open the shared connection, or the pool, on the target database."""
+        if self.pool_size:
+            # The pool connects lazily, so an unknown database surfaces on first checkout
+            self.connection = None
+            self.pool = ConnectionPool(self._connect_kwargs(),
+                                       size=self.pool_size,
+                                       timeout=self.pool_timeout,
+                                       max_lifetime=self.pool_max_lifetime)
+        else:
+            self.connection = mysql.connector.connect(**self._connect_kwargs())
+    
+    def _create_database(self) -> None:
+        """Create the target database on a short-lived server connection."""
+        logger.info(f"Database {self.database} not found, creating it")
+        conn = mysql.connector.connect(**self._connect_kwargs(with_database=False))
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.database}")
+            cursor.close()
+        finally:
+            conn.close()
+    
+    def _read_schema_version(self) -> int:
+        """Read the applied schema version for the connect fast path."""
+        with self._cursor() as (conn, cursor):
+            return migrations.read_schema_version(cursor)
+    
+    def _migrate(self) -> bool:
+        """
+        Bring the schema up to date by applying pending migrations.
+        
+        Returns:
+            bool: True if the schema is current, False otherwise
+        """
         if not self._check_connection():
-            logger.error("No database connection available for creating tables")
-            return
-            
-        # Type assertion to help type checker
-        conn = cast(Any, self.connection)
-        cursor = conn.cursor()
-        
-        # Create habits table
-        create_habits_table = """
-        CREATE TABLE IF NOT EXISTS habits (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            name VARCHAR(255) NOT NULL UNIQUE,
-            description TEXT,
-            created_date DATE NOT NULL,
-            is_active BOOLEAN DEFAULT TRUE
-        )
-        """
-        
-        # Create habit_logs table
-        create_logs_table = """
-        CREATE TABLE IF NOT EXISTS habit_logs (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            habit_id INT NOT NULL,
-            completion_date DATE NOT NULL,
-            completed BOOLEAN DEFAULT FALSE,
-            FOREIGN KEY (habit_id) REFERENCES habits(id) ON DELETE CASCADE,
-            UNIQUE KEY unique_habit_date (habit_id, completion_date)
-        )
+            logger.error("No database connection available for migrating the schema")
+            return False
+        
+        try:
+            with self._cursor() as (conn, cursor):
+                version = migrations.apply_migrations(conn, cursor, self.sparse_logs)
+            logger.info(f"Database schema at version {version}")
+            return True
+        except Error as e:
+            logger.error(f"Error migrating database schema: {e}")
+            return False
+    
+    def get_schema_version(self) -> int:
+        """
+        Get the applied schema version.
+        
+        Returns:
+            int: Highest applied migration, or -1 if it could not be read
         """
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return -1
         
         try:
-            cursor.execute(create_habits_table)
-            cursor.execute(create_logs_table)
-            conn.commit()
-            logger.info("Database tables created successfully")
+            with self._cursor() as (conn, cursor):
+                return migrations.get_schema_version(cursor)
         except Error as e:
-            logger.error(f"Error creating tables: {e}")
-        finally:
-            cursor.close()
+            logger.error(f"Error reading schema version: {e}")
+            return -1
+    
+    def check_query_plans(self) -> List[Dict[str, Any]]:
+        """
+        EXPLAIN the hot queries and report whether they use the expected indexes.
+        
+        The optimizer may skip indexes on nearly empty tables, so the check is
+        only meaningful on a database with real data.
+        
+        Returns:
+            List[Dict]: See migrations.explain_hot_queries()
+        """
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return []
+        
+        try:
+            with self._cursor(dictionary=True) as (conn, cursor):
+                return migrations.explain_hot_queries(cursor)
+        except Error as e:
+            logger.error(f"Error explaining queries: {e}")
+            return []
     
     def add_habit(self, name: str, description: str = "") -> bool:
         """
@@ -137,29 +381,25 @@ class DatabaseManager:
         Args:
             name (str): Habit name
             description (str): Habit description
-            
+        
         Returns:
             bool: True if successful, False otherwise
         """
         if not self._check_connection():
             logger.error("No database connection available")
             return False
-            
-        conn = cast(Any, self.connection)
-        cursor = conn.cursor()
         
         try:
-            query = "INSERT INTO habits (name, description, created_date) VALUES (%s, %s, %s)"
-            values = (name, description, date.today())
-            cursor.execute(query, values)
-            conn.commit()
+            with self._cursor() as (conn, cursor):
+                query = "INSERT INTO habits (name, description, created_date) VALUES (%s, %s, %s)"
+                values = (name, description, date.today())
+                cursor.execute(query, values)
+                conn.commit()
             logger.info(f"Habit '{name}' added successfully")
             return True
         except Error as e:
             logger.error(f"Error adding habit: {e}")
             return False
-        finally:
-            cursor.close()
     
     def get_all_habits(self) -> List[Dict[str, Any]]:
         """
@@ -171,20 +411,16 @@ class DatabaseManager:
         if not self._check_connection():
             logger.error("No database connection available")
             return []
-            
-        conn = cast(Any, self.connection)
-        cursor = conn.cursor(dictionary=True)
         
         try:
-            query = "SELECT * FROM habits WHERE is_active = TRUE ORDER BY name"
-            cursor.execute(query)
-            habits = cursor.fetchall()
+            with self._cursor(dictionary=True) as (conn, cursor):
+                query = "SELECT * FROM habits WHERE is_active = TRUE ORDER BY name"
+                cursor.execute(query)
+                habits = cursor.fetchall()
             return list(habits)  # Convert to standard list
         except Error as e:
             logger.error(f"Error retrieving habits: {e}")
             return []
-        finally:
-            cursor.close()
     
     def update_habit(self, habit_id: int, name: str, description: str = "") -> bool:
         """
@@ -194,29 +430,25 @@ class DatabaseManager:
             habit_id (int): Habit ID
             name (str): New habit name
             description (str): New habit description
-            
+        
         Returns:
             bool: True if successful, False otherwise
         """
         if not self._check_connection():
             logger.error("No database connection available")
             return False
-            
-        conn = cast(Any, self.connection)
-        cursor = conn.cursor()
         
         try:
-            query = "UPDATE habits SET name = %s, description = %s WHERE id = %s"
-            values = (name, description, habit_id)
-            cursor.execute(query, values)
-            conn.commit()
+            with self._cursor() as (conn, cursor):
+                query = "UPDATE habits SET name = %s, description = %s WHERE id = %s"
+                values = (name, description, habit_id)
+                cursor.execute(query, values)
+                conn.commit()
             logger.info(f"Habit ID {habit_id} updated successfully")
             return True
         except Error as e:
             logger.error(f"Error updating habit: {e}")
             return False
-        finally:
-            cursor.close()
     
     def delete_habit(self, habit_id: int) -> bool:
         """
@@ -224,28 +456,24 @@ class DatabaseManager:
         
         Args:
             habit_id (int): Habit ID to delete
-            
+        
         Returns:
             bool: True if successful, False otherwise
         """
         if not self._check_connection():
             logger.error("No database connection available")
             return False
-            
-        conn = cast(Any, self.connection)
-        cursor = conn.cursor()
         
         try:
-            query = "UPDATE habits SET is_active = FALSE WHERE id = %s"
-            cursor.execute(query, (habit_id,))
-            conn.commit()
+            with self._cursor() as (conn, cursor):
+                query = "UPDATE habits SET is_active = FALSE WHERE id = %s"
+                cursor.execute(query, (habit_id,))
+                conn.commit()
             logger.info(f"Habit ID {habit_id} deleted successfully")
             return True
         except Error as e:
             logger.error(f"Error deleting habit: {e}")
             return False
-        finally:
-            cursor.close()
     
     def log_habit_completion(self, habit_id: int, completion_date: date, completed: bool) -> bool:
         """
@@ -255,132 +483,645 @@ class DatabaseManager:
             habit_id (int): Habit ID
             completion_date (date): Date of completion
             completed (bool): Whether habit was completed
-            
+        
         Returns:
             bool: True if successful, False otherwise
         """
         if not self._check_connection():
             logger.error("No database connection available")
             return False
-            
-        conn = cast(Any, self.connection)
-        cursor = conn.cursor()
         
         try:
-            query = """
-            INSERT INTO habit_logs (habit_id, completion_date, completed) 
-            VALUES (%s, %s, %s) 
-            ON DUPLICATE KEY UPDATE completed = %s
-            """
-            values = (habit_id, completion_date, completed, completed)
-            cursor.execute(query, values)
-            conn.commit()
+            with self._cursor() as (conn, cursor):
+                if self.sparse_logs and not completed:
+                    query = "DELETE FROM habit_logs WHERE habit_id = %s AND completion_date = %s"
+                    cursor.execute(query, (habit_id, completion_date))
+                else:
+                    query = """
+                    INSERT INTO habit_logs (habit_id, completion_date, completed)
+                    VALUES (%s, %s, %s)
+                    ON DUPLICATE KEY UPDATE completed = %s
+                    """
+                    values = (habit_id, completion_date, completed, completed)
+                    cursor.execute(query, values)
+                self._refresh_monthly_stats(cursor, {(habit_id, completion_date.year, completion_date.month)})
+                conn.commit()
             return True
         except Error as e:
             logger.error(f"Error logging habit completion: {e}")
             return False
-        finally:
-            cursor.close()
+    
+    def log_habit_completions(self, entries: List[Tuple[int, date, bool]]) -> bool:
+        """
+        Log several habit completions as one multi-row upsert in one transaction.
+        
+        In sparse mode, entries that are not completed are removed with a
+        single multi-row DELETE in the same transaction instead.
+        
+        Args:
+            entries (List[Tuple[int, date, bool]]): (habit_id, completion_date, completed) rows
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not entries:
+            return True
+        
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return False
+        
+        upserts = entries
+        deletes: List[Tuple[int, date, bool]] = []
+        if self.sparse_logs:
+            upserts = [entry for entry in entries if entry[2]]
+            deletes = [entry for entry in entries if not entry[2]]
+        
+        try:
+            with self._cursor() as (conn, cursor):
+                if upserts:
+                    placeholders = ", ".join(["(%s, %s, %s)"] * len(upserts))
+                    query = f"""
+                    INSERT INTO habit_logs (habit_id, completion_date, completed)
+                    VALUES {placeholders}
+                    ON DUPLICATE KEY UPDATE completed = VALUES(completed)
+                    """
+                    values = [value for entry in upserts for value in entry]
+                    cursor.execute(query, values)
+                if deletes:
+                    placeholders = ", ".join(["(%s, %s)"] * len(deletes))
+                    query = f"DELETE FROM habit_logs WHERE (habit_id, completion_date) IN ({placeholders})"
+                    values = [value for habit_id, completion_date, _ in deletes
+                              for value in (habit_id, completion_date)]
+                    cursor.execute(query, values)
+                self._refresh_monthly_stats(cursor, {(habit_id, completion_date.year, completion_date.month)
+                                                     for habit_id, completion_date, _ in entries})
+                conn.commit()
+            return True
+        except Error as e:
+            logger.error(f"Error logging habit completions: {e}")
+            return False
+    
+    def write_completion_batches(self, batches: List[List[Tuple[int, date, bool]]]) -> bool:
+        """
+        Write several batches of completions in a single transaction.
+        
+        Upserts are sent with executemany(), which the connector rewrites into
+        one multi-row INSERT, and the unticked days of a batch are removed with
+        one DELETE ... IN, so a batch costs at most two round trips. The
+        monthly rollup of every touched month is recounted before the commit.
+        Writes are idempotent, so a failed group can simply be retried.
+        
+        Args:
+            batches (List[List[Tuple[int, date, bool]]]): (habit_id, completion_date, completed) rows
+        
+        Returns:
+            bool: True if committed, False otherwise
+        """
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return False
+        
+        upsert_query = """
+        INSERT INTO habit_logs (habit_id, completion_date, completed)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE completed = VALUES(completed)
+        """
+        try:
+            with self._cursor() as (conn, cursor):
+                months: Set[Tuple[int, int, int]] = set()
+                for batch in batches:
+                    upserts = [entry for entry in batch if entry[2] or not self.sparse_logs]
+                    deletes = [(habit_id, completion_date) for habit_id, completion_date, completed in batch
+                               if self.sparse_logs and not completed]
+                    if upserts:
+                        cursor.executemany(upsert_query, upserts)
+                    # executemany() is only rewritten for INSERT, so deletes get one row-value IN list
+                    if deletes:
+                        placeholders = ", ".join(["(%s, %s)"] * len(deletes))
+                        query = f"DELETE FROM habit_logs WHERE (habit_id, completion_date) IN ({placeholders})"
+                        cursor.execute(query, [value for entry in deletes for value in entry])
+                    months.update((habit_id, completion_date.year, completion_date.month)
+                                  for habit_id, completion_date, _ in batch)
+                self._refresh_monthly_stats(cursor, months)
+                conn.commit()
+            return True
+        except Error as e:
+            logger.error(f"Error writing completion batches: {e}")
+            return False
+    
+    def ensure_habits(self, names: List[str]) -> Tuple[Dict[str, int], int]:
+        """
+        Look up habits by name, creating the missing ones.
+        
+        Habits that exist but were deleted are returned as they are and not
+        reactivated. Names are matched like the unique index compares them,
+        so "read" resolves to an existing "Read" (see collation_key()).
+        
+        Args:
+            names (List[str]): Habit names
+        
+        Returns:
+            Tuple: ({name: habit_id} for every requested name that exists
+            afterwards, number of habits created)
+        """
+        if not names:
+            return {}, 0
+        
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return {}, 0
+        
+        ids: Dict[str, int] = {}
+        created = 0
+        try:
+            with self._cursor() as (conn, cursor):
+                for offset in range(0, len(names), BULK_CHUNK_SIZE):
+                    chunk = names[offset:offset + BULK_CHUNK_SIZE]
+                    cursor.executemany(
+                        "INSERT IGNORE INTO habits (name, description, created_date) VALUES (%s, %s, %s)",
+                        [(name, "", date.today()) for name in chunk])
+                    created += max(0, cursor.rowcount)
+                    placeholders = ", ".join(["%s"] * len(chunk))
+                    cursor.execute(f"SELECT name, id FROM habits WHERE name IN ({placeholders})", tuple(chunk))
+                    # Rows come back spelled as stored, which may differ from the requested name
+                    stored = {collation_key(name): habit_id for name, habit_id in cursor.fetchall()}
+                    ids.update({name: stored[collation_key(name)] for name in chunk
+                                if collation_key(name) in stored})
+                conn.commit()
+            return ids, created
+        except Error as e:
+            logger.error(f"Error creating habits: {e}")
+            return {}, 0
+    
+    def get_habit_ids_by_name(self) -> Dict[str, int]:
+        """
+        Map the name of every habit, including deleted ones, to its ID.
+        
+        Returns:
+            Dict[str, int]: {name: habit_id}
+        """
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return {}
+        
+        try:
+            with self._cursor() as (conn, cursor):
+                cursor.execute("SELECT name, id FROM habits")
+                return {name: habit_id for name, habit_id in cursor.fetchall()}
+        except Error as e:
+            logger.error(f"Error retrieving habit names: {e}")
+            return {}
+    
+    def _refresh_monthly_stats(self, cursor: Any, months: Set[Tuple[int, int, int]]) -> None:
+        """
+        Recount habit_monthly_stats rows inside the caller's transaction.
+        
+        Touched keys are recounted in chunks of BULK_CHUNK_SIZE with one
+        grouped INSERT ... SELECT per chunk. The habit_id IN list and the
+        date range let the (habit_id, completion_date) unique key bound the
+        scan, and recounting instead of applying deltas keeps the rollup
+        correct for repeated upserts. Keys are zeroed first because a month
+        with no completions left produces no group.
+        
+        Args:
+            cursor: Cursor of the open transaction
+            months (Set[Tuple[int, int, int]]): (habit_id, year, month) rows to recount
+        """
+        keys = sorted(months)
+        for offset in range(0, len(keys), BULK_CHUNK_SIZE):
+            chunk = keys[offset:offset + BULK_CHUNK_SIZE]
+            key_placeholders = ', '.join(['(%s, %s, %s)'] * len(chunk))
+            key_params = [value for key in chunk for value in key]
+            habit_ids = sorted({habit_id for habit_id, _, _ in chunk})
+            id_placeholders = ', '.join(['%s'] * len(habit_ids))
+            start_date = min(date(year, month, 1) for _, year, month in chunk)
+            end_date = max(date(year, month, calendar.monthrange(year, month)[1])
+                           for _, year, month in chunk)
+            
+            cursor.execute(f"""
+            UPDATE habit_monthly_stats SET completed_days = 0
+            WHERE (habit_id, year, month) IN ({key_placeholders})
+            """, key_params)
+            cursor.execute(f"""
+            INSERT INTO habit_monthly_stats (habit_id, year, month, completed_days)
+            SELECT habit_id, YEAR(completion_date), MONTH(completion_date), COUNT(*)
+            FROM habit_logs
+            WHERE habit_id IN ({id_placeholders})
+            AND completion_date BETWEEN %s AND %s AND completed = TRUE
+            AND (habit_id, YEAR(completion_date), MONTH(completion_date)) IN ({key_placeholders})
+            GROUP BY habit_id, YEAR(completion_date), MONTH(completion_date)
+            ON DUPLICATE KEY UPDATE completed_days = VALUES(completed_days)
+            """, habit_ids + [start_date, end_date] + key_params)
+    
+    def rebuild_monthly_stats(self) -> bool:
+        """
+        Recompute the whole habit_monthly_stats table from habit_logs.
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return False
+        
+        try:
+            with self._cursor() as (conn, cursor):
+                cursor.execute("DELETE FROM habit_monthly_stats")
+                cursor.execute("""
+                INSERT INTO habit_monthly_stats (habit_id, year, month, completed_days)
+                SELECT habit_id, YEAR(completion_date), MONTH(completion_date), COUNT(*)
+                FROM habit_logs
+                WHERE completed = TRUE
+                GROUP BY habit_id, YEAR(completion_date), MONTH(completion_date)
+                """)
+                rows = cursor.rowcount
+                conn.commit()
+            logger.info(f"Monthly statistics rebuilt ({rows} rows)")
+            return True
+        except Error as e:
+            logger.error(f"Error rebuilding monthly statistics: {e}")
+            return False
+    
+    def verify_monthly_stats(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        Compare habit_monthly_stats with counts recomputed from habit_logs.
+        
+        Returns:
+            Optional[List[Dict]]: One dict per mismatching month with habit_id,
+            year, month, expected and actual; empty if the rollup is in sync.
+            None if the check could not run.
+        """
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return None
+        
+        try:
+            with self._cursor() as (conn, cursor):
+                cursor.execute("""
+                SELECT habit_id, YEAR(completion_date), MONTH(completion_date), COUNT(*)
+                FROM habit_logs
+                WHERE completed = TRUE
+                GROUP BY habit_id, YEAR(completion_date), MONTH(completion_date)
+                """)
+                expected = {(row[0], int(row[1]), int(row[2])): int(row[3]) for row in cursor.fetchall()}
+                cursor.execute("SELECT habit_id, year, month, completed_days FROM habit_monthly_stats")
+                actual = {(row[0], int(row[1]), int(row[2])): int(row[3]) for row in cursor.fetchall()}
+        except Error as e:
+            logger.error(f"Error verifying monthly statistics: {e}")
+            return None
+        
+        return self._diff_monthly_stats(expected, actual)
+    
+    def get_monthly_stats(self, habit_ids: List[int], start_date: date,
+                          end_date: date) -> Dict[int, Dict[Tuple[int, int], int]]:
+        """
+        Read completed-day counts per month from the habit_monthly_stats rollup.
+        
+        The cost depends on the number of months in the range, not on the
+        number of log rows.
+        
+        Args:
+            habit_ids (List[int]): Habit IDs
+            start_date (date): Any date in the first month
+            end_date (date): Any date in the last month
+        
+        Returns:
+            Dict[int, Dict[Tuple[int, int], int]]: {habit_id: {(year, month): completed_days}}.
+            Every requested habit has an entry, possibly empty.
+        """
+        counts: Dict[int, Dict[Tuple[int, int], int]] = {habit_id: {} for habit_id in habit_ids}
+        if not habit_ids:
+            return counts
+        
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return counts
+        
+        first_month = start_date.year * 12 + start_date.month - 1
+        last_month = end_date.year * 12 + end_date.month - 1
+        try:
+            with self._cursor() as (conn, cursor):
+                for offset in range(0, len(habit_ids), BULK_CHUNK_SIZE):
+                    chunk = habit_ids[offset:offset + BULK_CHUNK_SIZE]
+                    placeholders = ", ".join(["%s"] * len(chunk))
+                    query = f"""
+                    SELECT habit_id, year, month, completed_days FROM habit_monthly_stats
+                    WHERE habit_id IN ({placeholders}) AND year BETWEEN %s AND %s
+                    AND year * 12 + month - 1 BETWEEN %s AND %s
+                    """
+                    cursor.execute(query, (*chunk, start_date.year, end_date.year,
+                                           first_month, last_month))
+                    for habit_id, year, month, completed_days in cursor.fetchall():
+                        counts.setdefault(habit_id, {})[(int(year), int(month))] = int(completed_days)
+            return counts
+        except Error as e:
+            logger.error(f"Error retrieving monthly statistics: {e}")
+            return counts
     
     def get_habit_logs(self, habit_id: int, start_date: date, end_date: date) -> List[Dict[str, Any]]:
         """
         Get habit completion logs for a date range.
         
+        Days without a row were not completed; in sparse mode every returned
+        row is a completed day.
+        
         Args:
             habit_id (int): Habit ID
             start_date (date): Start date
             end_date (date): End date
-            
+        
         Returns:
             List[Dict]: List of log dictionaries
         """
         if not self._check_connection():
             logger.error("No database connection available")
             return []
-            
-        conn = cast(Any, self.connection)
-        cursor = conn.cursor(dictionary=True)
         
         try:
-            query = """
-            SELECT * FROM habit_logs 
-            WHERE habit_id = %s AND completion_date BETWEEN %s AND %s
-            ORDER BY completion_date
-            """
-            values = (habit_id, start_date, end_date)
-            cursor.execute(query, values)
-            logs = cursor.fetchall()
+            with self._cursor(dictionary=True) as (conn, cursor):
+                query = """
+                SELECT * FROM habit_logs
+                WHERE habit_id = %s AND completion_date BETWEEN %s AND %s
+                ORDER BY completion_date
+                """
+                values = (habit_id, start_date, end_date)
+                cursor.execute(query, values)
+                logs = cursor.fetchall()
             return list(logs)  # Convert to standard list
         except Error as e:
             logger.error(f"Error retrieving habit logs: {e}")
             return []
-        finally:
-            cursor.close()
     
-    def get_habit_completion_status(self, habit_id: int, completion_date: date) -> bool:
+    def get_logs_for_habits(self, habit_ids: List[int], start_date: date,
+                            end_date: date) -> Dict[int, List[Dict[str, Any]]]:
         """
-        Check if a habit was completed on a specific date.
+        Get completion logs for several habits over a date range in bulk.
+        
+        Large habit lists are split into chunks of BULK_CHUNK_SIZE ids so the
+        IN list stays within sensible packet limits; anything up to that size
+        is served by a single query.
         
         Args:
-            habit_id (int): Habit ID
-            completion_date (date): Date to check
-            
+            habit_ids (List[int]): Habit IDs
+            start_date (date): Start date
+            end_date (date): End date
+        
         Returns:
-            bool: True if completed, False otherwise
+            Dict[int, List[Dict]]: {habit_id: [log, ...]} ordered by date.
+            Every requested habit has an entry, possibly empty.
         """
+        logs_by_habit: Dict[int, List[Dict[str, Any]]] = {habit_id: [] for habit_id in habit_ids}
+        if not habit_ids:
+            return logs_by_habit
+        
         if not self._check_connection():
             logger.error("No database connection available")
-            return False
-            
-        conn = cast(Any, self.connection)
-        cursor = conn.cursor()
+            return logs_by_habit
         
         try:
-            query = "SELECT completed FROM habit_logs WHERE habit_id = %s AND completion_date = %s"
-            cursor.execute(query, (habit_id, completion_date))
-            result = cursor.fetchone()
-            return bool(result[0]) if result else False
+            with self._cursor(dictionary=True) as (conn, cursor):
+                for offset in range(0, len(habit_ids), BULK_CHUNK_SIZE):
+                    chunk = habit_ids[offset:offset + BULK_CHUNK_SIZE]
+                    placeholders = ", ".join(["%s"] * len(chunk))
+                    query = f"""
+                    SELECT * FROM habit_logs
+                    WHERE habit_id IN ({placeholders}) AND completion_date BETWEEN %s AND %s
+                    ORDER BY habit_id, completion_date
+                    """
+                    cursor.execute(query, (*chunk, start_date, end_date))
+                    for log in cursor.fetchall():
+                        logs_by_habit.setdefault(log['habit_id'], []).append(log)
+            return logs_by_habit
         except Error as e:
-            logger.error(f"Error checking completion status: {e}")
-            return False
-        finally:
-            cursor.close()
+            logger.error(f"Error retrieving habit logs in bulk: {e}")
+            return logs_by_habit
     
-    def get_habit_statistics(self, habit_id: int, start_date: date, end_date: date) -> Dict[str, Any]:
+    def get_completion_counts(self, habit_ids: List[int], start_date: date, end_date: date,
+                              granularity: str = 'month') -> Dict[int, Dict[Tuple[int, ...], int]]:
         """
-        Get statistics for a habit in a date range.
+        Count completed days per habit and period with a single GROUP BY query.
+        
+        Only the counts are transferred, so the cost does not grow with the
+        number of log rows in the range. Large habit lists are chunked like
+        get_logs_for_habits().
         
         Args:
-            habit_id (int): Habit ID
+            habit_ids (List[int]): Habit IDs
             start_date (date): Start date
             end_date (date): End date
-            
+            granularity (str): 'week', 'month' or 'year'
+        
         Returns:
-            Dict: Statistics dictionary
+            Dict[int, Dict[Tuple, int]]: {habit_id: {bucket: completed_days}} where
+            bucket is (iso_year, iso_week), (year, month) or (year,). Periods
+            without completions are omitted. Every requested habit has an entry.
+        
+        Raises:
+            ValueError: If granularity is not supported
         """
-        logs = self.get_habit_logs(habit_id, start_date, end_date)
+        if granularity not in COUNT_GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {granularity}")
         
-        total_days = (end_date - start_date).days + 1
-        completed_days = sum(1 for log in logs if log['completed'])
-        completion_rate = (completed_days / total_days) * 100 if total_days > 0 else 0
+        counts: Dict[int, Dict[Tuple[int, ...], int]] = {habit_id: {} for habit_id in habit_ids}
+        if not habit_ids:
+            return counts
         
-        # Calculate current streak
-        current_streak = 0
-        for log in reversed(logs):
-            if log['completed']:
-                current_streak += 1
-            else:
-                break
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return counts
         
-        return {
-            'total_days': total_days,
-            'completed_days': completed_days,
-            'completion_rate': completion_rate,
-            'current_streak': current_streak
-        }
+        bucket = COUNT_GRANULARITIES[granularity]
+        try:
+            with self._cursor() as (conn, cursor):
+                for offset in range(0, len(habit_ids), BULK_CHUNK_SIZE):
+                    chunk = habit_ids[offset:offset + BULK_CHUNK_SIZE]
+                    placeholders = ", ".join(["%s"] * len(chunk))
+                    query = f"""
+                    SELECT habit_id, {bucket}, COUNT(*) FROM habit_logs
+                    WHERE habit_id IN ({placeholders}) AND completion_date BETWEEN %s AND %s
+                    AND completed = TRUE
+                    GROUP BY habit_id, {bucket}
+                    """
+                    cursor.execute(query, (*chunk, start_date, end_date))
+                    for row in cursor.fetchall():
+                        habit_id, *period, completed_days = row
+                        counts.setdefault(habit_id, {})[tuple(int(p) for p in period)] = int(completed_days)
+            return counts
+        except Error as e:
+            logger.error(f"Error retrieving completion counts: {e}")
+            return counts
+    
+    def get_completed_dates(self, habit_id: int) -> List[date]:
+        """
+        Get every day a habit was completed, over its whole history.
+        
+        Args:
+            habit_id (int): Habit ID
+        
+        Returns:
+            List[date]: Completed days in ascending order
+        """
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return []
+        
+        try:
+            with self._cursor() as (conn, cursor):
+                query = """
+                SELECT completion_date FROM habit_logs
+                WHERE habit_id = %s AND completed = TRUE
+                ORDER BY completion_date
+                """
+                cursor.execute(query, (habit_id,))
+                return [row[0] for row in cursor.fetchall()]
+        except Error as e:
+            logger.error(f"Error retrieving completed dates: {e}")
+            return []
+    
+    def get_completed_dates_for_habits(self, habit_ids: List[int], start_date: Optional[date] = None,
+                                       end_date: Optional[date] = None) -> Dict[int, List[date]]:
+        """
+        Get every completed day of several habits, chunked like get_logs_for_habits().
+        
+        Only (habit_id, completion_date) pairs are transferred, which keeps
+        bulk loading of long histories light.
+        
+        Args:
+            habit_ids (List[int]): Habit IDs
+            start_date (date, optional): First day loaded, together with end_date
+            end_date (date, optional): Last day loaded; the whole history if omitted
+        
+        Returns:
+            Dict[int, List[date]]: {habit_id: [completed day, ...]}.
+            Every requested habit has an entry, possibly empty.
+        """
+        completed: Dict[int, List[date]] = {habit_id: [] for habit_id in habit_ids}
+        if not habit_ids:
+            return completed
+        
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return completed
+        
+        # A window keeps the transfer proportional to the days analysed, not to the account's age
+        window = ""
+        window_params: Tuple[date, ...] = ()
+        if start_date is not None and end_date is not None:
+            window = " AND completion_date BETWEEN %s AND %s"
+            window_params = (start_date, end_date)
+        
+        try:
+            with self._cursor() as (conn, cursor):
+                for offset in range(0, len(habit_ids), BULK_CHUNK_SIZE):
+                    chunk = habit_ids[offset:offset + BULK_CHUNK_SIZE]
+                    placeholders = ", ".join(["%s"] * len(chunk))
+                    query = f"""
+                    SELECT habit_id, completion_date FROM habit_logs
+                    WHERE habit_id IN ({placeholders}) AND completed = TRUE{window}
+                    """
+                    cursor.execute(query, (*chunk, *window_params))
+                    for habit_id, completion_date in cursor.fetchall():
+                        completed.setdefault(habit_id, []).append(completion_date)
+            return completed
+        except Error as e:
+            logger.error(f"Error retrieving completed dates in bulk: {e}")
+            return completed
+    
+    def iter_log_rows(self, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                      fetch_size: int = 1000) -> Iterator[Tuple[int, str, date, bool]]:
+        """
+        Stream habit_logs joined with habit names through an unbuffered cursor.
+        
+        Rows are pulled from the server fetch_size at a time, so memory use
+        does not depend on the number of rows. The connection is busy until
+        the generator is exhausted or closed; use a dedicated DatabaseManager
+        (or pooled mode) when other queries must run meanwhile.
+        
+        Args:
+            start_date (date, optional): First day to include
+            end_date (date, optional): Last day to include
+            fetch_size (int): Rows read from the server per fetchmany() call
+        
+        Yields:
+            Tuple: (habit_id, habit_name, completion_date, completed), ordered
+            by habit and date
+        
+        Raises:
+            Error: If the query fails part-way; the stream is incomplete
+        """
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return
+        
+        conditions = []
+        params: List[Any] = []
+        if start_date is not None:
+            conditions.append("l.completion_date >= %s")
+            params.append(start_date)
+        if end_date is not None:
+            conditions.append("l.completion_date <= %s")
+            params.append(end_date)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        # Ordered like the (habit_id, completion_date) index, so the server needs no sort
+        query = f"""
+        SELECT l.habit_id, h.name, l.completion_date, l.completed
+        FROM habit_logs l JOIN habits h ON h.id = l.habit_id
+        {where}
+        ORDER BY l.habit_id, l.completion_date
+        """
+        
+        try:
+            with self._cursor(buffered=False) as (conn, cursor):
+                cursor.execute(query, tuple(params))
+                exhausted = False
+                try:
+                    while True:
+                        rows = cursor.fetchmany(fetch_size)
+                        if not rows:
+                            exhausted = True
+                            break
+                        for habit_id, name, completion_date, completed in rows:
+                            yield habit_id, name, completion_date, bool(completed)
+                finally:
+                    if not exhausted:
+                        # Stopped early: discard unread rows so the connection stays usable
+                        conn.consume_results()
+        except Error as e:
+            logger.error(f"Error streaming habit logs: {e}")
+            raise
+    
+    def get_habit_completion_status(self, habit_id: int, completion_date: date) -> bool:
+        """
+        Check if a habit was completed on a specific date.
+        
+        Args:
+            habit_id (int): Habit ID
+            completion_date (date): Date to check
+        
+        Returns:
+            bool: True if completed, False otherwise
+        """
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return False
+        
+        try:
+            with self._cursor() as (conn, cursor):
+                query = "SELECT completed FROM habit_logs WHERE habit_id = %s AND completion_date = %s"
+                cursor.execute(query, (habit_id, completion_date))
+                result = cursor.fetchone()
+            return bool(result[0]) if result else False
+        except Error as e:
+            logger.error(f"Error checking completion status: {e}")
+            return False
     
     def close_connection(self) -> None:
         """Close database connection."""
+        if self.pool is not None:
+            self.pool.close_all()
+            self.pool = None
+            logger.info("Database connection pool closed")
         if self.connection and self.connection.is_connected():
             self.connection.close()
             logger.info("Database connection closed")
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Streaming export of habit logs to CSV, JSON Lines or a binary columnar file.
+
+Rows are read through an unbuffered cursor and written as they arrive, so
+memory use stays flat regardless of the account size.
+
+Usage:
+    python exporter.py logs.csv
+    python exporter.py logs.jsonl --start 2024-01-01 --end 2024-12-31
+    python exporter.py logs.hbl --format columnar
+"""
+
+from array import array
+from datetime import date
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional
+import argparse
+import csv
+import json
+import logging
+import struct
+import sys
+
+from storage import StorageBackend, create_storage
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ['habit_id', 'habit', 'date', 'completed']
+
+# Columnar file layout: MAGIC, then blocks of b'B' + row count + habit_id
+# (int32), date ordinal (int32) and completed (uint8) columns, then one b'N'
+# block mapping habit IDs to names, then b'E'. Integers are little-endian.
+COLUMNAR_MAGIC = b'HABITLOG1\n'
+COLUMNAR_BLOCK_ROWS = 65536
+
+def iter_logs(db_manager: StorageBackend, start_date: Optional[date] = None,
+              end_date: Optional[date] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over habit logs as dicts without loading them all.
+    
+    Args:
+        db_manager (StorageBackend): Connected storage backend
+        start_date (date, optional): First day to include
+        end_date (date, optional): Last day to include
+    
+    Yields:
+        Dict: {'habit_id', 'habit', 'date', 'completed'}
+    """
+    for habit_id, name, completion_date, completed in db_manager.iter_log_rows(start_date, end_date):
+        yield {'habit_id': habit_id, 'habit': name, 'date': completion_date, 'completed': completed}
+
+def write_csv(records: Iterable[Dict[str, Any]], handle) -> int:
+    """Write records as CSV with a header row. Returns the number of rows."""
+    writer = csv.writer(handle)
+    writer.writerow(FIELDS)
+    count = 0
+    for record in records:
+        writer.writerow([record['habit_id'], record['habit'], record['date'].isoformat(),
+                         int(record['completed'])])
+        count += 1
+    return count
+
+def write_jsonl(records: Iterable[Dict[str, Any]], handle) -> int:
+    """Write records as JSON Lines. Returns the number of rows."""
+    count = 0
+    for record in records:
+        handle.write(json.dumps({'habit_id': record['habit_id'], 'habit': record['habit'],
+                                 'date': record['date'].isoformat(),
+                                 'completed': record['completed']}, ensure_ascii=False))
+        handle.write('\n')
+        count += 1
+    return count
+
+def _write_block(handle: BinaryIO, habit_ids: array, ordinals: array, completed: bytearray) -> None:
+    for column in (habit_ids, ordinals):
+        if sys.byteorder != 'little':
+            column.byteswap()
+    handle.write(b'B' + struct.pack('<I', len(completed)))
+    handle.write(habit_ids.tobytes())
+    handle.write(ordinals.tobytes())
+    handle.write(bytes(completed))
+
+def write_columnar(records: Iterable[Dict[str, Any]], handle: BinaryIO,
+                   block_rows: int = COLUMNAR_BLOCK_ROWS) -> int:
+    """
+    Write records to the compact binary columnar format.
+    
+    Each row takes 9 bytes; habit names are stored once at the end.
+    
+    Args:
+        records (Iterable[Dict]): Records from iter_logs()
+        handle (BinaryIO): File opened in binary mode
+        block_rows (int): Rows buffered per block
+    
+    Returns:
+        int: Number of rows written
+    """
+    handle.write(COLUMNAR_MAGIC)
+    names: Dict[int, str] = {}
+    habit_ids, ordinals, completed = array('i'), array('i'), bytearray()
+    count = 0
+    for record in records:
+        names[record['habit_id']] = record['habit']
+        habit_ids.append(record['habit_id'])
+        ordinals.append(record['date'].toordinal())
+        completed.append(1 if record['completed'] else 0)
+        count += 1
+        if len(completed) >= block_rows:
+            _write_block(handle, habit_ids, ordinals, completed)
+            habit_ids, ordinals, completed = array('i'), array('i'), bytearray()
+    if completed:
+        _write_block(handle, habit_ids, ordinals, completed)
+    
+    handle.write(b'N' + struct.pack('<I', len(names)))
+    for habit_id, name in names.items():
+        encoded = name.encode('utf-8')
+        handle.write(struct.pack('<iH', habit_id, len(encoded)) + encoded)
+    handle.write(b'E')
+    return count
+
+def _read_exact(handle: BinaryIO, size: int) -> bytes:
+    data = handle.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated columnar file")
+    return data
+
+def read_columnar(handle: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """
+    Read records back from a columnar file, one block at a time.
+    
+    Habit names live at the end of the file, so they are read first with a
+    seek; the handle must be seekable.
+    
+    Args:
+        handle (BinaryIO): File opened in binary mode
+    
+    Yields:
+        Dict: {'habit_id', 'habit', 'date', 'completed'}
+    
+    Raises:
+        ValueError: If the file is not a valid columnar export
+    """
+    if _read_exact(handle, len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+        raise ValueError("Not a habit log columnar file")
+    data_start = handle.tell()
+    
+    # Skip over the blocks to the name table
+    while True:
+        kind = _read_exact(handle, 1)
+        if kind != b'B':
+            break
+        rows = struct.unpack('<I', _read_exact(handle, 4))[0]
+        handle.seek(rows * 9, 1)
+    if kind != b'N':
+        raise ValueError("Missing habit name table")
+    names = {}
+    for _ in range(struct.unpack('<I', _read_exact(handle, 4))[0]):
+        habit_id, length = struct.unpack('<iH', _read_exact(handle, 6))
+        names[habit_id] = _read_exact(handle, length).decode('utf-8')
+    
+    handle.seek(data_start)
+    while _read_exact(handle, 1) == b'B':
+        rows = struct.unpack('<I', _read_exact(handle, 4))[0]
+        habit_ids, ordinals = array('i'), array('i')
+        habit_ids.frombytes(_read_exact(handle, rows * 4))
+        ordinals.frombytes(_read_exact(handle, rows * 4))
+        if sys.byteorder != 'little':
+            habit_ids.byteswap()
+            ordinals.byteswap()
+        completed = _read_exact(handle, rows)
+        for habit_id, ordinal, flag in zip(habit_ids, ordinals, completed):
+            yield {'habit_id': habit_id, 'habit': names.get(habit_id, ''),
+                   'date': date.fromordinal(ordinal), 'completed': bool(flag)}
+
+def export_logs(db_manager: StorageBackend, path: str, file_format: Optional[str] = None,
+                start_date: Optional[date] = None, end_date: Optional[date] = None) -> int:
+    """
+    Export habit logs to a file.
+    
+    Args:
+        db_manager (StorageBackend): Connected storage backend
+        path (str): Output file
+        file_format (str, optional): 'csv', 'jsonl' or 'columnar'; guessed from the extension if omitted
+        start_date (date, optional): First day to include
+        end_date (date, optional): Last day to include
+    
+    Returns:
+        int: Number of rows exported
+    """
+    if file_format is None:
+        lowered = path.lower()
+        file_format = ('jsonl' if lowered.endswith(('.jsonl', '.ndjson')) else
+                       'columnar' if lowered.endswith('.hbl') else 'csv')
+    
+    records = iter_logs(db_manager, start_date, end_date)
+    if file_format == 'columnar':
+        with open(path, 'wb') as handle:
+            return write_columnar(records, handle)
+    with open(path, 'w', newline='', encoding='utf-8') as handle:
+        if file_format == 'jsonl':
+            return write_jsonl(records, handle)
+        return write_csv(records, handle)
+
+def main() -> int:
+    """Export logs from the configured database."""
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Export habit logs")
+    parser.add_argument('path', help="Output file")
+    parser.add_argument('--format', choices=['csv', 'jsonl', 'columnar'],
+                        help="Output format (default: from extension, .hbl for columnar)")
+    parser.add_argument('--start', type=date.fromisoformat, help="First day (YYYY-MM-DD)")
+    parser.add_argument('--end', type=date.fromisoformat, help="Last day (YYYY-MM-DD)")
+    args = parser.parse_args()
+    
+    db_manager = create_storage()
+    if not db_manager.connect():
+        print("Error: could not connect to the database")
+        return 1
+    try:
+        rows = export_logs(db_manager, args.path, args.format, args.start, args.end)
+    except Exception as e:
+        print(f"Error: export failed: {e}")
+        return 1
+    finally:
+        db_manager.close_connection()
+    
+    print(f"Exported {rows:,} rows to {args.path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
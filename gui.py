@@ -2,14 +2,43 @@ import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 from datetime import datetime, date, timedelta
 import calendar
+from concurrent.futures import Future
 from typing import Dict, List
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-import numpy as np
+import functools
+import threading
 
-from database import DatabaseManager
+from storage import create_storage
 from habit_manager import HabitManager
+from write_queue import create_write_queue
+from calendar_grid import CalendarCanvas
+from prefetch import MonthPrefetcher
+from async_manager import AsyncHabitManager, POLL_INTERVAL_MS
+from gui_profiler import GuiProfiler
+
+# Try to import configuration
+try:
+    from config import GUI_CONFIG
+except ImportError:
+    GUI_CONFIG = {
+        'canvas_calendar_threshold': 100,
+        'prefetch': True,
+        'resident_history': True
+    }
+
+@functools.lru_cache(maxsize=None)
+def load_chart_backend():
+    """
+    Import matplotlib's figure and Tk canvas classes on first use.
+    
+    matplotlib takes longer to import than the rest of the application, so it
+    stays off the startup path until the charts tab is opened.
+    
+    Returns:
+        tuple: (Figure, FigureCanvasTkAgg)
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    return Figure, FigureCanvasTkAgg
 
 class ModernHabitTrackerGUI:
     """Modern GUI class for the Habit Tracker application."""
@@ -21,15 +50,28 @@ class ModernHabitTrackerGUI:
         self.root.geometry("1400x900")
         self.root.configure(bg='#f8f9fa')
         
+        # Opt-in render profiler; views are wrapped before any are bound as callbacks
+        self.profiler = None
+        if GUI_CONFIG.get('profiler', False):
+            self.profiler = GuiProfiler(self.root, GUI_CONFIG.get('profiler_heartbeat_ms', 50))
+            self.profiler.instrument(self)
+            self.profiler.start()
+        
         # Initialize database and habit manager
-        self.db_manager = DatabaseManager()
+        self.db_manager = create_storage()
         if not self.db_manager.connect():
             messagebox.showerror("Database Error", 
-                               "Could not connect to database. Please check your MySQL configuration.")
+                               "Could not connect to database. Please check your storage configuration.")
             self.root.destroy()
             return
         
-        self.habit_manager = HabitManager(self.db_manager)
+        self.habit_manager = HabitManager(self.db_manager, create_write_queue(self.db_manager))
+        # All HabitManager calls go through the async layer so the Tk loop never blocks
+        self.async_manager = AsyncHabitManager(self.root, self.habit_manager)
+        self.prefetcher = None
+        if GUI_CONFIG.get('prefetch', True):
+            self.prefetcher = MonthPrefetcher(self.root, self.habit_manager, create_storage,
+                                              dispatch=self.async_manager.dispatch)
         
         # Current month and year
         self.current_date = datetime.now()
@@ -39,12 +81,24 @@ class ModernHabitTrackerGUI:
         # GUI variables
         self.habits = []
         self.checkboxes = {}  # {(habit_id, day): checkbox_var}
+        self.calendar_rows = {}  # {habit_id: total_label}
+        self.calendar_key = None  # (year, month, habits) the calendar widgets were built for
+        self.calendar_grid = None  # Canvas-drawn calendar used for large habit sets
+        self.calendar_mode = 'widgets'  # 'widgets' or 'canvas'
+        self.charts_ready = False  # Set once matplotlib has been loaded for the charts tab
+        self.chart_backend_future = None  # Future of the pending matplotlib import
+        self.chart_canvas = None  # Progress chart canvas, created once and reused
+        self.chart_artists = {}  # Figure, axes, line, fill and texts updated by draw_chart()
+        self.chart_months = None  # Month labels the chart axis was laid out for
         
         # Setup modern styling
         self.setup_styles()
         self.setup_gui()
-        self.refresh_habits()
-        self.update_calendar()
+        self.refresh_habits(on_done=self.update_calendar)
+        
+        # Periodically flush buffered toggles when write-behind is enabled
+        if self.habit_manager.write_queue is not None:
+            self.schedule_write_flush()
         
         # Bind close event
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -202,19 +256,65 @@ class ModernHabitTrackerGUI:
         right_panel.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
         
         # Create notebook for tabs
-        notebook = ttk.Notebook(right_panel)
-        notebook.pack(fill=tk.BOTH, expand=True)
+        self.notebook = ttk.Notebook(right_panel)
+        self.notebook.pack(fill=tk.BOTH, expand=True)
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
         
         # Calendar tab
-        self.calendar_frame = ttk.Frame(notebook)
-        notebook.add(self.calendar_frame, text="📅 Calendar View")
+        self.calendar_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.calendar_frame, text="📅 Calendar View")
         self.setup_calendar_tab()
         
         # Charts tab
-        self.charts_frame = ttk.Frame(notebook)
-        notebook.add(self.charts_frame, text="📊 Progress Charts")
+        self.charts_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.charts_frame, text="📊 Progress Charts")
         self.setup_charts_tab()
     
+    def on_tab_changed(self, event=None):
+        """
+        Load the charting backend in the background the first time the charts tab opens.
+        
+        matplotlib is imported on its own thread rather than the database
+        worker, so the import neither waits behind nor delays calendar loads.
+        """
+        if (self.charts_ready or self.chart_backend_future is not None
+                or self.notebook.select() != str(self.charts_frame)):
+            return
+        
+        self.show_chart_message("⏳ Loading charts...")
+        future = Future()
+        self.chart_backend_future = future
+        
+        def import_backend():
+            try:
+                future.set_result(load_chart_backend())
+            except Exception as e:
+                future.set_exception(e)
+        
+        threading.Thread(target=import_backend, name="chart-backend", daemon=True).start()
+        self.root.after(POLL_INTERVAL_MS, self.poll_chart_backend)
+    
+    def poll_chart_backend(self):
+        """Hand the imported charting backend to the Tk thread once the import finishes."""
+        future = self.chart_backend_future
+        if future is None:
+            return
+        if not future.done():
+            self.root.after(POLL_INTERVAL_MS, self.poll_chart_backend)
+            return
+        
+        self.chart_backend_future = None
+        error = future.exception()
+        if error is not None:
+            self.show_chart_error(error)
+        else:
+            self.charts_loaded(future.result())
+    
+    def charts_loaded(self, backend=None):
+        """Mark the charts tab ready and draw the selected habit."""
+        self.charts_ready = True
+        self.update_chart()
+    
     def refresh_habits_list(self):
         """Refresh the habits list in the left panel."""
         # Clear existing habit widgets
@@ -294,17 +394,44 @@ class ModernHabitTrackerGUI:
                              command=lambda h=habit: self.delete_habit(h))
         delete_btn.pack(side=tk.LEFT)
     
-    def refresh_habits(self):
-        """Refresh habits from database."""
-        self.habits = self.habit_manager.get_habits()
-        self.refresh_habits_list()
+    def refresh_habits(self, on_done=None):
+        """Refresh habits from database in the background.
+        
+        Args:
+            on_done (Callable, optional): Called once the habit list is updated
+        """
+        def apply_habits(habits):
+            self.habits = habits
+            self.refresh_habits_list()
+            if on_done is not None:
+                on_done()
+            # Queued behind the loads on_done started, so the first screen is not delayed
+            if GUI_CONFIG.get('resident_history', True):
+                self.async_manager.call('load_log_bitmaps', habits)
+        
+        self.async_manager.call('get_habits', on_success=apply_habits, channel='habits')
     
     def refresh_all(self):
-        """Refresh all data including habits and calendar."""
-        self.refresh_habits()
-        self.update_calendar()
-        self.update_chart()
-        messagebox.showinfo("Refreshed", "✅ Data refreshed successfully!")
+        """Reload habits, calendar and chart from the database, bypassing the caches."""
+        # Changes made outside the app (another client, an import) are not in the caches.
+        # The clear is queued on the worker ahead of the reloads below.
+        if self.prefetcher is not None:
+            self.prefetcher.cancel()
+        self.async_manager.call('clear_cache')
+        
+        # Confirm only once both views show the reloaded data; a failed load never confirms
+        pending_views = {'count': 2}
+        
+        def view_loaded():
+            pending_views['count'] -= 1
+            if pending_views['count'] == 0:
+                messagebox.showinfo("Refreshed", "✅ Data refreshed successfully!")
+        
+        def refresh_views():
+            self.update_calendar(on_done=view_loaded)
+            self.update_chart(on_done=view_loaded)
+        
+        self.refresh_habits(on_done=refresh_views)
     
     def update_month_label(self):
         """Update the month label display."""
@@ -339,6 +466,8 @@ class ModernHabitTrackerGUI:
         canvas = tk.Canvas(self.calendar_frame, bg='white')
         scrollbar = ttk.Scrollbar(self.calendar_frame, orient="vertical", command=canvas.yview)
         self.scrollable_frame = tk.Frame(canvas, bg='white')
+        self.calendar_canvas = canvas
+        self.calendar_scrollbar = scrollbar
         
         self.scrollable_frame.bind(
             "<Configure>",
@@ -351,11 +480,38 @@ class ModernHabitTrackerGUI:
         canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        # Bind mousewheel to canvas
+        # Bind mousewheel to whichever calendar is showing
         def _on_mousewheel(event):
-            canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+            target = self.calendar_grid if self.calendar_mode == 'canvas' else canvas
+            target.yview_scroll(int(-1*(event.delta/120)), "units")
         canvas.bind_all("<MouseWheel>", _on_mousewheel)
     
+    def show_calendar_grid(self):
+        """Show the canvas-drawn calendar in place of the widget calendar."""
+        if self.calendar_grid is None:
+            self.calendar_grid_frame = tk.Frame(self.calendar_frame, bg='white')
+            self.calendar_grid_title = tk.Label(self.calendar_grid_frame,
+                                                font=("Arial", 18, "bold"),
+                                                fg='white',
+                                                bg='#007bff')
+            self.calendar_grid_title.pack(fill=tk.X, padx=20, pady=(20, 0), ipady=15)
+            self.calendar_grid = CalendarCanvas(self.calendar_grid_frame, self.toggle_grid_cell)
+            self.calendar_grid.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
+        
+        if self.calendar_mode != 'canvas':
+            self.calendar_canvas.pack_forget()
+            self.calendar_scrollbar.pack_forget()
+            self.calendar_grid_frame.pack(fill=tk.BOTH, expand=True)
+            self.calendar_mode = 'canvas'
+    
+    def show_calendar_widgets(self):
+        """Show the widget calendar in place of the canvas-drawn calendar."""
+        if self.calendar_mode != 'widgets':
+            self.calendar_grid_frame.pack_forget()
+            self.calendar_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+            self.calendar_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            self.calendar_mode = 'widgets'
+    
     def setup_charts_tab(self):
         """Set up the charts view tab."""
         # Charts control frame
@@ -369,19 +525,98 @@ class ModernHabitTrackerGUI:
         self.habit_dropdown.pack(side=tk.LEFT, padx=(0, 10))
         self.habit_dropdown.bind('<<ComboboxSelected>>', self.update_chart)
         
+        # Correlations are computed across every habit, so only on request
+        tk.Button(controls_frame, text="🔗 Habit Correlations",
+                 command=self.update_correlations,
+                 bg='#6f42c1', fg='white', bd=0,
+                 padx=10, pady=5, font=("Arial", 10, "bold")).pack(side=tk.RIGHT)
+        
         # Chart frame
         self.chart_frame = ttk.Frame(self.charts_frame)
         self.chart_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
+        self.chart_message = tk.Label(self.chart_frame, font=("Arial", 12), fg='#6c757d')
+        
+        # Correlation heatmap frame, filled by update_correlations()
+        self.heatmap_frame = ttk.Frame(self.charts_frame)
+        self.heatmap_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
+    
+    def update_calendar(self, on_done=None):
+        """Update the modern calendar display.
+        
+        Month data is loaded in the background. A loading placeholder is
+        shown while the widgets need rebuilding, and data from a request that
+        was superseded (e.g. by another month switch) is discarded.
+        
+        Args:
+            on_done (Callable, optional): Called once the calendar shows the loaded data
+        """
+        if not self.habits:
+            self.async_manager.cancel('calendar')
+            self.render_calendar({})
+            if on_done is not None:
+                on_done()
+            return
+        
+        calendar_key = (self.current_year, self.current_month,
+                        tuple((habit['id'], habit['name']) for habit in self.habits))
+        if calendar_key != self.calendar_key:
+            self.show_calendar_loading()
+        
+        def month_loaded(month_data):
+            self.render_calendar(month_data)
+            if on_done is not None:
+                on_done()
+        
+        self.async_manager.call('get_month_data', self.current_year, self.current_month, self.habits,
+                                on_success=month_loaded, channel='calendar')
     
-    def update_calendar(self):
-        """Update the modern calendar display."""
+    def show_calendar_loading(self):
+        """Show a placeholder while month data for a new calendar is loading."""
+        if self.calendar_mode == 'canvas' and len(self.habits) >= GUI_CONFIG.get('canvas_calendar_threshold', 100):
+            self.calendar_grid_title.config(text="⏳ Loading...")
+            return
+        
+        self.calendar_key = None
+        self.show_calendar_widgets()
+        for widget in self.scrollable_frame.winfo_children():
+            widget.destroy()
+        self.checkboxes.clear()
+        self.calendar_rows.clear()
+        
+        tk.Label(self.scrollable_frame,
+                text="⏳ Loading calendar...",
+                font=("Arial", 14),
+                fg='#6c757d',
+                bg='white').pack(padx=20, pady=40)
+    
+    def render_calendar(self, month_data):
+        """Draw the calendar for the current month from loaded month data.
+        
+        Widgets are only rebuilt when the month or the habit set changes;
+        otherwise the existing checkboxes and totals are refreshed in place.
+        Habit sets of GUI_CONFIG['canvas_calendar_threshold'] or more are
+        drawn on a single virtualized canvas instead of one widget per cell.
+        """
+        calendar_key = (self.current_year, self.current_month,
+                        tuple((habit['id'], habit['name']) for habit in self.habits))
+        if calendar_key == self.calendar_key and (self.calendar_rows or self.calendar_mode == 'canvas'):
+            if self.calendar_mode == 'canvas':
+                self.calendar_grid.set_month_data(month_data)
+            else:
+                self.apply_month_data(month_data)
+            self.prefetch_adjacent()
+            return
+        self.calendar_key = calendar_key
+        
         # Clear existing widgets
         for widget in self.scrollable_frame.winfo_children():
             widget.destroy()
         
         self.checkboxes.clear()
+        self.calendar_rows.clear()
         
         if not self.habits:
+            self.show_calendar_widgets()
             no_habits_frame = tk.Frame(self.scrollable_frame, bg='white')
             no_habits_frame.pack(expand=True, fill=tk.BOTH)
             
@@ -401,13 +636,21 @@ class ModernHabitTrackerGUI:
         
         # Get number of days in current month
         days_in_month = calendar.monthrange(self.current_year, self.current_month)[1]
+        month_title = f"📅 {calendar.month_name[self.current_month].upper()} {self.current_year}"
+        
+        if len(self.habits) >= GUI_CONFIG.get('canvas_calendar_threshold', 100):
+            self.show_calendar_grid()
+            self.calendar_grid_title.config(text=month_title)
+            self.calendar_grid.set_data(self.habits, days_in_month, month_data)
+            self.prefetch_adjacent()
+            return
+        self.show_calendar_widgets()
         
         # Create modern calendar header
         header_frame = tk.Frame(self.scrollable_frame, bg='#007bff', relief=tk.SOLID, bd=1)
         header_frame.pack(fill=tk.X, padx=20, pady=(20, 0))
         
         # Month title
-        month_title = f"📅 {calendar.month_name[self.current_month].upper()} {self.current_year}"
         tk.Label(header_frame, 
                 text=month_title, 
                 font=("Arial", 18, "bold"),
@@ -443,12 +686,26 @@ class ModernHabitTrackerGUI:
         tk.Label(days_header, text="TOTAL", font=("Arial", 10, "bold"), 
                 bg='#e9ecef').grid(row=0, column=days_in_month + 1, padx=10, pady=10, sticky="ew")
         
-        # Get month data
-        month_data = self.habit_manager.get_month_data(self.current_year, self.current_month)
-        
         # Create habit rows
         for row_idx, habit in enumerate(self.habits):
             self.create_habit_row(grid_frame, habit, row_idx, days_in_month, month_data)
+        
+        self.prefetch_adjacent()
+    
+    def prefetch_adjacent(self):
+        """Load the neighbouring months and the selected chart in the background."""
+        if self.prefetcher is None or not self.habits:
+            return
+        self.prefetcher.request(self.current_year, self.current_month, self.habits,
+                                self.selected_habit_id())
+    
+    def selected_habit_id(self):
+        """Get the ID of the habit selected in the charts dropdown, if any."""
+        selected_text = self.habit_var.get()
+        try:
+            return int(selected_text.split("ID: ")[1].split(")")[0])
+        except (IndexError, ValueError):
+            return None
     
     def create_habit_row(self, parent, habit, row_idx, days_in_month, month_data):
         """Create a modern row for each habit in the calendar."""
@@ -504,14 +761,60 @@ class ModernHabitTrackerGUI:
                              bg=row_bg,
                              fg='#007bff')
         total_label.grid(row=0, column=days_in_month + 1, padx=10, pady=10, sticky="ew")
+        
+        self.calendar_rows[habit_id] = total_label
+    
+    def update_row_total(self, habit_id: int):
+        """Recount the completed days of one calendar row and update its total."""
+        total_label = self.calendar_rows.get(habit_id)
+        if total_label is None:
+            return
+        days_in_month = calendar.monthrange(self.current_year, self.current_month)[1]
+        completion_count = sum(1 for day in range(1, days_in_month + 1)
+                               if self.checkboxes[(habit_id, day)].get())
+        total_label.config(text=f"{completion_count}/{days_in_month}")
+    
+    def apply_month_data(self, month_data):
+        """Refresh existing calendar checkboxes and totals from month data."""
+        for (habit_id, day), var in self.checkboxes.items():
+            is_completed = month_data.get(day, {}).get(habit_id, False)
+            if var.get() != is_completed:
+                var.set(is_completed)
+        for habit_id in self.calendar_rows:
+            self.update_row_total(habit_id)
     
     def toggle_completion(self, habit_id: int, day: int, var: tk.BooleanVar):
-        """Toggle habit completion for a specific day."""
-        completion_date = date(self.current_year, self.current_month, day)
-        new_status = self.habit_manager.toggle_habit_completion(habit_id, completion_date)
-        var.set(new_status)
-        # Refresh the calendar to update totals
-        self.update_calendar()
+        """Toggle habit completion for a specific day.
+        
+        The checkbox has already flipped; the saved state is applied once the
+        background write returns.
+        """
+        year, month = self.current_year, self.current_month
+        # Only the toggled cell and its row total change
+        self.update_row_total(habit_id)
+        
+        def apply_status(new_status):
+            if (year, month) != (self.current_year, self.current_month):
+                return
+            if self.checkboxes.get((habit_id, day)) is not var:
+                return
+            var.set(new_status)
+            self.update_row_total(habit_id)
+        
+        self.async_manager.call('toggle_habit_completion', habit_id, date(year, month, day),
+                                on_success=apply_status)
+    
+    def toggle_grid_cell(self, habit_id: int, day: int):
+        """Toggle habit completion for a cell clicked on the canvas calendar."""
+        year, month = self.current_year, self.current_month
+        self.calendar_grid.set_cell(habit_id, day, not self.calendar_grid.get_cell(habit_id, day))
+        
+        def apply_status(new_status):
+            if (year, month) == (self.current_year, self.current_month) and self.calendar_mode == 'canvas':
+                self.calendar_grid.set_cell(habit_id, day, new_status)
+        
+        self.async_manager.call('toggle_habit_completion', habit_id, date(year, month, day),
+                                on_success=apply_status)
     
     def add_habit(self):
         """Add a new habit using modern dialog."""
@@ -521,12 +824,17 @@ class ModernHabitTrackerGUI:
             
             if dialog.result:
                 name, description = dialog.result
-                if self.habit_manager.add_new_habit(name, description):
-                    messagebox.showinfo("Success", f"✅ Habit '{name}' added successfully!")
-                    self.refresh_habits()
-                    self.update_calendar()
-                else:
-                    messagebox.showerror("Error", "❌ Failed to add habit. Name might already exist.")
+                
+                def habit_added(success):
+                    if success:
+                        messagebox.showinfo("Success", f"✅ Habit '{name}' added successfully!")
+                        self.refresh_habits(on_done=self.update_calendar)
+                    else:
+                        messagebox.showerror("Error", "❌ Failed to add habit. Name might already exist.")
+                
+                self.async_manager.call('add_new_habit', name, description, on_success=habit_added,
+                                        on_error=lambda e: messagebox.showerror(
+                                            "Error", f"❌ Error adding habit: {str(e)}"))
         except Exception as e:
             messagebox.showerror("Error", f"❌ Error adding habit: {str(e)}")
     
@@ -538,12 +846,18 @@ class ModernHabitTrackerGUI:
             
             if dialog.result:
                 name, description = dialog.result
-                if self.habit_manager.update_habit(habit['id'], name, description):
-                    messagebox.showinfo("Success", f"✅ Habit '{name}' updated successfully!")
-                    self.refresh_habits()
-                    self.update_calendar()
-                else:
-                    messagebox.showerror("Error", "❌ Failed to update habit.")
+                
+                def habit_updated(success):
+                    if success:
+                        messagebox.showinfo("Success", f"✅ Habit '{name}' updated successfully!")
+                        self.refresh_habits(on_done=self.update_calendar)
+                    else:
+                        messagebox.showerror("Error", "❌ Failed to update habit.")
+                
+                self.async_manager.call('update_habit', habit['id'], name, description,
+                                        on_success=habit_updated,
+                                        on_error=lambda e: messagebox.showerror(
+                                            "Error", f"❌ Error editing habit: {str(e)}"))
         except Exception as e:
             messagebox.showerror("Error", f"❌ Error editing habit: {str(e)}")
     
@@ -551,69 +865,83 @@ class ModernHabitTrackerGUI:
         """Delete a habit with confirmation."""
         if messagebox.askyesno("Confirm Delete", 
                              f"🗑️ Are you sure you want to delete '{habit['name']}'?\n\nThis will remove all progress data."):
-            if self.habit_manager.delete_habit(habit['id']):
-                messagebox.showinfo("Success", f"✅ Habit '{habit['name']}' deleted successfully!")
-                self.refresh_habits()
-                self.update_calendar()
-            else:
-                messagebox.showerror("Error", "❌ Failed to delete habit.")
+            def habit_deleted(success):
+                if success:
+                    messagebox.showinfo("Success", f"✅ Habit '{habit['name']}' deleted successfully!")
+                    self.refresh_habits(on_done=self.update_calendar)
+                else:
+                    messagebox.showerror("Error", "❌ Failed to delete habit.")
+            
+            self.async_manager.call('delete_habit', habit['id'], on_success=habit_deleted)
     
-    def update_chart(self, event=None):
-        """Update the progress chart with modern line chart style."""
-        # Clear existing chart
-        for widget in self.chart_frame.winfo_children():
-            widget.destroy()
-        
-        if not self.habits or not self.habit_var.get():
+    def update_chart(self, event=None, on_done=None):
+        """Load the selected habit's chart data in the background and draw it.
+        
+        Args:
+            event: Tk event when bound to the habit dropdown
+            on_done (Callable, optional): Called once the chart shows the loaded data
+        """
+        # Nothing is drawn until the charts tab has been opened
+        if not self.charts_ready:
+            if on_done is not None:
+                on_done()
             return
         
-        # Get selected habit ID
-        selected_text = self.habit_var.get()
-        try:
-            habit_id = int(selected_text.split("ID: ")[1].split(")")[0])
-        except:
-            return
-            
-        habit = self.habit_manager.get_habit_by_id(habit_id)
-        if not habit:
+        habit_id = self.selected_habit_id()
+        habit = next((habit for habit in self.habits if habit['id'] == habit_id), None)
+        if habit is None:
+            self.async_manager.cancel('chart')
+            self.clear_chart()
+            if on_done is not None:
+                on_done()
             return
         
-        # Get habit data for the last 12 months
-        try:
-            chart_data = self.habit_manager.get_habit_chart_data(habit_id, 12)
-        except Exception as e:
-            tk.Label(self.chart_frame, 
-                    text=f"Error loading chart data: {str(e)}",
-                    font=("Arial", 12),
-                    fg='red').pack(expand=True)
-            return
+        # The previous chart stays up until the new data arrives, which is immediate when cached
+        if not self.chart_shown():
+            self.show_chart_message("⏳ Loading chart...")
         
-        if not chart_data:
-            tk.Label(self.chart_frame, 
-                    text="No data available for this habit.",
-                    font=("Arial", 12),
-                    fg='#6c757d').pack(expand=True)
-            return
+        def chart_loaded(chart_data):
+            self.draw_chart(habit, chart_data)
+            if on_done is not None:
+                on_done()
+        
+        # Get habit data for the last 12 months
+        self.async_manager.call('get_habit_chart_data', habit['id'], 12,
+                                on_success=chart_loaded, on_error=self.show_chart_error, channel='chart')
+    
+    def chart_shown(self):
+        """Check whether the chart canvas is currently packed."""
+        return self.chart_canvas is not None and bool(self.chart_canvas.get_tk_widget().winfo_manager())
+    
+    def clear_chart(self):
+        """Hide the chart canvas and message; both are kept for reuse."""
+        if self.chart_canvas is not None:
+            self.chart_canvas.get_tk_widget().pack_forget()
+        self.chart_message.pack_forget()
+    
+    def show_chart_message(self, text, fg='#6c757d'):
+        """Show a message in place of the chart."""
+        self.clear_chart()
+        self.chart_message.config(text=text, fg=fg)
+        self.chart_message.pack(expand=True)
+    
+    def show_chart_error(self, error):
+        """Replace the chart with an error message."""
+        self.show_chart_message(f"Error loading chart data: {str(error)}", fg='red')
+    
+    def build_chart(self):
+        """Create the progress figure and canvas once; draw_chart() only updates them."""
+        Figure, FigureCanvasTkAgg = load_chart_backend()
         
         # Create modern line chart
         fig = Figure(figsize=(12, 6), dpi=100, facecolor='white')
         ax = fig.add_subplot(111)
-        
-        # Prepare data for plotting
-        months = [data['month'] for data in chart_data]
-        percentages = [data['percentage'] for data in chart_data]
-        
-        # Create modern line chart
-        ax.plot(months, percentages, marker='o', linewidth=3, markersize=8, 
-                color='#007bff', markerfacecolor='#007bff', markeredgecolor='white', 
-                markeredgewidth=2, label='Completion %')
-        
-        # Fill area under the line
-        ax.fill_between(months, percentages, alpha=0.2, color='#007bff')
+        line, = ax.plot([], [], marker='o', linewidth=3, markersize=8,
+                        color='#007bff', markerfacecolor='#007bff', markeredgecolor='white',
+                        markeredgewidth=2, label='Completion %')
         
         # Modern chart styling
-        ax.set_title(f"📊 Progress for '{habit['name']}' - Last 12 Months",
-                    fontsize=16, fontweight='bold', pad=20)
+        title = ax.set_title("", fontsize=16, fontweight='bold', pad=20)
         ax.set_xlabel("Month", fontsize=12)
         ax.set_ylabel("Completion Percentage (%)", fontsize=12)
         ax.set_ylim(0, 100)
@@ -621,28 +949,159 @@ class ModernHabitTrackerGUI:
         ax.spines['top'].set_visible(False)
         ax.spines['right'].set_visible(False)
         
-        # Rotate x-axis labels for better readability
-        plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+        # Statistics text, filled in per habit
+        stats = ax.text(0.02, 0.98, "", transform=ax.transAxes, fontsize=11,
+                        verticalalignment='top',
+                        bbox=dict(boxstyle='round,pad=0.5', facecolor='#e9ecef', alpha=0.8))
+        
+        self.chart_canvas = FigureCanvasTkAgg(fig, self.chart_frame)
+        self.chart_artists = {'figure': fig, 'axes': ax, 'line': line, 'fill': None,
+                              'title': title, 'stats': stats}
+        self.chart_months = None
+    
+    def draw_chart(self, habit, chart_data):
+        """Show a habit's progress by updating the data of the shared line chart."""
+        if not habit:
+            self.clear_chart()
+            return
         
-        # Add statistics text
-        if chart_data:
-            latest_data = chart_data[-1]
-            stats_text = f"🎯 Latest Month: {latest_data['completions']}/{latest_data['total_days']} days ({latest_data['percentage']}%)"
-            ax.text(0.02, 0.98, stats_text, transform=ax.transAxes, fontsize=11, 
-                    verticalalignment='top', 
-                    bbox=dict(boxstyle='round,pad=0.5', facecolor='#e9ecef', alpha=0.8))
+        if not chart_data:
+            self.show_chart_message("No data available for this habit.")
+            return
         
-        # Adjust layout to prevent label cutoff
-        fig.tight_layout()
+        if self.chart_canvas is None:
+            self.build_chart()
+        artists = self.chart_artists
+        ax = artists['axes']
+        
+        # Prepare data for plotting
+        months = [data['month'] for data in chart_data]
+        percentages = [data['percentage'] for data in chart_data]
+        positions = list(range(len(months)))
+        
+        artists['line'].set_data(positions, percentages)
+        # Fill area under the line; a fill has no set_data, so it is replaced
+        if artists['fill'] is not None:
+            artists['fill'].remove()
+        artists['fill'] = ax.fill_between(positions, percentages, alpha=0.2, color='#007bff')
+        
+        artists['title'].set_text(f"📊 Progress for '{habit['name']}' - Last 12 Months")
+        latest_data = chart_data[-1]
+        artists['stats'].set_text(f"🎯 Latest Month: {latest_data['completions']}/{latest_data['total_days']} "
+                                  f"days ({latest_data['percentage']}%)")
+        
+        # Month labels only change when a new month starts, so the layout is redone only then
+        if months != self.chart_months:
+            self.chart_months = months
+            ax.set_xticks(positions)
+            ax.set_xticklabels(months, rotation=45, ha='right')
+            ax.set_xlim(-0.5, len(months) - 0.5)
+            artists['figure'].tight_layout()
+        
+        self.chart_message.pack_forget()
+        if not self.chart_shown():
+            self.chart_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.chart_canvas.draw_idle()
+    
+    def update_correlations(self):
+        """Compute habit correlations in the background and draw them as a heatmap."""
+        for widget in self.heatmap_frame.winfo_children():
+            widget.destroy()
+        
+        if len(self.habits) < 2:
+            tk.Label(self.heatmap_frame,
+                    text="Add at least two habits to compare them.",
+                    font=("Arial", 12),
+                    fg='#6c757d').pack(expand=True)
+            return
+        
+        tk.Label(self.heatmap_frame,
+                text="⏳ Computing correlations...",
+                font=("Arial", 12),
+                fg='#6c757d').pack(expand=True)
+        self.async_manager.call('get_habit_correlations', 90, 5, self.habits,
+                                on_success=self.draw_correlations,
+                                on_error=self.show_correlation_error,
+                                channel='correlations')
+    
+    def show_correlation_error(self, error):
+        """Replace the heatmap with an error message."""
+        for widget in self.heatmap_frame.winfo_children():
+            widget.destroy()
+        tk.Label(self.heatmap_frame,
+                text=f"Error computing correlations: {str(error)}",
+                font=("Arial", 12),
+                fg='red').pack(expand=True)
+    
+    def draw_correlations(self, correlations):
+        """Draw the habit correlation heatmap and list the strongest pairs."""
+        for widget in self.heatmap_frame.winfo_children():
+            widget.destroy()
+        
+        names = {habit['id']: habit['name'] for habit in self.habits}
+        habit_ids = correlations['habit_ids']
         
-        # Create canvas and add to frame
-        canvas = FigureCanvasTkAgg(fig, self.chart_frame)
+        Figure, FigureCanvasTkAgg = load_chart_backend()
+        fig = Figure(figsize=(12, 5), dpi=100, facecolor='white')
+        ax = fig.add_subplot(111)
+        image = ax.imshow(correlations['correlation'], cmap='RdBu_r', vmin=-1, vmax=1,
+                          interpolation='nearest', aspect='auto')
+        fig.colorbar(image, ax=ax, fraction=0.03, pad=0.02)
+        
+        # Label the axes only while the names are still readable
+        if len(habit_ids) <= 30:
+            labels = [names.get(habit_id, str(habit_id)) for habit_id in habit_ids]
+            ax.set_xticks(range(len(labels)))
+            ax.set_yticks(range(len(labels)))
+            ax.set_xticklabels(labels, rotation=45, ha='right', fontsize=8)
+            ax.set_yticklabels(labels, fontsize=8)
+        else:
+            ax.set_xticks([])
+            ax.set_yticks([])
+        ax.set_title("🔗 Habit Correlations - Last 90 Days", fontsize=14, fontweight='bold', pad=15)
+        
+        pair_lines = [f"{names.get(pair['habit_a'], pair['habit_a'])} + "
+                      f"{names.get(pair['habit_b'], pair['habit_b'])}: "
+                      f"r={pair['correlation']:.2f} ({pair['both_completed']} days together)"
+                      for pair in correlations['top_pairs']]
+        
+        fig.tight_layout()
+        canvas = FigureCanvasTkAgg(fig, self.heatmap_frame)
         canvas.draw()
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        if pair_lines:
+            tk.Label(self.heatmap_frame,
+                    text="🏆 Most correlated: " + "   |   ".join(pair_lines),
+                    font=("Arial", 10),
+                    bg='#e9ecef',
+                    wraplength=1100,
+                    justify=tk.LEFT).pack(fill=tk.X, pady=(5, 0))
+    
+    def schedule_write_flush(self):
+        """Flush due write-behind toggles and reschedule the timer."""
+        self.async_manager.call('flush_pending_writes', True)
+        interval_ms = int(self.habit_manager.write_queue.flush_interval * 1000)
+        self.root.after(max(interval_ms // 2, 100), self.schedule_write_flush)
     
     def on_closing(self):
         """Handle application closing."""
+        if self.prefetcher is not None:
+            self.prefetcher.stop()
+        # Runs after every queued write, so nothing clicked before closing is lost
+        try:
+            flushed = self.async_manager.run_sync(self.habit_manager.flush_pending_writes)
+        except Exception:
+            flushed = False
+        if not flushed:
+            messagebox.showwarning("Unsaved Changes",
+                                   "⚠️ Some habit completions could not be saved to the database.")
+        self.async_manager.shutdown()
         self.db_manager.close_connection()
+        if self.profiler is not None:
+            self.profiler.stop()
+            if GUI_CONFIG.get('profiler_trace'):
+                self.profiler.export_trace(GUI_CONFIG['profiler_trace'])
         self.root.destroy()
     
     def run(self):
@@ -0,0 +1,244 @@
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set
+import functools
+import json
+import logging
+import os
+import time
+import tkinter as tk
+
+logger = logging.getLogger(__name__)
+
+# Methods of ModernHabitTrackerGUI that rebuild a view
+PROFILED_VIEWS = [
+    'update_calendar',
+    'render_calendar',
+    'create_habit_row',
+    'update_chart',
+    'draw_chart',
+    'draw_correlations',
+    'refresh_habits_list'
+]
+
+class GuiProfiler:
+    """Opt-in profiler for Tk view rebuilds and main-loop lag.
+    
+    Wrapped view methods are timed on every call. For the outermost call the
+    profiler also counts the widgets created and destroyed under the root and
+    records when Tk next becomes idle, which includes geometry management and
+    redraws. A heartbeat scheduled with after() measures how late the main
+    loop runs it. Everything is shown in a small overlay (F12 toggles it) and
+    can be exported in the Chrome trace event format, readable by
+    chrome://tracing and Perfetto.
+    """
+    
+    def __init__(self, root: tk.Tk, heartbeat_ms: int = 50, max_events: int = 100000):
+        """
+        Initialize the profiler.
+        
+        Args:
+            root (tk.Tk): Application root window
+            heartbeat_ms (int): Interval of the lag heartbeat
+            max_events (int): Trace events kept; older ones are dropped
+        """
+        self.root = root
+        self.heartbeat_ms = heartbeat_ms
+        self.origin = time.perf_counter()
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self.views: Dict[str, Dict[str, Any]] = {}
+        self.lag_samples: Deque[float] = deque(maxlen=max(1, 60000 // heartbeat_ms))  # About a minute
+        self.max_lag = 0.0
+        self.depth = 0
+        self.overlay: Optional[tk.Label] = None
+        self._heartbeat_due: Optional[float] = None
+        self._running = False
+    
+    def _timestamp(self, moment: float) -> int:
+        """Microseconds since the profiler started, as used by trace events."""
+        return int((moment - self.origin) * 1000000)
+    
+    def _widgets(self) -> Set[Any]:
+        """Collect every widget under the root from Tkinter's own bookkeeping, without Tcl calls."""
+        # Widget objects rather than paths, so a widget recreated under the same name counts
+        widgets: Set[Any] = set()
+        pending: List[Any] = [self.root]
+        while pending:
+            widget = pending.pop()
+            for child in widget.children.values():
+                widgets.add(child)
+                pending.append(child)
+        return widgets
+    
+    def instrument(self, target: Any, names: Iterable[str] = PROFILED_VIEWS) -> None:
+        """
+        Replace view methods on an object with timed wrappers.
+        
+        Must run before the methods are handed out as callbacks (e.g. as a
+        button command), since those keep a reference to the original.
+        
+        Args:
+            target: Object whose methods are wrapped, usually the GUI
+            names (Iterable[str]): Method names to wrap
+        """
+        for name in names:
+            method = getattr(target, name, None)
+            if method is not None:
+                setattr(target, name, self.wrap(name, method))
+    
+    def wrap(self, name: str, method: Callable[..., Any]) -> Callable[..., Any]:
+        """Return a wrapper that times method as the view called name."""
+        @functools.wraps(method)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            outermost = self.depth == 0
+            before = self._widgets() if outermost else None
+            self.depth += 1
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                finished = time.perf_counter()
+                self.depth -= 1
+                created = destroyed = None
+                if before is not None:
+                    after = self._widgets()
+                    created, destroyed = len(after - before), len(before - after)
+                self._record_view(name, started, finished, created, destroyed)
+                if outermost:
+                    self.root.after_idle(lambda: self._record_idle(name, finished))
+        return wrapper
+    
+    def _record_view(self, name: str, started: float, finished: float,
+                     created: Optional[int], destroyed: Optional[int]) -> None:
+        """Add one view call to the summary and the trace."""
+        stats = self.views.get(name)
+        if stats is None:
+            stats = self.views[name] = {'calls': 0, 'total_ms': 0.0, 'last_ms': 0.0, 'max_ms': 0.0,
+                                        'idle_ms': 0.0, 'created': 0, 'destroyed': 0,
+                                        'last_created': 0, 'last_destroyed': 0}
+        elapsed_ms = (finished - started) * 1000
+        stats['calls'] += 1
+        stats['total_ms'] += elapsed_ms
+        stats['last_ms'] = elapsed_ms
+        stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+        args: Dict[str, Any] = {}
+        if created is not None:
+            stats['created'] += created
+            stats['destroyed'] += destroyed
+            stats['last_created'] = created
+            stats['last_destroyed'] = destroyed
+            args = {'widgets_created': created, 'widgets_destroyed': destroyed}
+        self.events.append({'name': name, 'cat': 'view', 'ph': 'X', 'pid': os.getpid(), 'tid': 1,
+                            'ts': self._timestamp(started),
+                            'dur': self._timestamp(finished) - self._timestamp(started),
+                            'args': args})
+    
+    def _record_idle(self, name: str, finished: float) -> None:
+        """Record the time from the end of a rebuild until Tk was idle again."""
+        idle = time.perf_counter()
+        if name in self.views:
+            self.views[name]['idle_ms'] = (idle - finished) * 1000
+        self.events.append({'name': f"{name} (idle redraw)", 'cat': 'idle', 'ph': 'X',
+                            'pid': os.getpid(), 'tid': 1, 'ts': self._timestamp(finished),
+                            'dur': self._timestamp(idle) - self._timestamp(finished), 'args': {}})
+    
+    def start(self) -> None:
+        """Start the lag heartbeat and create the overlay (hidden until F12)."""
+        if self._running:
+            return
+        self._running = True
+        self._heartbeat_due = time.perf_counter() + self.heartbeat_ms / 1000
+        self.root.after(self.heartbeat_ms, self._heartbeat)
+        self.overlay = tk.Label(self.root, font=("Courier", 9), justify=tk.LEFT, anchor='w',
+                                bg='#212529', fg='#f8f9fa', padx=6, pady=4)
+        self.root.bind_all('<F12>', lambda event: self.toggle_overlay())
+        self._refresh_overlay()
+    
+    def stop(self) -> None:
+        """Stop the heartbeat and overlay updates."""
+        self._running = False
+    
+    def _heartbeat(self) -> None:
+        """Measure how late this callback ran and schedule the next one."""
+        if not self._running:
+            return
+        now = time.perf_counter()
+        lag = max(0.0, now - (self._heartbeat_due or now))
+        self.lag_samples.append(lag)
+        self.max_lag = max(self.max_lag, lag)
+        self.events.append({'name': 'main loop lag', 'ph': 'C', 'pid': os.getpid(),
+                            'ts': self._timestamp(now), 'args': {'lag_ms': round(lag * 1000, 3)}})
+        self._heartbeat_due = now + self.heartbeat_ms / 1000
+        self.root.after(self.heartbeat_ms, self._heartbeat)
+    
+    def lag_percentile(self, fraction: float) -> float:
+        """Return a percentile (0-1) of the recent main-loop lag in milliseconds."""
+        if not self.lag_samples:
+            return 0.0
+        ordered = sorted(self.lag_samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000
+    
+    def summary(self) -> Dict[str, Any]:
+        """
+        Return the collected statistics.
+        
+        Returns:
+            Dict: {'views': {name: stats}, 'lag': {'p50_ms', 'p95_ms', 'max_ms'}}.
+            View stats hold calls, total/last/max milliseconds, the idle redraw
+            time of the last call and widget counts (outermost calls only).
+        """
+        return {
+            'views': {name: dict(stats) for name, stats in self.views.items()},
+            'lag': {
+                'p50_ms': round(self.lag_percentile(0.50), 3),
+                'p95_ms': round(self.lag_percentile(0.95), 3),
+                'max_ms': round(self.max_lag * 1000, 3)
+            }
+        }
+    
+    def toggle_overlay(self) -> None:
+        """Show or hide the overlay."""
+        if self.overlay is None:
+            return
+        if self.overlay.winfo_ismapped():
+            self.overlay.place_forget()
+        else:
+            self.overlay.place(relx=1.0, rely=1.0, x=-8, y=-8, anchor='se')
+            self.overlay.lift()
+    
+    def _refresh_overlay(self) -> None:
+        """Redraw the overlay text twice a second while it is visible."""
+        if not self._running or self.overlay is None:
+            return
+        if self.overlay.winfo_ismapped():
+            lines = [f"loop lag p50 {self.lag_percentile(0.5):6.1f} ms  "
+                     f"p95 {self.lag_percentile(0.95):6.1f} ms  max {self.max_lag * 1000:6.1f} ms"]
+            for name, stats in sorted(self.views.items()):
+                lines.append(f"{name:<20} last {stats['last_ms']:7.1f} ms  idle {stats['idle_ms']:6.1f} ms  "
+                             f"+{stats['last_created']}/-{stats['last_destroyed']} widgets  x{stats['calls']}")
+            self.overlay.config(text="\n".join(lines))
+            self.overlay.lift()
+        self.root.after(500, self._refresh_overlay)
+    
+    def export_trace(self, path: str) -> bool:
+        """
+        Write the recorded events as a Chrome trace file.
+        
+        Args:
+            path (str): Output JSON file
+        
+        Returns:
+            bool: True if written, False otherwise
+        """
+        trace = {
+            'traceEvents': list(self.events),
+            'displayTimeUnit': 'ms',
+            'otherData': {'summary': self.summary()}
+        }
+        try:
+            with open(path, 'w', encoding='utf-8') as handle:
+                json.dump(trace, handle)
+            logger.info(f"GUI profile trace written to {path}")
+            return True
+        except OSError as e:
+            logger.error(f"Error writing GUI profile trace: {e}")
+            return False
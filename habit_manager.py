@@ -1,20 +1,220 @@
 from datetime import datetime, date, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import Any, List, Dict, Optional, Tuple
 import calendar
-from database import DatabaseManager
+from storage import StorageBackend
+from write_queue import ToggleWriteQueue
+from cache import LRUCache
+from streaks import StreakIndex
+from bitmap import HabitLogBitmap
+from instrumentation import track_operation
 
 class HabitManager:
     """Business logic for habit tracking operations."""
     
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: StorageBackend, write_queue: Optional[ToggleWriteQueue] = None,
+                 cache_size: int = 24):
         """
         Initialize HabitManager with database manager.
         
         Args:
-            db_manager (DatabaseManager): Database manager instance
+            db_manager (StorageBackend): Storage backend instance
+            write_queue (ToggleWriteQueue, optional): Write-behind queue for toggles.
+                When given, toggles are buffered and written in batches.
+            cache_size (int): Number of months kept in the month cache
         """
         self.db_manager = db_manager
+        self.write_queue = write_queue
+        # {(year, month): {'month_data': ..., 'habit_ids': frozenset of the habits in month_data,
+        #                  'progress': {habit_id: ...}, 'stats': {habit_id: ...}}}
+        self.month_cache = LRUCache(cache_size)
+        # {(habit_id, months_back, (year, month) of the newest month): chart data}
+        self.chart_cache = LRUCache(cache_size)
+        # Run-length encoded completion history, loaded per habit on first use
+        self.streak_index = StreakIndex()
+        # {habit_id: HabitLogBitmap}, filled by load_log_bitmaps()
+        self.log_bitmaps: Dict[int, HabitLogBitmap] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Write counters used to reject data that was loaded before a write
+        self._habit_set_version = 0
+        self._write_count = 0
+        self._month_writes: Dict[Tuple[int, int], int] = {}
     
+    def _month_entry(self, year: int, month: int) -> Dict:
+        """Get the cache entry for a month, creating an empty one if needed."""
+        entry = self.month_cache.get((year, month))
+        if entry is None:
+            entry = {'month_data': None, 'habit_ids': None, 'progress': {}, 'stats': {}}
+            self.month_cache.put((year, month), entry)
+        return entry
+    
+    def _record_cache_lookup(self, hit: bool) -> None:
+        """Count a month cache hit or miss."""
+        if hit:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        Get month cache counters.
+        
+        Returns:
+            Dict: hits, misses, cached months and the cache capacity
+        """
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'entries': len(self.month_cache),
+            'max_entries': self.month_cache.max_entries,
+            'bitmap_habits': len(self.log_bitmaps),
+            'bitmap_bytes': sum(bitmap.nbytes for bitmap in self.log_bitmaps.values())
+        }
+    
+    def clear_cache(self) -> None:
+        """Drop every cached month, e.g. after the database was changed externally."""
+        # Data loaded before the clear, e.g. by a running prefetch, must not be stored afterwards
+        self._habit_set_version += 1
+        self.month_cache.clear()
+        self.chart_cache.clear()
+        self.streak_index.clear()
+        self.log_bitmaps.clear()
+    
+    @track_operation
+    def load_log_bitmaps(self, habits: Optional[List[Dict]] = None) -> int:
+        """
+        Keep the full completion history of habits resident as bitmaps.
+        
+        Once every habit of a month is resident, get_month_data() is answered
+        from memory without a query, and statistics, streaks and analytics
+        read the bitmaps too. 1,000 habits with ten years of history take well
+        under 1 MB. Habits that are already resident are skipped, since
+        toggles keep their bitmaps current; clear_cache() drops them all.
+        
+        Args:
+            habits (List[Dict], optional): Habits to load, all active habits if omitted
+            
+        Returns:
+            int: Number of habits loaded
+        """
+        if habits is None:
+            habits = self.get_habits()
+        habits = [habit for habit in habits if habit['id'] not in self.log_bitmaps]
+        if not habits:
+            return 0
+        # The bitmaps are loaded from the database, so queued toggles must land first
+        self.flush_pending_writes()
+        completed = self.db_manager.get_completed_dates_for_habits([habit['id'] for habit in habits])
+        for habit in habits:
+            start = habit.get('created_date') or date.today()
+            self.log_bitmaps[habit['id']] = HabitLogBitmap.from_dates(start, completed.get(habit['id'], []))
+        return len(habits)
+    
+    def data_version(self, year: Optional[int] = None, month: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Get a token that changes whenever data for a month (or any month) is written.
+        
+        Args:
+            year (int, optional): Year
+            month (int, optional): Month (1-12); omit both for the whole account
+            
+        Returns:
+            Tuple[int, int]: Opaque version token
+        """
+        if year is None or month is None:
+            return (self._habit_set_version, self._write_count)
+        return (self._habit_set_version, self._month_writes.get((year, month), 0))
+    
+    def is_month_cached(self, year: int, month: int) -> bool:
+        """Check whether the month grid is cached, without counting a lookup."""
+        entry = self.month_cache.get((year, month))
+        return entry is not None and entry['month_data'] is not None
+    
+    def is_chart_cached(self, habit_id: int, months_back: int = 12) -> bool:
+        """Check whether chart data for a habit is cached, without counting a lookup."""
+        return self._chart_key(habit_id, months_back) in self.chart_cache
+    
+    def prime_month_data(self, year: int, month: int, month_data: Dict[int, Dict[int, bool]],
+                         version: Tuple[int, int]) -> bool:
+        """
+        Store month data loaded elsewhere, e.g. by a background prefetch.
+        
+        Args:
+            year (int): Year
+            month (int): Month (1-12)
+            month_data (Dict): {day: {habit_id: completion_status}}
+            version (Tuple[int, int]): data_version(year, month) taken before loading
+            
+        Returns:
+            bool: True if stored, False if a write made the data stale
+        """
+        if version != self.data_version(year, month):
+            return False
+        entry = self._month_entry(year, month)
+        if entry['month_data'] is None:
+            days_in_month = calendar.monthrange(year, month)[1]
+            self._apply_pending(list(month_data.get(1, {})), date(year, month, 1),
+                                date(year, month, days_in_month), month_data)
+            entry['month_data'] = month_data
+            entry['habit_ids'] = frozenset(month_data.get(1, {}))
+        return True
+    
+    def prime_chart_data(self, habit_id: int, chart_data: List[Dict], version: Tuple[int, int],
+                         months_back: int = 12) -> bool:
+        """
+        Store chart data loaded elsewhere, e.g. by a background prefetch.
+        
+        Args:
+            habit_id (int): Habit ID
+            chart_data (List[Dict]): Result of get_habit_chart_data
+            version (Tuple[int, int]): data_version() taken before loading
+            months_back (int): Number of months the chart data covers
+            
+        Returns:
+            bool: True if stored, False if a write made the data stale
+        """
+        if version != self.data_version() or (self.write_queue is not None and len(self.write_queue)):
+            return False
+        self.chart_cache.put(self._chart_key(habit_id, months_back), chart_data)
+        return True
+    
+    def _chart_key(self, habit_id: int, months_back: int) -> Tuple[int, int, Tuple[int, int]]:
+        today = date.today()
+        return (habit_id, months_back, (today.year, today.month))
+    
+    def _drop_chart_data(self, habit_id: int) -> None:
+        """Drop every cached chart of a habit."""
+        for key, _ in self.chart_cache.items():
+            # Chart keys are (habit_id, months_back, (year, month)), see _chart_key()
+            if isinstance(key, tuple) and key[0] == habit_id:
+                self.chart_cache.pop(key)
+    
+    def _cache_toggle(self, habit_id: int, completion_date: date, completed: bool) -> None:
+        """Write a completion change through to the cached month it belongs to."""
+        month_key = (completion_date.year, completion_date.month)
+        self._write_count += 1
+        self._month_writes[month_key] = self._month_writes.get(month_key, 0) + 1
+        self._drop_chart_data(habit_id)
+        self.streak_index.update(habit_id, completion_date, completed)
+        bitmap = self.log_bitmaps.get(habit_id)
+        if bitmap is not None:
+            bitmap.set(completion_date, completed)
+        
+        # Streaks run across month boundaries, so any month's statistics may change
+        for _, cached_entry in self.month_cache.items():
+            cached_entry['stats'].pop(habit_id, None)
+        
+        entry = self.month_cache.get(month_key)
+        if entry is None:
+            return
+        day = completion_date.day
+        if entry['month_data'] is not None and habit_id in entry['habit_ids']:
+            entry['month_data'][day][habit_id] = completed
+        progress = entry['progress'].get(habit_id)
+        if progress is not None:
+            progress[day - 1] = (day, completed)
+    
+    @track_operation
     def add_new_habit(self, name: str, description: str = "") -> bool:
         """
         Add a new habit with validation.
@@ -35,12 +235,21 @@ class HabitManager:
             if habit['name'].lower() == name.strip().lower():
                 return False
         
-        return self.db_manager.add_habit(name.strip(), description.strip())
+        if not self.db_manager.add_habit(name.strip(), description.strip()):
+            return False
+        
+        # Cached month grids do not contain the new habit yet
+        self._habit_set_version += 1
+        for _, entry in self.month_cache.items():
+            entry['month_data'] = None
+        return True
     
+    @track_operation
     def get_habits(self) -> List[Dict]:
         """Get all active habits."""
         return self.db_manager.get_all_habits()
     
+    @track_operation
     def update_habit(self, habit_id: int, name: str, description: str = "") -> bool:
         """
         Update habit with validation.
@@ -56,8 +265,10 @@ class HabitManager:
         if not name or not name.strip():
             return False
         
+        # Cached data is keyed by habit ID, so renaming leaves it valid
         return self.db_manager.update_habit(habit_id, name.strip(), description.strip())
     
+    @track_operation
     def delete_habit(self, habit_id: int) -> bool:
         """
         Delete a habit with validation.
@@ -68,8 +279,24 @@ class HabitManager:
         Returns:
             bool: True if successful, False otherwise
         """
-        return self.db_manager.delete_habit(habit_id)
+        if self.write_queue is not None:
+            self.write_queue.discard_habit(habit_id)
+        if not self.db_manager.delete_habit(habit_id):
+            return False
+        
+        self._habit_set_version += 1
+        self._drop_chart_data(habit_id)
+        self.streak_index.discard(habit_id)
+        self.log_bitmaps.pop(habit_id, None)
+        for _, entry in self.month_cache.items():
+            if entry['month_data'] is not None:
+                for day_data in entry['month_data'].values():
+                    day_data.pop(habit_id, None)
+            entry['progress'].pop(habit_id, None)
+            entry['stats'].pop(habit_id, None)
+        return True
     
+    @track_operation
     def toggle_habit_completion(self, habit_id: int, completion_date: date) -> bool:
         """
         Toggle habit completion status for a specific date.
@@ -81,51 +308,123 @@ class HabitManager:
         Returns:
             bool: New completion status
         """
-        current_status = self.db_manager.get_habit_completion_status(habit_id, completion_date)
+        # A cached month grid is kept in sync with every write, so it can answer
+        # the current status without a round trip
+        entry = self.month_cache.get((completion_date.year, completion_date.month))
+        month_data = entry['month_data'] if entry is not None else None
+        if month_data is not None and habit_id in month_data[completion_date.day]:
+            current_status = month_data[completion_date.day][habit_id]
+        else:
+            current_status = self.get_habit_completion_status(habit_id, completion_date)
         new_status = not current_status
         
+        if self.write_queue is not None:
+            self.write_queue.enqueue(habit_id, completion_date, new_status)
+            self._cache_toggle(habit_id, completion_date, new_status)
+            return new_status
+        
         success = self.db_manager.log_habit_completion(habit_id, completion_date, new_status)
-        return new_status if success else current_status
+        if not success:
+            return current_status
+        self._cache_toggle(habit_id, completion_date, new_status)
+        return new_status
     
+    @track_operation
     def get_habit_completion_status(self, habit_id: int, completion_date: date) -> bool:
         """Check if habit was completed on a specific date."""
+        if self.write_queue is not None:
+            pending = self.write_queue.get_pending(habit_id, completion_date)
+            if pending is not None:
+                return pending
         return self.db_manager.get_habit_completion_status(habit_id, completion_date)
     
-    def get_month_data(self, year: int, month: int) -> Dict[int, Dict[str, bool]]:
+    @track_operation
+    def flush_pending_writes(self, only_if_due: bool = False) -> bool:
+        """
+        Write buffered toggles to the database.
+        
+        Args:
+            only_if_due (bool): Skip the flush unless the flush interval has elapsed
+            
+        Returns:
+            bool: True if nothing is left unwritten, False if the flush failed
+        """
+        if self.write_queue is None:
+            return True
+        if only_if_due:
+            return self.write_queue.flush_if_due()
+        return self.write_queue.flush()
+    
+    def _apply_pending(self, habit_ids: List[int], start_date: date, end_date: date,
+                       month_data: Dict[int, Dict[int, bool]]) -> None:
+        """Overlay queued toggles that have not been written yet onto month data."""
+        if self.write_queue is None:
+            return
+        wanted = set(habit_ids)
+        for (habit_id, completion_date), completed in self.write_queue.pending_items().items():
+            if habit_id in wanted and start_date <= completion_date <= end_date:
+                month_data[completion_date.day][habit_id] = completed
+    
+    @track_operation
+    def get_month_data(self, year: int, month: int,
+                       habits: Optional[List[Dict]] = None) -> Dict[int, Dict[int, bool]]:
         """
         Get completion data for all habits for a specific month.
         
+        Logs for every habit are fetched with a single bulk query. Callers
+        that already hold the active habit list can pass it in to skip the
+        extra habits lookup, making a month switch one round trip. Results
+        are served from the month cache when available. A cached grid is only
+        used for a given habit list if it was built for the same habits.
+        
         Args:
             year (int): Year
             month (int): Month (1-12)
-            
+            habits (List[Dict], optional): All active habits, fetched if omitted
+        
         Returns:
             Dict: {day: {habit_id: completion_status}}
         """
+        entry = self._month_entry(year, month)
+        cached = entry['month_data']
+        if cached is not None and habits is not None:
+            if entry['habit_ids'] != frozenset(habit['id'] for habit in habits):
+                cached = None
+        self._record_cache_lookup(cached is not None)
+        if cached is not None:
+            return cached
+        
+        days_in_month = calendar.monthrange(year, month)[1]
         start_date = date(year, month, 1)
-        end_date = date(year, month, calendar.monthrange(year, month)[1])
+        end_date = date(year, month, days_in_month)
         
-        habits = self.get_habits()
-        month_data = {}
+        if habits is None:
+            habits = self.get_habits()
+        habit_ids = [habit['id'] for habit in habits]
+        entry['habit_ids'] = frozenset(habit_ids)
         
-        # Initialize all days in month
-        for day in range(1, calendar.monthrange(year, month)[1] + 1):
-            month_data[day] = {}
+        if all(habit_id in self.log_bitmaps for habit_id in habit_ids):
+            # Resident bitmaps already include every toggle, queued or written
+            month_data = {day: {habit_id: self.log_bitmaps[habit_id].get(date(year, month, day))
+                                for habit_id in habit_ids}
+                          for day in range(1, days_in_month + 1)}
+            entry['month_data'] = month_data
+            return month_data
         
-        # Get completion data for each habit
-        for habit in habits:
-            habit_id = habit['id']
-            logs = self.db_manager.get_habit_logs(habit_id, start_date, end_date)
-            
-            # Create a lookup dictionary for logs with proper boolean conversion
-            log_dict = {log['completion_date'].day: bool(log['completed']) for log in logs}
-            
-            # Fill in completion data for each day
-            for day in range(1, calendar.monthrange(year, month)[1] + 1):
-                month_data[day][habit_id] = log_dict.get(day, False)
+        # Initialize every day with every habit marked as not completed
+        month_data = {day: {habit_id: False for habit_id in habit_ids}
+                      for day in range(1, days_in_month + 1)}
         
+        logs_by_habit = self.db_manager.get_logs_for_habits(habit_ids, start_date, end_date)
+        for habit_id, logs in logs_by_habit.items():
+            for log in logs:
+                month_data[log['completion_date'].day][habit_id] = bool(log['completed'])
+        
+        self._apply_pending(habit_ids, start_date, end_date, month_data)
+        entry['month_data'] = month_data
         return month_data
     
+    @track_operation
     def get_habit_progress_data(self, habit_id: int, year: int, month: int) -> List[Tuple[int, bool]]:
         """
         Get progress data for a habit in a specific month.
@@ -138,25 +437,168 @@ class HabitManager:
         Returns:
             List[Tuple[int, bool]]: List of (day, completion_status) tuples
         """
+        entry = self._month_entry(year, month)
+        cached = entry['progress'].get(habit_id)
+        self._record_cache_lookup(cached is not None)
+        if cached is not None:
+            return cached
+        
         start_date = date(year, month, 1)
         end_date = date(year, month, calendar.monthrange(year, month)[1])
         
         logs = self.db_manager.get_habit_logs(habit_id, start_date, end_date)
         log_dict = {log['completion_date'].day: log['completed'] for log in logs}
+        if self.write_queue is not None:
+            for (pending_id, completion_date), completed in self.write_queue.pending_items().items():
+                if pending_id == habit_id and start_date <= completion_date <= end_date:
+                    log_dict[completion_date.day] = completed
         
         progress_data = []
         for day in range(1, calendar.monthrange(year, month)[1] + 1):
             progress_data.append((day, log_dict.get(day, False)))
         
+        entry['progress'][habit_id] = progress_data
         return progress_data
     
+    @track_operation
     def get_habit_statistics(self, habit_id: int, year: int, month: int) -> Dict:
         """Get statistics for a habit in a specific month."""
+        entry = self._month_entry(year, month)
+        cached = entry['stats'].get(habit_id)
+        self._record_cache_lookup(cached is not None)
+        if cached is not None:
+            return cached
+        
         start_date = date(year, month, 1)
         end_date = date(year, month, calendar.monthrange(year, month)[1])
         
-        return self.db_manager.get_habit_statistics(habit_id, start_date, end_date)
+        bitmap = self.log_bitmaps.get(habit_id)
+        if bitmap is not None:
+            # Resident bitmaps already include every toggle, queued or written
+            completed_days = bitmap.count(start_date, end_date)
+        else:
+            # Aggregates are computed in the database, so pending toggles must land first
+            self.flush_pending_writes()
+            counts = self.db_manager.get_monthly_stats([habit_id], start_date, end_date)
+            completed_days = counts.get(habit_id, {}).get((year, month), 0)
+        
+        # Streak as of the end of the month (or today), reaching back across months
+        streaks = self.get_habit_streaks(habit_id, min(end_date, date.today()))
+        
+        total_days = (end_date - start_date).days + 1
+        statistics = {
+            'total_days': total_days,
+            'completed_days': completed_days,
+            'completion_rate': (completed_days / total_days) * 100,
+            'current_streak': streaks['current_streak'],
+            'longest_streak': streaks['longest_streak']
+        }
+        entry['stats'][habit_id] = statistics
+        return statistics
+    
+    @track_operation
+    def get_habit_streaks(self, habit_id: int, as_of: Optional[date] = None) -> Dict[str, int]:
+        """
+        Get the current and longest streak over a habit's whole history.
+        
+        The history is loaded once per habit; later toggles update it in place.
+        
+        Args:
+            habit_id (int): Habit ID
+            as_of (date, optional): Day the current streak is measured at (default: today)
+            
+        Returns:
+            Dict: current_streak and longest_streak in days
+        """
+        if habit_id not in self.streak_index:
+            bitmap = self.log_bitmaps.get(habit_id)
+            if bitmap is not None:
+                self.streak_index.load(habit_id, bitmap.completed_dates())
+            else:
+                self.flush_pending_writes()
+                self.streak_index.load(habit_id, self.db_manager.get_completed_dates(habit_id))
+        return self.streak_index.streaks(habit_id, as_of)
     
+    @track_operation
+    def get_account_analytics(self, days: int = 365,
+                              habits: Optional[List[Dict]] = None) -> Dict[int, Dict]:
+        """
+        Compute rolling rates, weekday distribution, monthly deltas and
+        consistency for every habit at once.
+        
+        History comes from resident bitmaps when all habits are loaded, and
+        from a single bulk query otherwise.
+        
+        Args:
+            days (int): Number of days analysed, ending today
+            habits (List[Dict], optional): Habits to analyse, all active habits if omitted
+            
+        Returns:
+            Dict[int, Dict]: {habit_id: statistics}, see analytics.compute_analytics()
+        """
+        import analytics  # NumPy is only loaded once analytics are requested
+        
+        if habits is None:
+            habits = self.get_habits()
+        start_date, end_date = analytics.analytics_window(days)
+        habit_ids, matrix = self._completion_matrix(habits, start_date, end_date)
+        habit_starts = [habit.get('created_date') or start_date for habit in habits]
+        return analytics.compute_analytics(habit_ids, matrix, start_date, habit_starts)
+    
+    @track_operation
+    def get_habit_correlations(self, days: int = 90, top_k: int = 10,
+                               habits: Optional[List[Dict]] = None) -> Dict:
+        """
+        Find habits that tend to be completed on the same days.
+        
+        Args:
+            days (int): Number of days analysed, ending today
+            top_k (int): Number of most correlated pairs to return
+            habits (List[Dict], optional): Habits to compare, all active habits if omitted
+            
+        Returns:
+            Dict: 'habit_ids' (matrix order), 'correlation' and 'cooccurrence'
+            (habits x habits NumPy arrays) and 'top_pairs', a list of
+            {'habit_a', 'habit_b', 'correlation', 'both_completed'} dicts
+        """
+        import analytics
+        
+        if habits is None:
+            habits = self.get_habits()
+        start_date, end_date = analytics.analytics_window(days)
+        habit_ids, matrix = self._completion_matrix(habits, start_date, end_date)
+        correlation, cooccurrence = analytics.correlation_matrix(matrix)
+        
+        pairs = []
+        for row, column, value in analytics.top_pairs(correlation, top_k):
+            pairs.append({
+                'habit_a': habit_ids[row],
+                'habit_b': habit_ids[column],
+                'correlation': round(value, 3),
+                'both_completed': int(cooccurrence[row, column])
+            })
+        return {
+            'habit_ids': habit_ids,
+            'correlation': correlation,
+            'cooccurrence': cooccurrence,
+            'top_pairs': pairs
+        }
+    
+    def _completion_matrix(self, habits: List[Dict], start_date: date,
+                           end_date: date) -> Tuple[List[int], Any]:
+        """Build the habits x days matrix from resident bitmaps or one bulk query."""
+        import analytics
+        
+        habit_ids = [habit['id'] for habit in habits]
+        if all(habit_id in self.log_bitmaps for habit_id in habit_ids):
+            return analytics.matrix_from_bitmaps(
+                {habit_id: self.log_bitmaps[habit_id] for habit_id in habit_ids}, start_date, end_date)
+        
+        self.flush_pending_writes()
+        completed = self.db_manager.get_completed_dates_for_habits(habit_ids, start_date, end_date)
+        return analytics.completion_matrix(completed, start_date, end_date)
+    
+    @track_operation
     def get_habit_chart_data(self, habit_id: int, months_back: int = 12) -> List[Dict]:
         """
         Get habit completion data for the last N months for charting.
@@ -168,9 +610,17 @@ class HabitManager:
         Returns:
             List[Dict]: List of monthly data with completions and total days
         """
-        chart_data = []
+        chart_key = self._chart_key(habit_id, months_back)
+        cached = self.chart_cache.get(chart_key)
+        self._record_cache_lookup(cached is not None)
+        if cached is not None:
+            return cached
+        
+        self.flush_pending_writes()
+        chart_data: List[Dict] = []
         current_date = datetime.now()
         
+        months = []
         for i in range(months_back, 0, -1):
             # Calculate the target month and year
             target_month = current_date.month - i + 1
@@ -180,16 +630,21 @@ class HabitManager:
             while target_month <= 0:
                 target_month += 12
                 target_year -= 1
-            
+            months.append((target_year, target_month))
+        if not months:
+            return chart_data
+        
+        # One rollup query for the whole horizon, one row per month
+        first_year, first_month = months[0]
+        last_year, last_month = months[-1]
+        counts = self.db_manager.get_monthly_stats([habit_id], date(first_year, first_month, 1),
+                                                   date(last_year, last_month, 1))
+        monthly_counts = counts.get(habit_id, {})
+        
+        for target_year, target_month in months:
             # Get the number of days in the target month
             days_in_month = calendar.monthrange(target_year, target_month)[1]
-            
-            # Get completion data for this month
-            start_date = date(target_year, target_month, 1)
-            end_date = date(target_year, target_month, days_in_month)
-            
-            logs = self.db_manager.get_habit_logs(habit_id, start_date, end_date)
-            completed_days = sum(1 for log in logs if log['completed'])
+            completed_days = monthly_counts.get((target_year, target_month), 0)
             
             # Format month name
             month_name = f"{calendar.month_abbr[target_month]} {target_year}"
@@ -201,8 +656,10 @@ class HabitManager:
                 'percentage': round((completed_days / days_in_month) * 100, 1) if days_in_month > 0 else 0
             })
         
+        self.chart_cache.put(chart_key, chart_data)
         return chart_data
     
+    @track_operation
     def get_habit_by_id(self, habit_id: int) -> Optional[Dict]:
         """
         Get habit by ID.
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Bulk import of historical habit logs from CSV or JSON Lines.
+
+Each record names a habit, a date and optionally whether it was completed:
+    
+    habit,date,completed          {"habit": "Read", "date": "2024-03-01", "completed": true}
+    Read,2024-03-01,1
+
+Usage:
+    python importer.py history.csv
+    python importer.py history.jsonl --batch-size 10000 --commit-interval 5
+"""
+
+from datetime import date
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+
+from storage import StorageBackend, create_storage
+
+logger = logging.getLogger(__name__)
+
+# Try to import configuration
+try:
+    from config import IMPORT_CONFIG
+except ImportError:
+    IMPORT_CONFIG = {
+        'batch_size': 5000,
+        'commit_interval': 10
+    }
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'x', 'done'}
+FALSE_VALUES = {'0', 'false', 'no', 'n', ''}
+
+class HabitImportError(Exception):
+    """Raised when an import cannot continue."""
+
+
+def parse_completed(value: Any) -> bool:
+    """
+    Interpret a completed flag from CSV text or JSON.
+    
+    Args:
+        value: Raw value; None means the record's presence marks completion
+    
+    Returns:
+        bool: Completion status
+    
+    Raises:
+        ValueError: If the value is not recognised
+    """
+    if value is None or isinstance(value, bool):
+        return value is None or value
+    if isinstance(value, (int, float)):
+        return bool(value)
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"Unrecognised completed value: {value!r}")
+
+def read_records(path: str, file_format: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream records from a CSV or JSON Lines file without loading it into memory.
+    
+    Args:
+        path (str): Input file
+        file_format (str, optional): 'csv' or 'jsonl'; guessed from the extension if omitted
+    
+    Yields:
+        Dict: Raw record with 'habit', 'date' and optionally 'completed'
+    """
+    if file_format is None:
+        file_format = 'jsonl' if path.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+    
+    with open(path, newline='', encoding='utf-8') as handle:
+        if file_format == 'csv':
+            yield from csv.DictReader(handle)
+        else:
+            for line in handle:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Keep the record count aligned with the file; the empty record is skipped
+                    yield {}
+
+
+class Checkpoint:
+    """Records how many input records have been committed, so an import can resume."""
+    
+    def __init__(self, source: str, path: Optional[str] = None):
+        """
+        Initialize the checkpoint for a source file.
+        
+        Args:
+            source (str): Input file being imported
+            path (str, optional): Checkpoint file (default: <source>.import-checkpoint)
+        """
+        self.source = source
+        self.path = path or f"{source}.import-checkpoint"
+        stat = os.stat(source)
+        # A changed source file invalidates the checkpoint
+        self.fingerprint = [stat.st_size, int(stat.st_mtime)]
+    
+    def load(self) -> int:
+        """Return the number of records already committed, 0 if starting fresh."""
+        try:
+            with open(self.path, encoding='utf-8') as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return 0
+        if data.get('fingerprint') != self.fingerprint:
+            logger.warning("Source file changed since the last import attempt; starting over")
+            return 0
+        return int(data.get('records', 0))
+    
+    def save(self, records: int) -> None:
+        """Atomically record the number of committed records."""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as handle:
+            json.dump({'fingerprint': self.fingerprint, 'records': records}, handle)
+        os.replace(temp_path, self.path)
+    
+    def clear(self) -> None:
+        """Remove the checkpoint after a completed import."""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class HabitLogImporter:
+    """Streams records into habit_logs with batched multi-row upserts.
+    
+    Records are grouped into batches of batch_size rows; commit_interval
+    batches are written per transaction. After every commit the number of
+    consumed records is checkpointed, and a restarted import skips that
+    many records. Writes are idempotent upserts, so records replayed after
+    a crash are harmless.
+    """
+    
+    def __init__(self, db_manager: StorageBackend, batch_size: int = 5000,
+                 commit_interval: int = 10, create_habits: bool = True,
+                 progress: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Initialize the importer.
+        
+        Args:
+            db_manager (StorageBackend): Connected storage backend
+            batch_size (int): Rows per multi-row upsert
+            commit_interval (int): Batches per transaction
+            create_habits (bool): Create habits whose names are unknown
+            progress (Callable, optional): Called with import counters after every commit
+        """
+        self.db_manager = db_manager
+        self.batch_size = max(1, batch_size)
+        self.commit_interval = max(1, commit_interval)
+        self.create_habits = create_habits
+        self.progress = progress
+        self.habit_ids: Dict[str, int] = {}
+        self.stats = {'records': 0, 'written': 0, 'skipped': 0, 'created_habits': 0,
+                      'elapsed': 0.0}
+    
+    def _resolve_habits(self, names: List[str]) -> None:
+        """Map unseen habit names to IDs, creating habits if allowed."""
+        missing = [name for name in dict.fromkeys(names) if name not in self.habit_ids]
+        if not missing:
+            return
+        if self.create_habits:
+            ids, created = self.db_manager.ensure_habits(missing)
+            if len(ids) < len(missing):
+                raise HabitImportError("Could not create habits for the import")
+            self.stats['created_habits'] += created
+            self.habit_ids.update(ids)
+    
+    def _to_entries(self, records: List[Dict[str, Any]]) -> List[Tuple[int, date, bool]]:
+        """Convert raw records to (habit_id, completion_date, completed) rows."""
+        parsed = []
+        for record in records:
+            try:
+                name = str(record.get('habit') or record.get('habit_name') or '').strip()
+                if not name:
+                    raise ValueError("missing habit name")
+                parsed.append((name, date.fromisoformat(str(record['date']).strip()[:10]),
+                               parse_completed(record.get('completed'))))
+            except (KeyError, TypeError, ValueError) as e:
+                self.stats['skipped'] += 1
+                if self.stats['skipped'] <= 10:
+                    logger.warning(f"Skipping record {record!r}: {e}")
+        
+        self._resolve_habits([name for name, _, _ in parsed])
+        # The last record for a habit and day wins, as it would row by row
+        latest: Dict[Tuple[int, date], bool] = {}
+        for name, completion_date, completed in parsed:
+            habit_id = self.habit_ids.get(name)
+            if habit_id is None:
+                self.stats['skipped'] += 1
+                continue
+            latest[(habit_id, completion_date)] = completed
+        return [(habit_id, completion_date, completed)
+                for (habit_id, completion_date), completed in latest.items()]
+    
+    def _commit(self, batches: List[List[Dict[str, Any]]], checkpoint: Checkpoint,
+                records_done: int) -> None:
+        """Write one transaction's worth of batches and advance the checkpoint."""
+        entry_batches = [self._to_entries(batch) for batch in batches]
+        entry_batches = [batch for batch in entry_batches if batch]
+        if entry_batches and not self.db_manager.write_completion_batches(entry_batches):
+            raise HabitImportError(f"Write failed after {self.stats['records']} records; "
+                               "run the import again to resume")
+        self.stats['written'] += sum(len(batch) for batch in entry_batches)
+        self.stats['records'] = records_done
+        checkpoint.save(records_done)
+        if self.progress is not None:
+            self.progress(dict(self.stats))
+    
+    def run(self, path: str, file_format: Optional[str] = None, resume: bool = True) -> Dict[str, Any]:
+        """
+        Import a file.
+        
+        Args:
+            path (str): CSV or JSON Lines file
+            file_format (str, optional): 'csv' or 'jsonl'; guessed from the extension if omitted
+            resume (bool): Continue from the last checkpoint instead of starting over
+        
+        Returns:
+            Dict: Counters: records, written, skipped, created_habits, elapsed
+        
+        Raises:
+            HabitImportError: If the database rejects a write; the checkpoint is kept
+        """
+        started = time.perf_counter()
+        checkpoint = Checkpoint(path)
+        skip = checkpoint.load() if resume else 0
+        if skip:
+            logger.info(f"Resuming import of {path} after {skip} records")
+        self.habit_ids = self.db_manager.get_habit_ids_by_name()
+        self.stats['records'] = skip
+        
+        batches: List[List[Dict[str, Any]]] = []
+        batch: List[Dict[str, Any]] = []
+        records_done = 0
+        for records_done, record in enumerate(read_records(path, file_format), start=1):
+            if records_done <= skip:
+                continue
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                batches.append(batch)
+                batch = []
+                if len(batches) >= self.commit_interval:
+                    self._commit(batches, checkpoint, records_done)
+                    batches = []
+        if batch:
+            batches.append(batch)
+        if batches:
+            self._commit(batches, checkpoint, max(records_done, skip))
+        
+        checkpoint.clear()
+        self.stats['elapsed'] = time.perf_counter() - started
+        return dict(self.stats)
+
+
+def main() -> int:
+    """Import a file into the configured database."""
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Import habit history from CSV or JSON Lines")
+    parser.add_argument('path', help="File to import")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="Input format (default: from extension)")
+    parser.add_argument('--batch-size', type=int, default=IMPORT_CONFIG.get('batch_size', 5000),
+                        help="Rows per multi-row upsert")
+    parser.add_argument('--commit-interval', type=int, default=IMPORT_CONFIG.get('commit_interval', 10),
+                        help="Batches per transaction")
+    parser.add_argument('--no-create', action='store_true', help="Skip records for unknown habits")
+    parser.add_argument('--restart', action='store_true', help="Ignore any checkpoint and start over")
+    args = parser.parse_args()
+    
+    db_manager = create_storage()
+    if not db_manager.connect():
+        print("Error: could not connect to the database")
+        return 1
+    
+    def report(stats: Dict[str, Any]) -> None:
+        print(f"\r{stats['records']:,} records read, {stats['written']:,} written, "
+              f"{stats['skipped']:,} skipped", end='', flush=True)
+    
+    importer = HabitLogImporter(db_manager, args.batch_size, args.commit_interval,
+                                create_habits=not args.no_create, progress=report)
+    try:
+        stats = importer.run(args.path, args.format, resume=not args.restart)
+    except HabitImportError as e:
+        print(f"\nError: {e}")
+        return 1
+    finally:
+        db_manager.close_connection()
+    
+    print(f"\nImported {stats['written']:,} rows in {stats['elapsed']:.1f}s "
+          f"({stats['created_habits']} habits created, {stats['skipped']:,} records skipped)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,419 @@
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Generator, Iterator, Optional, cast
+import atexit
+import functools
+import inspect
+import json
+import logging
+import reprlib
+import threading
+import time
+
+from storage import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+# Try to import configuration
+try:
+    from config import INSTRUMENTATION_CONFIG
+except ImportError:
+    # Default configuration: instrumentation disabled
+    INSTRUMENTATION_CONFIG = {
+        'enabled': False,
+        'slow_query_ms': 100.0,
+        'slow_log_size': 200,
+        'n_plus_one_threshold': 10,
+        'dump_path': None
+    }
+
+# Storage methods that are timed; every public method of the interface
+INSTRUMENTED_METHODS = frozenset(
+    name for name, member in inspect.getmembers(StorageBackend, inspect.isfunction)
+    if not name.startswith('_')
+)
+
+def count_rows(result: Any) -> int:
+    """
+    Estimate the rows behind a storage result.
+    
+    Lists count their items and mappings count their leaf entries, so
+    {habit_id: [log, ...]} counts logs and {habit_id: {month: n}} counts
+    months. Scalars (bool, int) count as no rows.
+    """
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        return sum(count_rows(value) if isinstance(value, (list, dict)) else 1
+                   for value in result.values())
+    return 0
+
+
+class LatencyHistogram:
+    """Latency samples with percentiles over a bounded window of recent calls."""
+    
+    def __init__(self, max_samples: int = 4096):
+        """
+        Initialize the histogram.
+        
+        Args:
+            max_samples (int): Most recent samples kept for the percentiles
+        """
+        self.samples: Deque[float] = deque(maxlen=max_samples)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def add(self, seconds: float) -> None:
+        """Record one call's duration."""
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+    
+    def percentile(self, fraction: float) -> float:
+        """Return a percentile (0-1) of the kept samples in milliseconds."""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000
+    
+    def summary(self) -> Dict[str, float]:
+        """Return count, mean, p50/p95/p99 and max in milliseconds."""
+        return {
+            'count': self.count,
+            'total_ms': round(self.total * 1000, 3),
+            'mean_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            'p50_ms': round(self.percentile(0.50), 3),
+            'p95_ms': round(self.percentile(0.95), 3),
+            'p99_ms': round(self.percentile(0.99), 3),
+            'max_ms': round(self.max * 1000, 3)
+        }
+
+
+class QueryInstrumentation:
+    """Collects per-method storage timings, per-operation query counts and a slow-query log.
+    
+    Storage calls are timed by InstrumentedStorage. HabitManager methods
+    decorated with track_operation() open an operation, and every storage
+    call and SQL statement made inside it is charged to that operation, so
+    an operation whose round trips grow with the number of habits (an N+1
+    pattern) stands out in the report.
+    """
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the collector.
+        
+        Args:
+            config (dict, optional): Settings, INSTRUMENTATION_CONFIG if omitted
+        """
+        settings: Dict[str, Any] = INSTRUMENTATION_CONFIG if config is None else config
+        self.enabled = bool(settings.get('enabled', False))
+        self.slow_query_ms = float(settings.get('slow_query_ms', 100.0))
+        self.n_plus_one_threshold = int(settings.get('n_plus_one_threshold', 10))
+        self.dump_path: Optional[str] = settings.get('dump_path')
+        self.max_samples = int(settings.get('max_samples', 4096))
+        self.slow_queries: Deque[Dict[str, Any]] = deque(maxlen=int(settings.get('slow_log_size', 200)))
+        self.methods: Dict[str, Dict[str, Any]] = {}
+        self.operations: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._dump_registered = False
+    
+    def reset(self) -> None:
+        """Forget everything recorded so far."""
+        with self._lock:
+            self.methods.clear()
+            self.operations.clear()
+            self.slow_queries.clear()
+    
+    def _new_stats(self) -> Dict[str, Any]:
+        return {'calls': 0, 'errors': 0, 'rows': 0, 'round_trips': 0,
+                'latency': LatencyHistogram(self.max_samples)}
+    
+    def record_statement(self) -> None:
+        """Count one SQL statement sent by the current thread (storage statement listener)."""
+        frame = getattr(self._local, 'call', None)
+        if frame is not None:
+            frame['round_trips'] += 1
+    
+    @contextmanager
+    def operation(self, name: str) -> Iterator[None]:
+        """
+        Charge every storage call in the block to a high-level operation.
+        
+        Nested operations (e.g. get_habit_statistics calling
+        get_habit_streaks) are charged to the outermost one.
+        
+        Args:
+            name (str): Operation name, usually the HabitManager method
+        """
+        if getattr(self._local, 'operation', None) is not None:
+            yield
+            return
+        
+        frame: Dict[str, Any] = {'name': name, 'storage_calls': 0, 'round_trips': 0, 'rows': 0, 'methods': {}}
+        self._local.operation = frame
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self._local.operation = None
+            with self._lock:
+                stats = self.operations.get(name)
+                if stats is None:
+                    stats = self._new_stats()
+                    stats.update({'storage_calls': 0, 'max_round_trips': 0, 'methods': {}})
+                    self.operations[name] = stats
+                stats['calls'] += 1
+                stats['errors'] += failed
+                stats['storage_calls'] += frame['storage_calls']
+                stats['round_trips'] += frame['round_trips']
+                stats['max_round_trips'] = max(stats['max_round_trips'], frame['round_trips'])
+                stats['rows'] += frame['rows']
+                stats['latency'].add(elapsed)
+                for method, calls in frame['methods'].items():
+                    stats['methods'][method] = stats['methods'].get(method, 0) + calls
+    
+    def _record_call(self, method: str, elapsed: float, rows: int, round_trips: int,
+                     failed: bool, args: tuple) -> None:
+        """Add one finished storage call to the method, operation and slow-query statistics."""
+        operation = getattr(self._local, 'operation', None)
+        if operation is not None:
+            operation['storage_calls'] += 1
+            operation['round_trips'] += round_trips
+            operation['rows'] += rows
+            operation['methods'][method] = operation['methods'].get(method, 0) + 1
+        
+        with self._lock:
+            stats = self.methods.get(method)
+            if stats is None:
+                stats = self.methods[method] = self._new_stats()
+            stats['calls'] += 1
+            stats['errors'] += failed
+            stats['rows'] += rows
+            stats['round_trips'] += round_trips
+            stats['latency'].add(elapsed)
+        
+        elapsed_ms = elapsed * 1000
+        if elapsed_ms >= self.slow_query_ms:
+            # reprlib keeps the repr of a 50,000-row batch short and cheap
+            arguments = reprlib.repr(args)
+            entry = {
+                'method': method,
+                'ms': round(elapsed_ms, 3),
+                'rows': rows,
+                'round_trips': round_trips,
+                'operation': operation['name'] if operation is not None else None,
+                'args': arguments if len(arguments) <= 200 else arguments[:197] + '...',
+                'at': time.time()
+            }
+            with self._lock:
+                self.slow_queries.append(entry)
+            logger.warning(f"Slow storage call {method} took {elapsed_ms:.1f} ms ({rows} rows)")
+    
+    def call(self, method: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a storage method and record its latency, rows and round trips.
+        
+        Generators (iter_log_rows) are timed until they are exhausted or closed.
+        
+        Args:
+            method (str): Storage method name
+            func (Callable): Bound method to run
+        
+        Returns:
+            Any: The method's result
+        """
+        if getattr(self._local, 'call', None) is not None:
+            # A storage method calling another one through the proxy is one call
+            return func(*args, **kwargs)
+        
+        frame = {'round_trips': 0}
+        self._local.call = frame
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self._record_call(method, time.perf_counter() - started, 0, frame['round_trips'], True, args)
+            raise
+        finally:
+            self._local.call = None
+        
+        if inspect.isgenerator(result):
+            return self._stream(method, result, started, frame, args)
+        self._record_call(method, time.perf_counter() - started, count_rows(result),
+                          frame['round_trips'], False, args)
+        return result
+    
+    def _stream(self, method: str, generator: Generator[Any, Any, Any], started: float,
+                frame: Dict[str, int], args: tuple) -> Iterator[Any]:
+        """Re-yield a streaming result, recording it once the stream ends."""
+        rows = 0
+        failed = False
+        try:
+            while True:
+                self._local.call = frame
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    break
+                finally:
+                    self._local.call = None
+                rows += 1
+                yield item
+        except Exception:
+            failed = True
+            raise
+        finally:
+            generator.close()
+            self._record_call(method, time.perf_counter() - started, rows, frame['round_trips'],
+                              failed, args)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return everything recorded so far as plain data.
+        
+        Returns:
+            Dict: {'methods': {name: stats}, 'operations': {name: stats},
+            'slow_queries': [entry, ...], 'suspected_n_plus_one': [operation, ...]}.
+            Stats hold calls, errors, rows, round_trips and the latency summary;
+            operations also hold storage_calls, max_round_trips and the storage
+            methods they called.
+        """
+        def export(stats: Dict[str, Any]) -> Dict[str, Any]:
+            data = {key: dict(value) if key == 'methods' else value
+                    for key, value in stats.items() if key != 'latency'}
+            data['latency'] = stats['latency'].summary()
+            return data
+        
+        with self._lock:
+            operations = {name: export(stats) for name, stats in sorted(self.operations.items())}
+            return {
+                'methods': {name: export(stats) for name, stats in sorted(self.methods.items())},
+                'operations': operations,
+                'slow_queries': list(self.slow_queries),
+                'suspected_n_plus_one': [name for name, stats in operations.items()
+                                         if stats['max_round_trips'] > self.n_plus_one_threshold]
+            }
+    
+    def report(self) -> str:
+        """Format the snapshot as a plain-text table."""
+        data = self.snapshot()
+        lines = ["Storage methods:",
+                 f"  {'method':<32}{'calls':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+                 f"{'rows':>10}{'trips':>8}"]
+        for name, stats in data['methods'].items():
+            latency = stats['latency']
+            lines.append(f"  {name:<32}{stats['calls']:>8}{latency['p50_ms']:>10.2f}"
+                         f"{latency['p95_ms']:>10.2f}{latency['p99_ms']:>10.2f}"
+                         f"{stats['rows']:>10}{stats['round_trips']:>8}")
+        lines.append("HabitManager operations (round trips per call):")
+        for name, stats in data['operations'].items():
+            calls = max(stats['calls'], 1)
+            flag = "  <- possible N+1" if name in data['suspected_n_plus_one'] else ""
+            lines.append(f"  {name:<32}{stats['calls']:>8} calls, "
+                         f"{stats['round_trips'] / calls:.1f} avg / {stats['max_round_trips']} max trips, "
+                         f"{stats['rows'] / calls:.0f} rows, p95 {stats['latency']['p95_ms']:.2f} ms{flag}")
+        lines.append(f"Slow storage calls (>= {self.slow_query_ms:g} ms): {len(data['slow_queries'])}")
+        for entry in data['slow_queries'][-10:]:
+            lines.append(f"  {entry['method']} {entry['ms']:.1f} ms, {entry['rows']} rows "
+                         f"in {entry['operation'] or '-'} {entry['args']}")
+        return "\n".join(lines)
+    
+    def dump(self, path: Optional[str] = None) -> None:
+        """
+        Write the snapshot as JSON to path (or dump_path) and log the report.
+        
+        Args:
+            path (str, optional): JSON file, dump_path from the configuration if omitted
+        """
+        path = path or self.dump_path
+        if path:
+            try:
+                with open(path, 'w', encoding='utf-8') as handle:
+                    json.dump(self.snapshot(), handle, indent=2)
+                logger.info(f"Instrumentation written to {path}")
+            except OSError as e:
+                logger.error(f"Error writing instrumentation dump: {e}")
+        logger.info("Instrumentation report:\n" + self.report())
+    
+    def register_shutdown_dump(self) -> None:
+        """Dump the statistics when the interpreter exits (registered once)."""
+        if not self._dump_registered:
+            self._dump_registered = True
+            atexit.register(self.dump)
+
+
+# Process-wide collector shared by every instrumented backend and HabitManager
+INSTRUMENTATION = QueryInstrumentation()
+
+
+class InstrumentedStorage:
+    """Storage backend proxy that times every public storage method.
+    
+    Attribute access is forwarded to the wrapped backend, so the proxy can
+    be used wherever a StorageBackend is expected.
+    """
+    
+    def __init__(self, backend: StorageBackend, instrumentation: Optional[QueryInstrumentation] = None):
+        """
+        Wrap a backend.
+        
+        Args:
+            backend (StorageBackend): Backend to instrument
+            instrumentation (QueryInstrumentation, optional): Collector, INSTRUMENTATION if omitted
+        """
+        self.backend = backend
+        self.instrumentation = instrumentation or INSTRUMENTATION
+        backend.statement_listener = self.instrumentation.record_statement
+        self._wrappers: Dict[str, Callable[..., Any]] = {}
+    
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.backend, name)
+        if name not in INSTRUMENTED_METHODS:
+            return attribute
+        cached = self._wrappers.get(name)
+        if cached is not None:
+            return cached
+        
+        @functools.wraps(attribute)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return self.instrumentation.call(name, attribute, *args, **kwargs)
+        self._wrappers[name] = wrapper
+        return wrapper
+
+
+StorageBackend.register(InstrumentedStorage)
+
+def instrument_storage(backend: StorageBackend) -> StorageBackend:
+    """
+    Wrap a backend so its calls are recorded by INSTRUMENTATION.
+    
+    Args:
+        backend (StorageBackend): Backend to instrument
+    
+    Returns:
+        StorageBackend: Instrumented proxy
+    """
+    INSTRUMENTATION.register_shutdown_dump()
+    # Registered as a virtual subclass, which static checkers do not see
+    return cast(StorageBackend, InstrumentedStorage(backend))
+
+def track_operation(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Decorator charging the storage calls of a HabitManager method to an operation."""
+    name = func.__name__
+    
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not INSTRUMENTATION.enabled:
+            return func(*args, **kwargs)
+        with INSTRUMENTATION.operation(name):
+            return func(*args, **kwargs)
+    return wrapper
@@ -3,7 +3,7 @@
 Habit Tracker Desktop Application
 
 A desktop application for tracking daily habits with calendar view and progress charts.
-Built with Python, Tkinter, and MySQL.
+Built with Python, Tkinter, and MySQL or SQLite.
 
 Author: Your Name
 Date: 2025-01-07
@@ -11,6 +11,7 @@ Date: 2025-01-07
 
 import sys
 import os
+import importlib.util
 import logging
 from tkinter import messagebox
 
@@ -21,19 +22,25 @@ logging.basicConfig(
 )
 
 def check_dependencies():
-    """Check if all required dependencies are installed."""
+    """Check if all required dependencies are installed without importing them."""
     required_packages = [
-        'mysql.connector',
         'matplotlib',
         'numpy'
     ]
+    # SQLite ships with Python; only the MySQL backend needs a driver
+    from storage import STORAGE_CONFIG
+    if STORAGE_CONFIG.get('backend', 'mysql') == 'mysql':
+        required_packages.insert(0, 'mysql.connector')
     
     missing_packages = []
     
     for package in required_packages:
         try:
-            __import__(package)
+            found = importlib.util.find_spec(package) is not None
         except ImportError:
+            # A dotted name raises when its parent package is missing
+            found = False
+        if not found:
             missing_packages.append(package)
     
     if missing_packages:
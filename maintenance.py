@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Habit Tracker database maintenance.
+
+Usage:
+    python maintenance.py verify    # Compare the monthly rollup with habit_logs
+    python maintenance.py rebuild   # Recompute the monthly rollup from habit_logs
+    python maintenance.py status    # Show the applied schema version
+    python maintenance.py explain   # Check that hot queries use their indexes
+"""
+
+import argparse
+import logging
+import sys
+
+from storage import StorageBackend, create_storage
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+def verify_monthly_stats(db_manager: StorageBackend) -> int:
+    """Report months where habit_monthly_stats disagrees with habit_logs."""
+    mismatches = db_manager.verify_monthly_stats()
+    if mismatches is None:
+        print("Could not verify monthly statistics")
+        return 1
+    
+    for mismatch in mismatches:
+        print(f"Habit {mismatch['habit_id']} {mismatch['year']}-{mismatch['month']:02d}: "
+              f"expected {mismatch['expected']}, found {mismatch['actual']}")
+    if mismatches:
+        print(f"{len(mismatches)} month(s) out of sync. Run 'python maintenance.py rebuild' to fix them.")
+        return 1
+    
+    print("Monthly statistics are in sync")
+    return 0
+
+def rebuild_monthly_stats(db_manager: StorageBackend) -> int:
+    """Recompute habit_monthly_stats from habit_logs."""
+    if not db_manager.rebuild_monthly_stats():
+        print("Failed to rebuild monthly statistics")
+        return 1
+    print("Monthly statistics rebuilt")
+    return 0
+
+def schema_status(db_manager: StorageBackend) -> int:
+    """Print the applied and latest schema versions."""
+    version = db_manager.get_schema_version()
+    if version < 0:
+        print("Could not read the schema version")
+        return 1
+    print(f"Schema version {version} (latest {db_manager.latest_schema_version})")
+    return 0
+
+def explain_queries(db_manager: StorageBackend) -> int:
+    """Check with EXPLAIN that the hot queries use their indexes."""
+    plans = db_manager.check_query_plans()
+    if not plans:
+        print("Could not explain queries")
+        return 1
+    
+    for plan in plans:
+        status = "OK  " if plan['uses_index'] else "MISS"
+        print(f"{status} {plan['name']}: uses {plan['key'] or 'no index'} "
+              f"(expected {' or '.join(plan['expected'])})")
+    return 0 if all(plan['uses_index'] for plan in plans) else 1
+
+COMMANDS = {
+    'verify': verify_monthly_stats,
+    'rebuild': rebuild_monthly_stats,
+    'status': schema_status,
+    'explain': explain_queries
+}
+
+def main() -> int:
+    """Run a maintenance command against the configured database."""
+    parser = argparse.ArgumentParser(description="Habit Tracker database maintenance")
+    parser.add_argument('command', choices=sorted(COMMANDS), help="Maintenance task to run")
+    args = parser.parse_args()
+    
+    db_manager = create_storage()
+    if not db_manager.connect():
+        print("Error: could not connect to the database")
+        return 1
+    
+    try:
+        return COMMANDS[args.command](db_manager)
+    finally:
+        db_manager.close_connection()
+
+if __name__ == "__main__":
+    sys.exit(main())
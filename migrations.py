@@ -0,0 +1,207 @@
+from mysql.connector import Error, errorcode
+from typing import Any, Dict, List, Tuple
+import logging
+
+from storage import Migration
+
+logger = logging.getLogger(__name__)
+
+# Errors meaning a statement's effect is already in place, e.g. when a
+# deployment created the tables before schema_version existed
+ALREADY_APPLIED_ERRORS = {
+    errorcode.ER_TABLE_EXISTS_ERROR,
+    errorcode.ER_DUP_KEYNAME,
+    errorcode.ER_DUP_FIELDNAME
+}
+
+CREATE_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INT PRIMARY KEY,
+    description VARCHAR(255) NOT NULL,
+    applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Create habits, habit_logs and habit_monthly_stats", [
+        """
+        CREATE TABLE IF NOT EXISTS habits (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL UNIQUE,
+            description TEXT,
+            created_date DATE NOT NULL,
+            is_active BOOLEAN DEFAULT TRUE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS habit_logs (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            habit_id INT NOT NULL,
+            completion_date DATE NOT NULL,
+            completed BOOLEAN DEFAULT FALSE,
+            FOREIGN KEY (habit_id) REFERENCES habits(id) ON DELETE CASCADE,
+            UNIQUE KEY unique_habit_date (habit_id, completion_date)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS habit_monthly_stats (
+            habit_id INT NOT NULL,
+            year SMALLINT NOT NULL,
+            month TINYINT NOT NULL,
+            completed_days INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (habit_id, year, month),
+            FOREIGN KEY (habit_id) REFERENCES habits(id) ON DELETE CASCADE
+        )
+        """
+    ]),
+    Migration(2, "Backfill habit_monthly_stats from existing logs", [
+        """
+        INSERT INTO habit_monthly_stats (habit_id, year, month, completed_days)
+        SELECT habit_id, YEAR(completion_date), MONTH(completion_date), COUNT(*)
+        FROM habit_logs
+        WHERE completed = TRUE
+        GROUP BY habit_id, YEAR(completion_date), MONTH(completion_date)
+        ON DUPLICATE KEY UPDATE completed_days = VALUES(completed_days)
+        """
+    ]),
+    Migration(3, "Index active habits by name", [
+        "CREATE INDEX idx_habits_active_name ON habits (is_active, name)"
+    ]),
+    Migration(4, "Covering index for completion lookups", [
+        "CREATE INDEX idx_logs_habit_date_completed ON habit_logs (habit_id, completion_date, completed)"
+    ]),
+    # Every reader treats a missing row as "not completed", so the rows
+    # meaning "not done" carry no information
+    Migration(5, "Compact habit_logs to completed days only", [
+        "DELETE FROM habit_logs WHERE completed = FALSE"
+    ])
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+# Migrations that only make sense for sparse habit_logs. With sparse_logs off
+# they are recorded without running, so dense rows are kept.
+SPARSE_ONLY_MIGRATIONS = {5}
+
+# Hot queries and the indexes EXPLAIN is expected to report for them
+HOT_QUERIES: List[Tuple[str, str, Tuple[Any, ...], Tuple[str, ...]]] = [
+    ("active habits",
+     "SELECT * FROM habits WHERE is_active = TRUE ORDER BY name",
+     (),
+     ("idx_habits_active_name",)),
+    ("month logs",
+     "SELECT * FROM habit_logs WHERE habit_id IN (%s) AND completion_date BETWEEN %s AND %s",
+     (1, '2025-01-01', '2025-01-31'),
+     ("unique_habit_date", "idx_logs_habit_date_completed")),
+    ("completion status",
+     "SELECT completed FROM habit_logs WHERE habit_id = %s AND completion_date = %s",
+     (1, '2025-01-01'),
+     ("unique_habit_date", "idx_logs_habit_date_completed")),
+    ("completed dates",
+     "SELECT habit_id, completion_date FROM habit_logs WHERE habit_id IN (%s) AND completed = TRUE",
+     (1,),
+     ("idx_logs_habit_date_completed",))
+]
+
+def get_schema_version(cursor: Any) -> int:
+    """
+    Read the applied schema version.
+    
+    Args:
+        cursor: Open cursor
+    
+    Returns:
+        int: Highest applied migration, 0 for a fresh or unversioned database
+    """
+    cursor.execute(CREATE_VERSION_TABLE)
+    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    return int(cursor.fetchone()[0])
+
+def read_schema_version(cursor: Any) -> int:
+    """
+    Read the applied schema version without running any DDL.
+    
+    Used on the connect fast path, where creating the version table on every
+    launch would cost a round trip and a metadata lock.
+    
+    Args:
+        cursor: Open cursor
+    
+    Returns:
+        int: Highest applied migration, 0 if the version table does not exist
+    """
+    try:
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    except Error as e:
+        if e.errno != errorcode.ER_NO_SUCH_TABLE:
+            raise
+        return 0
+    return int(cursor.fetchone()[0])
+
+def apply_migrations(conn: Any, cursor: Any, sparse_logs: bool = True) -> int:
+    """
+    Apply every migration newer than the recorded schema version.
+    
+    MySQL commits DDL implicitly, so each migration is recorded right after
+    its statements run. Statements whose effect already exists are skipped,
+    which lets a half-applied migration be retried.
+    
+    Args:
+        conn: Open connection
+        cursor: Cursor on conn
+        sparse_logs (bool): Whether habit_logs is sparse; SPARSE_ONLY_MIGRATIONS
+            are only recorded when it is not
+    
+    Returns:
+        int: Schema version after migrating
+    
+    Raises:
+        Error: If a migration fails; earlier migrations stay applied
+    """
+    version = get_schema_version(cursor)
+    for migration in MIGRATIONS:
+        if migration.version <= version:
+            continue
+        statements = migration.statements
+        if migration.version in SPARSE_ONLY_MIGRATIONS and not sparse_logs:
+            logger.info(f"Skipping migration {migration.version} because sparse_logs is disabled: "
+                        f"{migration.description}")
+            statements = []
+        else:
+            logger.info(f"Applying migration {migration.version}: {migration.description}")
+        for statement in statements:
+            try:
+                cursor.execute(statement)
+            except Error as e:
+                if e.errno not in ALREADY_APPLIED_ERRORS:
+                    raise
+                logger.info(f"Migration {migration.version} already partly applied: {e.msg}")
+        cursor.execute("INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                       (migration.version, migration.description))
+        conn.commit()
+        version = migration.version
+    return version
+
+def explain_hot_queries(cursor: Any) -> List[Dict[str, Any]]:
+    """
+    Run EXPLAIN on the hot queries and check which index each one uses.
+    
+    Args:
+        cursor: Open dictionary cursor
+    
+    Returns:
+        List[Dict]: One dict per query with name, key (index chosen by the
+        optimizer), expected and uses_index
+    """
+    results = []
+    for name, query, params, expected in HOT_QUERIES:
+        cursor.execute(f"EXPLAIN {query}", params)
+        plan = cursor.fetchall()
+        key = plan[0].get('key') if plan else None
+        results.append({
+            'name': name,
+            'key': key,
+            'expected': list(expected),
+            'uses_index': key in expected
+        })
+    return results
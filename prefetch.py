@@ -0,0 +1,171 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+import queue
+import threading
+
+from habit_manager import HabitManager
+
+logger = logging.getLogger(__name__)
+
+# How often the Tk thread checks for finished prefetches (ms)
+POLL_INTERVAL_MS = 50
+
+def adjacent_months(year: int, month: int) -> List[Tuple[int, int]]:
+    """Return the (year, month) pairs before and after the given month."""
+    previous_month = (year - 1, 12) if month == 1 else (year, month - 1)
+    next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return [previous_month, next_month]
+
+
+class MonthPrefetcher:
+    """Loads neighbouring months and chart data on a background thread.
+    
+    The worker owns its own database connection, so prefetching never
+    competes with the Tk thread for the main connection. Finished results are
+    queued and picked up on the Tk thread by a root.after() poll, where they
+    are stored in the HabitManager caches. Every request supersedes the
+    previous one; results belonging to a superseded request are dropped.
+    """
+    
+    def __init__(self, root: Any, habit_manager: HabitManager, db_factory: Callable[[], Any],
+                 dispatch: Optional[Callable[..., None]] = None):
+        """
+        Initialize the prefetcher. The worker thread starts on the first request.
+        
+        Args:
+            root: Tk root used to schedule result delivery
+            habit_manager (HabitManager): Manager whose caches receive the results
+            db_factory (Callable): Creates an unconnected database manager for the worker
+            dispatch (Callable, optional): dispatch(fn, *args) runs fn on the thread that
+                owns habit_manager; by default fn is called directly
+        """
+        self.root = root
+        self.habit_manager = habit_manager
+        self.db_factory = db_factory
+        self.dispatch = dispatch if dispatch is not None else (lambda fn, *args: fn(*args))
+        self.generation = 0
+        self._requests: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._results: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._polling = False
+        self._last_requested = 0  # Generation of the last queued job
+        self._last_done = 0  # Generation of the last job the worker finished
+        self._disabled = False  # Set when the worker cannot reach the database
+    
+    def request(self, year: int, month: int, habits: List[Dict],
+                chart_habit_id: Optional[int] = None) -> None:
+        """
+        Prefetch the months around (year, month) and the chart of one habit.
+        
+        Months and charts that are already cached are skipped.
+        
+        Args:
+            year (int): Year of the month being shown
+            month (int): Month being shown (1-12)
+            habits (List[Dict]): Active habits
+            chart_habit_id (int, optional): Habit selected in the charts tab
+        """
+        self.generation += 1
+        if self._disabled:
+            return
+        
+        self._ensure_worker()
+        self._last_requested = self.generation
+        self.dispatch(self._plan, self.generation, year, month, list(habits), chart_habit_id)
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_INTERVAL_MS, self._deliver)
+    
+    def _plan(self, generation: int, year: int, month: int, habits: List[Dict],
+              chart_habit_id: Optional[int]) -> None:
+        """Queue a job for whatever is not cached yet; runs on the habit_manager thread."""
+        months = [(y, m, self.habit_manager.data_version(y, m))
+                  for y, m in adjacent_months(year, month)
+                  if not self.habit_manager.is_month_cached(y, m)]
+        if chart_habit_id is not None and self.habit_manager.is_chart_cached(chart_habit_id):
+            chart_habit_id = None
+        self._requests.put({
+            'generation': generation,
+            'months': months,
+            'habits': habits,
+            'chart_habit_id': chart_habit_id,
+            'chart_version': self.habit_manager.data_version()
+        })
+    
+    def cancel(self) -> None:
+        """Drop every outstanding prefetch."""
+        self.generation += 1
+    
+    def stop(self) -> None:
+        """Cancel outstanding work and stop the worker thread."""
+        self.cancel()
+        if self._thread is not None:
+            self._requests.put(None)
+            self._thread = None
+    
+    def _ensure_worker(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="month-prefetch", daemon=True)
+            self._thread.start()
+    
+    def _is_current(self, generation: int) -> bool:
+        return generation == self.generation
+    
+    def _run(self) -> None:
+        """Worker loop: runs on the background thread with its own connection."""
+        db_manager = self.db_factory()
+        if not db_manager.connect():
+            logger.error("Prefetch worker could not connect to the database")
+            self._shut_down_worker()
+            return
+        loader = HabitManager(db_manager)
+        try:
+            while True:
+                job = self._requests.get()
+                if job is None:
+                    break
+                generation = job['generation']
+                for year, month, version in job['months']:
+                    if not self._is_current(generation):
+                        break
+                    month_data = loader.get_month_data(year, month, job['habits'])
+                    self._results.put({'kind': 'month', 'generation': generation, 'year': year,
+                                       'month': month, 'version': version, 'data': month_data})
+                if job['chart_habit_id'] is not None and self._is_current(generation):
+                    chart_data = loader.get_habit_chart_data(job['chart_habit_id'])
+                    self._results.put({'kind': 'chart', 'generation': generation,
+                                       'habit_id': job['chart_habit_id'],
+                                       'version': job['chart_version'], 'data': chart_data})
+                loader.clear_cache()
+                self._last_done = generation
+        except Exception as e:
+            logger.error(f"Prefetch worker failed: {e}")
+            self._shut_down_worker()
+        finally:
+            db_manager.close_connection()
+    
+    def _shut_down_worker(self) -> None:
+        """Disable prefetching after a worker failure so the poll loop can end."""
+        self._disabled = True
+        self._last_done = self._last_requested
+    
+    def _deliver(self) -> None:
+        """Tk thread: hand finished prefetches to the HabitManager caches."""
+        while True:
+            try:
+                result = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if not self._is_current(result['generation']):
+                continue
+            if result['kind'] == 'month':
+                self.dispatch(self.habit_manager.prime_month_data, result['year'], result['month'],
+                              result['data'], result['version'])
+            else:
+                self.dispatch(self.habit_manager.prime_chart_data, result['habit_id'], result['data'],
+                              result['version'])
+        
+        if self._last_done >= self._last_requested and self._results.empty():
+            self._polling = False
+            return
+        self.root.after(POLL_INTERVAL_MS, self._deliver)
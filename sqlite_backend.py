@@ -0,0 +1,1008 @@
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, cast
+import calendar
+import logging
+import os
+import re
+import sqlite3
+import string
+import threading
+
+from storage import Migration, StorageBackend
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of habit ids sent in a single IN (...) list; stays below
+# SQLITE_MAX_VARIABLE_NUMBER (999) of older SQLite builds
+BULK_CHUNK_SIZE = 500
+
+# Applied to every connection. WAL lets the GUI read while the write-behind
+# queue or an import writes; synchronous=NORMAL is durable in WAL mode except
+# for the last transactions before a power loss.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'foreign_keys': 'ON',
+    'temp_store': 'MEMORY',
+    'cache_size': -20000,        # KiB (negative), about 20 MB
+    'mmap_size': 268435456,      # 256 MB
+    'busy_timeout': 5000         # Milliseconds to wait for another writer
+}
+
+# Bucket expressions for aggregated completion counts; week buckets are ISO
+# weeks computed by the iso_year()/iso_week() functions registered on connect
+COUNT_GRANULARITIES = {
+    'week': "iso_year(completion_date), iso_week(completion_date)",
+    'month': "CAST(strftime('%Y', completion_date) AS INTEGER), "
+             "CAST(strftime('%m', completion_date) AS INTEGER)",
+    'year': "CAST(strftime('%Y', completion_date) AS INTEGER)",
+}
+
+CREATE_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    description TEXT NOT NULL,
+    applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+# Same versions and resulting schema as the MySQL migrations, in SQLite's
+# dialect, plus migration 6 for files created before habits.name was NOCASE
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Create habits, habit_logs and habit_monthly_stats", [
+        """
+        CREATE TABLE IF NOT EXISTS habits (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+            description TEXT,
+            created_date DATE NOT NULL,
+            is_active BOOLEAN DEFAULT TRUE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS habit_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            habit_id INTEGER NOT NULL REFERENCES habits(id) ON DELETE CASCADE,
+            completion_date DATE NOT NULL,
+            completed BOOLEAN DEFAULT FALSE
+        )
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS unique_habit_date ON habit_logs (habit_id, completion_date)",
+        """
+        CREATE TABLE IF NOT EXISTS habit_monthly_stats (
+            habit_id INTEGER NOT NULL REFERENCES habits(id) ON DELETE CASCADE,
+            year INTEGER NOT NULL,
+            month INTEGER NOT NULL,
+            completed_days INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (habit_id, year, month)
+        ) WITHOUT ROWID
+        """
+    ]),
+    Migration(2, "Backfill habit_monthly_stats from existing logs", [
+        """
+        INSERT INTO habit_monthly_stats (habit_id, year, month, completed_days)
+        SELECT habit_id, CAST(strftime('%Y', completion_date) AS INTEGER),
+               CAST(strftime('%m', completion_date) AS INTEGER), COUNT(*)
+        FROM habit_logs
+        WHERE completed = TRUE
+        GROUP BY 1, 2, 3
+        ON CONFLICT (habit_id, year, month) DO UPDATE SET completed_days = excluded.completed_days
+        """
+    ]),
+    Migration(3, "Index active habits by name", [
+        "CREATE INDEX IF NOT EXISTS idx_habits_active_name ON habits (is_active, name)"
+    ]),
+    Migration(4, "Covering index for completion lookups", [
+        "CREATE INDEX IF NOT EXISTS idx_logs_habit_date_completed "
+        "ON habit_logs (habit_id, completion_date, completed)"
+    ]),
+    Migration(5, "Compact habit_logs to completed days only", [
+        "DELETE FROM habit_logs WHERE completed = FALSE"
+    ]),
+    # A column's collation cannot be altered, so habits is rebuilt (with
+    # foreign keys off, see _migrate). Names equal under NOCASE are merged
+    # into the oldest habit; on a day logged for both, its row is kept.
+    Migration(6, "Compare habit names case-insensitively", [
+        """
+        CREATE TABLE habits_nocase (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+            description TEXT,
+            created_date DATE NOT NULL,
+            is_active BOOLEAN DEFAULT TRUE
+        )
+        """,
+        """
+        INSERT INTO habits_nocase (id, name, description, created_date, is_active)
+        SELECT id, name, description, created_date, is_active FROM habits
+        WHERE id IN (SELECT MIN(id) FROM habits GROUP BY name COLLATE NOCASE)
+        """,
+        """
+        UPDATE OR IGNORE habit_logs SET habit_id = (
+            SELECT kept.id FROM habits_nocase AS kept JOIN habits AS merged
+            ON kept.name = merged.name WHERE merged.id = habit_logs.habit_id)
+        WHERE habit_id NOT IN (SELECT id FROM habits_nocase)
+        """,
+        "DELETE FROM habit_logs WHERE habit_id NOT IN (SELECT id FROM habits_nocase)",
+        "DELETE FROM habit_monthly_stats",
+        """
+        INSERT INTO habit_monthly_stats (habit_id, year, month, completed_days)
+        SELECT habit_id, CAST(strftime('%Y', completion_date) AS INTEGER),
+               CAST(strftime('%m', completion_date) AS INTEGER), COUNT(*)
+        FROM habit_logs
+        WHERE completed = TRUE
+        GROUP BY 1, 2, 3
+        """,
+        "DROP TABLE habits",
+        "ALTER TABLE habits_nocase RENAME TO habits",
+        "CREATE INDEX idx_habits_active_name ON habits (is_active, name)"
+    ])
+]
+
+# Hot queries and the indexes EXPLAIN QUERY PLAN is expected to report for them
+HOT_QUERIES: List[Tuple[str, str, Tuple[Any, ...], Tuple[str, ...]]] = [
+    ("active habits",
+     "SELECT * FROM habits WHERE is_active = TRUE ORDER BY name",
+     (),
+     ("idx_habits_active_name",)),
+    ("month logs",
+     "SELECT * FROM habit_logs WHERE habit_id IN (?) AND completion_date BETWEEN ? AND ?",
+     (1, '2025-01-01', '2025-01-31'),
+     ("unique_habit_date", "idx_logs_habit_date_completed")),
+    ("completion status",
+     "SELECT completed FROM habit_logs WHERE habit_id = ? AND completion_date = ?",
+     (1, '2025-01-01'),
+     ("unique_habit_date", "idx_logs_habit_date_completed")),
+    ("completed dates",
+     "SELECT habit_id, completion_date FROM habit_logs WHERE habit_id IN (?) AND completed = TRUE",
+     (1,),
+     ("idx_logs_habit_date_completed",))
+]
+
+PLAN_INDEX_PATTERN = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+
+ASCII_FOLD = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# Dates are stored as ISO text and columns declared DATE come back as date objects
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_converter("DATE", lambda value: date.fromisoformat(value.decode()))
+
+def nocase_key(name: str) -> str:
+    """
+    Fold a habit name the way SQLite's NOCASE collation compares it.
+    
+    Unlike collation_key() in database.py, only ASCII letters are folded:
+    NOCASE leaves accents, other scripts and trailing spaces significant.
+    
+    Args:
+        name (str): Habit name
+    
+    Returns:
+        str: Comparison key
+    """
+    return name.translate(ASCII_FOLD)
+
+def _iso_year(value: Optional[str]) -> Optional[int]:
+    return date.fromisoformat(value).isocalendar()[0] if value else None
+
+def _iso_week(value: Optional[str]) -> Optional[int]:
+    return date.fromisoformat(value).isocalendar()[1] if value else None
+
+
+class SQLiteDatabaseManager(StorageBackend):
+    """SQLite implementation of the storage interface.
+    
+    One connection is shared by all threads and serialized with a lock;
+    open a second manager (as the month prefetcher does) for reads that
+    should not wait behind writes. Logs are always sparse: only completed
+    days have a row and unticking a day deletes it.
+    """
+    
+    latest_schema_version = MIGRATIONS[-1].version
+    
+    def __init__(self, path: str = 'habit_tracker.db', pragmas: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the database location.
+        
+        Args:
+            path (str): Database file, or ':memory:' for a private in-memory database
+            pragmas (dict, optional): Overrides for SQLITE_PRAGMAS
+        """
+        self.path = path
+        self.pragmas = dict(SQLITE_PRAGMAS)
+        self.pragmas.update(pragmas or {})
+        self.connection: Optional[sqlite3.Connection] = None
+        self.lock = threading.RLock()
+    
+    def _check_connection(self) -> bool:
+        """Check if database connection is valid."""
+        return self.connection is not None
+    
+    @contextmanager
+    def _cursor(self, dictionary: bool = False) -> Iterator[Tuple[sqlite3.Connection, sqlite3.Cursor]]:
+        """
+        Open a cursor on the shared connection while holding the lock.
+        
+        A transaction left open by a failing block is rolled back.
+        
+        Args:
+            dictionary (bool): Return rows as sqlite3.Row, convertible with dict()
+        
+        Yields:
+            Tuple: (connection, cursor)
+        """
+        with self.lock:
+            conn = cast(sqlite3.Connection, self.connection)
+            cursor = conn.cursor()
+            if dictionary:
+                cursor.row_factory = sqlite3.Row
+            cursor = self._count_statements(cursor)
+            try:
+                yield conn, cursor
+            finally:
+                cursor.close()
+                if conn.in_transaction:
+                    conn.rollback()
+    
+    def connect(self) -> bool:
+        """
+        Open the SQLite database, apply the pragmas and migrate the schema.
+        
+        Returns:
+            bool: True if connection successful, False otherwise
+        """
+        try:
+            directory = os.path.dirname(self.path)
+            if directory and self.path != ':memory:':
+                os.makedirs(directory, exist_ok=True)
+            self.connection = sqlite3.connect(self.path, detect_types=sqlite3.PARSE_DECLTYPES,
+                                              check_same_thread=False)
+            for name, value in self.pragmas.items():
+                self.connection.execute(f"PRAGMA {name} = {value}")
+            self.connection.create_function("iso_year", 1, _iso_year, deterministic=True)
+            self.connection.create_function("iso_week", 1, _iso_week, deterministic=True)
+            if not self._migrate():
+                self.close_connection()
+                return False
+            logger.info(f"Successfully connected to SQLite database {self.path}")
+            return True
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Error connecting to SQLite: {e}")
+            self.connection = None
+            return False
+    
+    def _migrate(self) -> bool:
+        """
+        Apply every migration newer than the recorded schema version.
+        
+        SQLite DDL is transactional, so each migration and its schema_version
+        row are committed together or not at all. Foreign keys are off while
+        migrating, so rebuilding a table does not cascade into its children.
+        
+        Returns:
+            bool: True if the schema is current, False otherwise
+        """
+        try:
+            with self._cursor() as (conn, cursor):
+                version = self._read_schema_version(cursor)
+                if version >= self.latest_schema_version:
+                    return True
+                cursor.execute("PRAGMA foreign_keys = OFF")
+                try:
+                    for migration in MIGRATIONS:
+                        if migration.version <= version:
+                            continue
+                        logger.info(f"Applying migration {migration.version}: {migration.description}")
+                        cursor.execute("BEGIN")
+                        for statement in migration.statements:
+                            cursor.execute(statement)
+                        cursor.execute("INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                                       (migration.version, migration.description))
+                        conn.commit()
+                        version = migration.version
+                finally:
+                    if conn.in_transaction:
+                        conn.rollback()
+                    cursor.execute(f"PRAGMA foreign_keys = {self.pragmas['foreign_keys']}")
+            logger.info(f"Database schema at version {version}")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error migrating database schema: {e}")
+            return False
+    
+    def _read_schema_version(self, cursor: sqlite3.Cursor) -> int:
+        cursor.execute(CREATE_VERSION_TABLE)
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        return int(cursor.fetchone()[0])
+    
+    def get_schema_version(self) -> int:
+        """
+        Get the applied schema version.
+        
+        Returns:
+            int: Highest applied migration, or -1 if it could not be read
+        """
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return -1
+        
+        try:
+            with self._cursor() as (conn, cursor):
+                return self._read_schema_version(cursor)
+        except sqlite3.Error as e:
+            logger.error(f"Error reading schema version: {e}")
+            return -1
+    
+    def check_query_plans(self) -> List[Dict[str, Any]]:
+        """
+        Run EXPLAIN QUERY PLAN on the hot queries and check the indexes they use.
+        
+        Returns:
+            List[Dict]: One dict per query with name, key (index in the plan),
+            expected and uses_index
+        """
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return []
+        
+        results = []
+        try:
+            with self._cursor() as (conn, cursor):
+                for name, query, params, expected in HOT_QUERIES:
+                    cursor.execute(f"EXPLAIN QUERY PLAN {query}", params)
+                    details = " ".join(str(row[3]) for row in cursor.fetchall())
+                    match = PLAN_INDEX_PATTERN.search(details)
+                    key = match.group(1) if match else None
+                    results.append({
+                        'name': name,
+                        'key': key,
+                        'expected': list(expected),
+                        'uses_index': key in expected
+                    })
+            return results
+        except sqlite3.Error as e:
+            logger.error(f"Error explaining queries: {e}")
+            return []
+    
+    def add_habit(self, name: str, description: str = "") -> bool:
+        """
+        Add a new habit to the database.
+        
+        Args:
+            name (str): Habit name
+            description (str): Habit description
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return False
+        
+        try:
+            with self._cursor() as (conn, cursor):
+                query = "INSERT INTO habits (name, description, created_date) VALUES (?, ?, ?)"
+                cursor.execute(query, (name, description, date.today()))
+                conn.commit()
+            logger.info(f"Habit '{name}' added successfully")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error adding habit: {e}")
+            return False
+    
+    def get_all_habits(self) -> List[Dict[str, Any]]:
+        """
+        Retrieve all active habits from database.
+        
+        Returns:
+            List[Dict]: List of habit dictionaries
+        """
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return []
+        
+        try:
+            with self._cursor(dictionary=True) as (conn, cursor):
+                cursor.execute("SELECT * FROM habits WHERE is_active = TRUE ORDER BY name")
+                return [dict(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Error retrieving habits: {e}")
+            return []
+    
+    def update_habit(self, habit_id: int, name: str, description: str = "") -> bool:
+        """
+        Update an existing habit.
+        
+        Args:
+            habit_id (int): Habit ID
+            name (str): New habit name
+            description (str): New habit description
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return False
+        
+        try:
+            with self._cursor() as (conn, cursor):
+                query = "UPDATE habits SET name = ?, description = ? WHERE id = ?"
+                cursor.execute(query, (name, description, habit_id))
+                conn.commit()
+            logger.info(f"Habit ID {habit_id} updated successfully")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error updating habit: {e}")
+            return False
+    
+    def delete_habit(self, habit_id: int) -> bool:
+        """
+        Soft delete a habit (mark as inactive).
+        
+        Args:
+            habit_id (int): Habit ID to delete
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return False
+        
+        try:
+            with self._cursor() as (conn, cursor):
+                cursor.execute("UPDATE habits SET is_active = FALSE WHERE id = ?", (habit_id,))
+                conn.commit()
+            logger.info(f"Habit ID {habit_id} deleted successfully")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error deleting habit: {e}")
+            return False
+    
+    def _write_entries(self, cursor: sqlite3.Cursor, entries: List[Tuple[int, date, bool]]) -> None:
+        """Upsert completed entries and delete the others inside the caller's transaction."""
+        upserts = [(habit_id, completion_date) for habit_id, completion_date, completed in entries if completed]
+        deletes = [(habit_id, completion_date) for habit_id, completion_date, completed in entries
+                   if not completed]
+        if upserts:
+            cursor.executemany("""
+            INSERT INTO habit_logs (habit_id, completion_date, completed) VALUES (?, ?, TRUE)
+            ON CONFLICT (habit_id, completion_date) DO UPDATE SET completed = excluded.completed
+            """, upserts)
+        if deletes:
+            cursor.executemany("DELETE FROM habit_logs WHERE habit_id = ? AND completion_date = ?",
+                               deletes)
+    
+    def log_habit_completion(self, habit_id: int, completion_date: date, completed: bool) -> bool:
+        """
+        Log habit completion for a specific date.
+        
+        Args:
+            habit_id (int): Habit ID
+            completion_date (date): Date of completion
+            completed (bool): Whether habit was completed
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return self.log_habit_completions([(habit_id, completion_date, completed)])
+    
+    def log_habit_completions(self, entries: List[Tuple[int, date, bool]]) -> bool:
+        """
+        Log several habit completions in one transaction.
+        
+        Args:
+            entries (List[Tuple[int, date, bool]]): (habit_id, completion_date, completed) rows
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not entries:
+            return True
+        return self._write_batches([entries], "Error logging habit completions")
+    
+    def write_completion_batches(self, batches: List[List[Tuple[int, date, bool]]]) -> bool:
+        """
+        Write several batches of completions in a single transaction.
+        
+        Statements run in-process, so executemany() per batch costs no round
+        trips; the monthly rollup of every touched month is recounted before
+        the commit.
+        
+        Args:
+            batches (List[List[Tuple[int, date, bool]]]): (habit_id, completion_date, completed) rows
+        
+        Returns:
+            bool: True if committed, False otherwise
+        """
+        return self._write_batches(batches, "Error writing completion batches")
+    
+    def _write_batches(self, batches: List[List[Tuple[int, date, bool]]], error_message: str) -> bool:
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return False
+        
+        try:
+            with self._cursor() as (conn, cursor):
+                months: Set[Tuple[int, int, int]] = set()
+                for batch in batches:
+                    self._write_entries(cursor, batch)
+                    months.update((habit_id, completion_date.year, completion_date.month)
+                                  for habit_id, completion_date, _ in batch)
+                self._refresh_monthly_stats(cursor, months)
+                conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"{error_message}: {e}")
+            return False
+    
+    def ensure_habits(self, names: List[str]) -> Tuple[Dict[str, int], int]:
+        """
+        Look up habits by name, creating the missing ones.
+        
+        Habits that exist but were deleted are returned as they are and not
+        reactivated. Names are matched like the NOCASE unique index compares
+        them, so "read" resolves to an existing "Read" (see nocase_key()).
+        
+        Args:
+            names (List[str]): Habit names
+        
+        Returns:
+            Tuple: ({name: habit_id} for every requested name that exists
+            afterwards, number of habits created)
+        """
+        if not names:
+            return {}, 0
+        
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return {}, 0
+        
+        ids: Dict[str, int] = {}
+        created = 0
+        try:
+            with self._cursor() as (conn, cursor):
+                for offset in range(0, len(names), BULK_CHUNK_SIZE):
+                    chunk = names[offset:offset + BULK_CHUNK_SIZE]
+                    cursor.executemany(
+                        "INSERT OR IGNORE INTO habits (name, description, created_date) VALUES (?, ?, ?)",
+                        [(name, "", date.today()) for name in chunk])
+                    created += max(0, cursor.rowcount)
+                    placeholders = ", ".join(["?"] * len(chunk))
+                    cursor.execute(f"SELECT name, id FROM habits WHERE name IN ({placeholders})", tuple(chunk))
+                    stored = {nocase_key(name): habit_id for name, habit_id in cursor.fetchall()}
+                    ids.update({name: stored[nocase_key(name)] for name in chunk
+                                if nocase_key(name) in stored})
+                conn.commit()
+            return ids, created
+        except sqlite3.Error as e:
+            logger.error(f"Error creating habits: {e}")
+            return {}, 0
+    
+    def get_habit_ids_by_name(self) -> Dict[str, int]:
+        """
+        Map the name of every habit, including deleted ones, to its ID.
+        
+        Returns:
+            Dict[str, int]: {name: habit_id}
+        """
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return {}
+        
+        try:
+            with self._cursor() as (conn, cursor):
+                cursor.execute("SELECT name, id FROM habits")
+                return {name: habit_id for name, habit_id in cursor.fetchall()}
+        except sqlite3.Error as e:
+            logger.error(f"Error retrieving habit names: {e}")
+            return {}
+    
+    def _refresh_monthly_stats(self, cursor: sqlite3.Cursor, months: Set[Tuple[int, int, int]]) -> None:
+        """
+        Recount habit_monthly_stats rows inside the caller's transaction.
+        
+        Args:
+            cursor: Cursor of the open transaction
+            months (Set[Tuple[int, int, int]]): (habit_id, year, month) rows to recount
+        """
+        query = """
+        INSERT INTO habit_monthly_stats (habit_id, year, month, completed_days)
+        SELECT ?, ?, ?, COUNT(*) FROM habit_logs
+        WHERE habit_id = ? AND completion_date BETWEEN ? AND ? AND completed = TRUE
+        ON CONFLICT (habit_id, year, month) DO UPDATE SET completed_days = excluded.completed_days
+        """
+        rows = []
+        for habit_id, year, month in sorted(months):
+            start_date = date(year, month, 1)
+            end_date = date(year, month, calendar.monthrange(year, month)[1])
+            rows.append((habit_id, year, month, habit_id, start_date, end_date))
+        cursor.executemany(query, rows)
+    
+    def rebuild_monthly_stats(self) -> bool:
+        """
+        Recompute the whole habit_monthly_stats table from habit_logs.
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return False
+        
+        try:
+            with self._cursor() as (conn, cursor):
+                cursor.execute("DELETE FROM habit_monthly_stats")
+                cursor.execute(f"""
+                INSERT INTO habit_monthly_stats (habit_id, year, month, completed_days)
+                SELECT habit_id, {COUNT_GRANULARITIES['month']}, COUNT(*)
+                FROM habit_logs
+                WHERE completed = TRUE
+                GROUP BY 1, 2, 3
+                """)
+                rows = cursor.rowcount
+                conn.commit()
+            logger.info(f"Monthly statistics rebuilt ({rows} rows)")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error rebuilding monthly statistics: {e}")
+            return False
+    
+    def verify_monthly_stats(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        Compare habit_monthly_stats with counts recomputed from habit_logs.
+        
+        Returns:
+            Optional[List[Dict]]: One dict per mismatching month with habit_id,
+            year, month, expected and actual; empty if the rollup is in sync.
+            None if the check could not run.
+        """
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return None
+        
+        try:
+            with self._cursor() as (conn, cursor):
+                cursor.execute(f"""
+                SELECT habit_id, {COUNT_GRANULARITIES['month']}, COUNT(*)
+                FROM habit_logs
+                WHERE completed = TRUE
+                GROUP BY 1, 2, 3
+                """)
+                expected = {(row[0], int(row[1]), int(row[2])): int(row[3]) for row in cursor.fetchall()}
+                cursor.execute("SELECT habit_id, year, month, completed_days FROM habit_monthly_stats")
+                actual = {(row[0], int(row[1]), int(row[2])): int(row[3]) for row in cursor.fetchall()}
+        except sqlite3.Error as e:
+            logger.error(f"Error verifying monthly statistics: {e}")
+            return None
+        
+        return self._diff_monthly_stats(expected, actual)
+    
+    def get_monthly_stats(self, habit_ids: List[int], start_date: date,
+                          end_date: date) -> Dict[int, Dict[Tuple[int, int], int]]:
+        """
+        Read completed-day counts per month from the habit_monthly_stats rollup.
+        
+        Args:
+            habit_ids (List[int]): Habit IDs
+            start_date (date): Any date in the first month
+            end_date (date): Any date in the last month
+        
+        Returns:
+            Dict[int, Dict[Tuple[int, int], int]]: {habit_id: {(year, month): completed_days}}.
+            Every requested habit has an entry, possibly empty.
+        """
+        counts: Dict[int, Dict[Tuple[int, int], int]] = {habit_id: {} for habit_id in habit_ids}
+        if not habit_ids:
+            return counts
+        
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return counts
+        
+        first_month = start_date.year * 12 + start_date.month - 1
+        last_month = end_date.year * 12 + end_date.month - 1
+        try:
+            with self._cursor() as (conn, cursor):
+                for offset in range(0, len(habit_ids), BULK_CHUNK_SIZE):
+                    chunk = habit_ids[offset:offset + BULK_CHUNK_SIZE]
+                    placeholders = ", ".join(["?"] * len(chunk))
+                    query = f"""
+                    SELECT habit_id, year, month, completed_days FROM habit_monthly_stats
+                    WHERE habit_id IN ({placeholders}) AND year BETWEEN ? AND ?
+                    AND year * 12 + month - 1 BETWEEN ? AND ?
+                    """
+                    cursor.execute(query, (*chunk, start_date.year, end_date.year,
+                                           first_month, last_month))
+                    for habit_id, year, month, completed_days in cursor.fetchall():
+                        counts.setdefault(habit_id, {})[(int(year), int(month))] = int(completed_days)
+            return counts
+        except sqlite3.Error as e:
+            logger.error(f"Error retrieving monthly statistics: {e}")
+            return counts
+    
+    def get_habit_logs(self, habit_id: int, start_date: date, end_date: date) -> List[Dict[str, Any]]:
+        """
+        Get habit completion logs for a date range.
+        
+        Args:
+            habit_id (int): Habit ID
+            start_date (date): Start date
+            end_date (date): End date
+        
+        Returns:
+            List[Dict]: List of log dictionaries, one per completed day
+        """
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return []
+        
+        try:
+            with self._cursor(dictionary=True) as (conn, cursor):
+                query = """
+                SELECT * FROM habit_logs
+                WHERE habit_id = ? AND completion_date BETWEEN ? AND ?
+                ORDER BY completion_date
+                """
+                cursor.execute(query, (habit_id, start_date, end_date))
+                return [dict(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Error retrieving habit logs: {e}")
+            return []
+    
+    def get_logs_for_habits(self, habit_ids: List[int], start_date: date,
+                            end_date: date) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Get completion logs for several habits over a date range in bulk.
+        
+        Args:
+            habit_ids (List[int]): Habit IDs
+            start_date (date): Start date
+            end_date (date): End date
+        
+        Returns:
+            Dict[int, List[Dict]]: {habit_id: [log, ...]} ordered by date.
+            Every requested habit has an entry, possibly empty.
+        """
+        logs_by_habit: Dict[int, List[Dict[str, Any]]] = {habit_id: [] for habit_id in habit_ids}
+        if not habit_ids:
+            return logs_by_habit
+        
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return logs_by_habit
+        
+        try:
+            with self._cursor(dictionary=True) as (conn, cursor):
+                for offset in range(0, len(habit_ids), BULK_CHUNK_SIZE):
+                    chunk = habit_ids[offset:offset + BULK_CHUNK_SIZE]
+                    placeholders = ", ".join(["?"] * len(chunk))
+                    query = f"""
+                    SELECT * FROM habit_logs
+                    WHERE habit_id IN ({placeholders}) AND completion_date BETWEEN ? AND ?
+                    ORDER BY habit_id, completion_date
+                    """
+                    cursor.execute(query, (*chunk, start_date, end_date))
+                    for row in cursor.fetchall():
+                        logs_by_habit.setdefault(row['habit_id'], []).append(dict(row))
+            return logs_by_habit
+        except sqlite3.Error as e:
+            logger.error(f"Error retrieving habit logs in bulk: {e}")
+            return logs_by_habit
+    
+    def get_completion_counts(self, habit_ids: List[int], start_date: date, end_date: date,
+                              granularity: str = 'month') -> Dict[int, Dict[Tuple[int, ...], int]]:
+        """
+        Count completed days per habit and period with a single GROUP BY query.
+        
+        Args:
+            habit_ids (List[int]): Habit IDs
+            start_date (date): Start date
+            end_date (date): End date
+            granularity (str): 'week', 'month' or 'year'
+        
+        Returns:
+            Dict[int, Dict[Tuple, int]]: {habit_id: {bucket: completed_days}} where
+            bucket is (iso_year, iso_week), (year, month) or (year,). Periods
+            without completions are omitted. Every requested habit has an entry.
+        
+        Raises:
+            ValueError: If granularity is not supported
+        """
+        if granularity not in COUNT_GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+        
+        counts: Dict[int, Dict[Tuple[int, ...], int]] = {habit_id: {} for habit_id in habit_ids}
+        if not habit_ids:
+            return counts
+        
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return counts
+        
+        bucket = COUNT_GRANULARITIES[granularity]
+        try:
+            with self._cursor() as (conn, cursor):
+                for offset in range(0, len(habit_ids), BULK_CHUNK_SIZE):
+                    chunk = habit_ids[offset:offset + BULK_CHUNK_SIZE]
+                    placeholders = ", ".join(["?"] * len(chunk))
+                    query = f"""
+                    SELECT habit_id, {bucket}, COUNT(*) FROM habit_logs
+                    WHERE habit_id IN ({placeholders}) AND completion_date BETWEEN ? AND ?
+                    AND completed = TRUE
+                    GROUP BY habit_id, {bucket}
+                    """
+                    cursor.execute(query, (*chunk, start_date, end_date))
+                    for row in cursor.fetchall():
+                        habit_id, *period, completed_days = row
+                        counts.setdefault(habit_id, {})[tuple(int(p) for p in period)] = int(completed_days)
+            return counts
+        except sqlite3.Error as e:
+            logger.error(f"Error retrieving completion counts: {e}")
+            return counts
+    
+    def get_completed_dates(self, habit_id: int) -> List[date]:
+        """
+        Get every day a habit was completed, over its whole history.
+        
+        Args:
+            habit_id (int): Habit ID
+        
+        Returns:
+            List[date]: Completed days in ascending order
+        """
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return []
+        
+        try:
+            with self._cursor() as (conn, cursor):
+                query = """
+                SELECT completion_date FROM habit_logs
+                WHERE habit_id = ? AND completed = TRUE
+                ORDER BY completion_date
+                """
+                cursor.execute(query, (habit_id,))
+                return [row[0] for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Error retrieving completed dates: {e}")
+            return []
+    
+    def get_completed_dates_for_habits(self, habit_ids: List[int], start_date: Optional[date] = None,
+                                       end_date: Optional[date] = None) -> Dict[int, List[date]]:
+        """
+        Get every completed day of several habits, chunked like get_logs_for_habits().
+        
+        Args:
+            habit_ids (List[int]): Habit IDs
+            start_date (date, optional): First day loaded, together with end_date
+            end_date (date, optional): Last day loaded; the whole history if omitted
+        
+        Returns:
+            Dict[int, List[date]]: {habit_id: [completed day, ...]}.
+            Every requested habit has an entry, possibly empty.
+        """
+        completed: Dict[int, List[date]] = {habit_id: [] for habit_id in habit_ids}
+        if not habit_ids:
+            return completed
+        
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return completed
+        
+        # A window keeps the transfer proportional to the days analysed, not to the account's age
+        window = ""
+        window_params: Tuple[date, ...] = ()
+        if start_date is not None and end_date is not None:
+            window = " AND completion_date BETWEEN ? AND ?"
+            window_params = (start_date, end_date)
+        
+        try:
+            with self._cursor() as (conn, cursor):
+                for offset in range(0, len(habit_ids), BULK_CHUNK_SIZE):
+                    chunk = habit_ids[offset:offset + BULK_CHUNK_SIZE]
+                    placeholders = ", ".join(["?"] * len(chunk))
+                    query = f"""
+                    SELECT habit_id, completion_date FROM habit_logs
+                    WHERE habit_id IN ({placeholders}) AND completed = TRUE{window}
+                    """
+                    cursor.execute(query, (*chunk, *window_params))
+                    for habit_id, completion_date in cursor.fetchall():
+                        completed.setdefault(habit_id, []).append(completion_date)
+            return completed
+        except sqlite3.Error as e:
+            logger.error(f"Error retrieving completed dates in bulk: {e}")
+            return completed
+    
+    def iter_log_rows(self, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                      fetch_size: int = 1000) -> Iterator[Tuple[int, str, date, bool]]:
+        """
+        Stream habit_logs joined with habit names, fetch_size rows at a time.
+        
+        The connection lock is held until the generator is exhausted or
+        closed; use a dedicated manager when other threads must query meanwhile.
+        
+        Args:
+            start_date (date, optional): First day to include
+            end_date (date, optional): Last day to include
+            fetch_size (int): Rows read per fetchmany() call
+        
+        Yields:
+            Tuple: (habit_id, habit_name, completion_date, completed), ordered
+            by habit and date
+        
+        Raises:
+            sqlite3.Error: If the query fails part-way; the stream is incomplete
+        """
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return
+        
+        conditions = []
+        params: List[Any] = []
+        if start_date is not None:
+            conditions.append("l.completion_date >= ?")
+            params.append(start_date)
+        if end_date is not None:
+            conditions.append("l.completion_date <= ?")
+            params.append(end_date)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+        SELECT l.habit_id, h.name, l.completion_date, l.completed
+        FROM habit_logs l JOIN habits h ON h.id = l.habit_id
+        {where}
+        ORDER BY l.habit_id, l.completion_date
+        """
+        
+        try:
+            with self._cursor() as (conn, cursor):
+                cursor.execute(query, tuple(params))
+                while True:
+                    rows = cursor.fetchmany(fetch_size)
+                    if not rows:
+                        break
+                    for habit_id, name, completion_date, completed in rows:
+                        yield habit_id, name, completion_date, bool(completed)
+        except sqlite3.Error as e:
+            logger.error(f"Error streaming habit logs: {e}")
+            raise
+    
+    def get_habit_completion_status(self, habit_id: int, completion_date: date) -> bool:
+        """
+        Check if a habit was completed on a specific date.
+        
+        Args:
+            habit_id (int): Habit ID
+            completion_date (date): Date to check
+        
+        Returns:
+            bool: True if completed, False otherwise
+        """
+        if not self._check_connection():
+            logger.error("No database connection available")
+            return False
+        
+        try:
+            with self._cursor() as (conn, cursor):
+                query = "SELECT completed FROM habit_logs WHERE habit_id = ? AND completion_date = ?"
+                cursor.execute(query, (habit_id, completion_date))
+                result = cursor.fetchone()
+            return bool(result[0]) if result else False
+        except sqlite3.Error as e:
+            logger.error(f"Error checking completion status: {e}")
+            return False
+    
+    def close_connection(self) -> None:
+        """Close database connection, letting SQLite refresh its planner statistics first."""
+        with self.lock:
+            if self.connection is None:
+                return
+            try:
+                self.connection.execute("PRAGMA optimize")
+            except sqlite3.Error as e:
+                logger.warning(f"PRAGMA optimize failed: {e}")
+            self.connection.close()
+            self.connection = None
+            logger.info("Database connection closed")
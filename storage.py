@@ -0,0 +1,255 @@
+from abc import ABC, abstractmethod
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+import importlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Try to import configuration
+try:
+    from config import STORAGE_CONFIG
+except ImportError:
+    # Default configuration: MySQL, as before backends were pluggable
+    STORAGE_CONFIG = {
+        'backend': 'mysql',
+        'sqlite_path': 'habit_tracker.db'
+    }
+
+# {backend name: (module, class)}; modules are imported only when selected, so
+# a SQLite install does not need the MySQL connector
+BACKENDS = {
+    'mysql': ('database', 'DatabaseManager'),
+    'sqlite': ('sqlite_backend', 'SQLiteDatabaseManager')
+}
+
+class Migration(NamedTuple):
+    """A forward-only schema change."""
+    version: int
+    description: str
+    statements: List[str]
+
+
+class CountingCursor:
+    """Cursor wrapper that reports every statement it sends to a listener."""
+    
+    def __init__(self, cursor: Any, listener: Callable[[], None]):
+        self._cursor = cursor
+        self._listener = listener
+    
+    def execute(self, *args: Any, **kwargs: Any) -> Any:
+        self._listener()
+        return self._cursor.execute(*args, **kwargs)
+    
+    def executemany(self, *args: Any, **kwargs: Any) -> Any:
+        # Counted once: the MySQL connector batches INSERTs into one statement
+        self._listener()
+        return self._cursor.executemany(*args, **kwargs)
+    
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._cursor)
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
+
+class StorageBackend(ABC):
+    """Storage interface used by HabitManager, the GUI and the command line tools.
+    
+    Backends follow the same conventions as the original MySQL manager:
+    methods log database errors and return False, an empty result or a
+    neutral value instead of raising, and a missing log row always means
+    "not completed".
+    """
+    
+    # Highest schema migration this backend knows about
+    latest_schema_version = 0
+    # Called for every SQL statement when set, e.g. by instrumentation.InstrumentedStorage
+    statement_listener: Optional[Callable[[], None]] = None
+    
+    @abstractmethod
+    def connect(self) -> bool:
+        """Open the database and bring its schema up to date."""
+    
+    @abstractmethod
+    def close_connection(self) -> None:
+        """Close every connection held by the backend."""
+    
+    @abstractmethod
+    def get_schema_version(self) -> int:
+        """Return the applied schema version, or -1 if it could not be read."""
+    
+    @abstractmethod
+    def check_query_plans(self) -> List[Dict[str, Any]]:
+        """Report whether the hot queries use their expected indexes."""
+    
+    @abstractmethod
+    def add_habit(self, name: str, description: str = "") -> bool:
+        """Add a new habit."""
+    
+    @abstractmethod
+    def get_all_habits(self) -> List[Dict[str, Any]]:
+        """Return every active habit ordered by name."""
+    
+    @abstractmethod
+    def update_habit(self, habit_id: int, name: str, description: str = "") -> bool:
+        """Rename or re-describe a habit."""
+    
+    @abstractmethod
+    def delete_habit(self, habit_id: int) -> bool:
+        """Soft delete a habit."""
+    
+    @abstractmethod
+    def log_habit_completion(self, habit_id: int, completion_date: date, completed: bool) -> bool:
+        """Record whether a habit was completed on a day."""
+    
+    @abstractmethod
+    def log_habit_completions(self, entries: List[Tuple[int, date, bool]]) -> bool:
+        """Record several (habit_id, completion_date, completed) entries in one transaction."""
+    
+    @abstractmethod
+    def write_completion_batches(self, batches: List[List[Tuple[int, date, bool]]]) -> bool:
+        """Write several batches of entries in one transaction (bulk import)."""
+    
+    @abstractmethod
+    def ensure_habits(self, names: List[str]) -> Tuple[Dict[str, int], int]:
+        """Look up habits by name, creating the missing ones; also returns how many were created."""
+    
+    @abstractmethod
+    def get_habit_ids_by_name(self) -> Dict[str, int]:
+        """Map the name of every habit, including deleted ones, to its ID."""
+    
+    @abstractmethod
+    def rebuild_monthly_stats(self) -> bool:
+        """Recompute the monthly rollup from the logs."""
+    
+    @abstractmethod
+    def verify_monthly_stats(self) -> Optional[List[Dict[str, Any]]]:
+        """Return months where the rollup disagrees with the logs, or None on error."""
+    
+    @abstractmethod
+    def get_monthly_stats(self, habit_ids: List[int], start_date: date,
+                          end_date: date) -> Dict[int, Dict[Tuple[int, int], int]]:
+        """Read {habit_id: {(year, month): completed_days}} from the rollup."""
+    
+    @abstractmethod
+    def get_habit_logs(self, habit_id: int, start_date: date, end_date: date) -> List[Dict[str, Any]]:
+        """Return a habit's log rows in a date range, ordered by date."""
+    
+    @abstractmethod
+    def get_logs_for_habits(self, habit_ids: List[int], start_date: date,
+                            end_date: date) -> Dict[int, List[Dict[str, Any]]]:
+        """Return {habit_id: [log, ...]} for several habits in one go."""
+    
+    @abstractmethod
+    def get_completion_counts(self, habit_ids: List[int], start_date: date, end_date: date,
+                              granularity: str = 'month') -> Dict[int, Dict[Tuple[int, ...], int]]:
+        """Count completed days per habit and week, month or year."""
+    
+    @abstractmethod
+    def get_completed_dates(self, habit_id: int) -> List[date]:
+        """Return every completed day of a habit in ascending order."""
+    
+    @abstractmethod
+    def get_completed_dates_for_habits(self, habit_ids: List[int], start_date: Optional[date] = None,
+                                       end_date: Optional[date] = None) -> Dict[int, List[date]]:
+        """Return {habit_id: [completed day, ...]} for several habits."""
+    
+    @abstractmethod
+    def iter_log_rows(self, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                      fetch_size: int = 1000) -> Iterator[Tuple[int, str, date, bool]]:
+        """Stream (habit_id, habit_name, completion_date, completed) rows."""
+    
+    @abstractmethod
+    def get_habit_completion_status(self, habit_id: int, completion_date: date) -> bool:
+        """Check if a habit was completed on a day."""
+    
+    def get_habit_statistics(self, habit_id: int, start_date: date, end_date: date) -> Dict[str, Any]:
+        """
+        Get statistics for a habit in a date range.
+        
+        Args:
+            habit_id (int): Habit ID
+            start_date (date): Start date
+            end_date (date): End date
+        
+        Returns:
+            Dict: Statistics dictionary
+        """
+        logs = self.get_habit_logs(habit_id, start_date, end_date)
+        
+        total_days = (end_date - start_date).days + 1
+        completed_days = sum(1 for log in logs if log['completed'])
+        completion_rate = (completed_days / total_days) * 100 if total_days > 0 else 0
+        
+        # Calculate current streak: consecutive completed days ending at end_date
+        # (or the day before); a day without a row breaks the streak
+        completed_dates = {log['completion_date'] for log in logs if log['completed']}
+        streak_day = end_date if end_date in completed_dates else end_date - timedelta(days=1)
+        current_streak = 0
+        while streak_day >= start_date and streak_day in completed_dates:
+            current_streak += 1
+            streak_day -= timedelta(days=1)
+        
+        return {
+            'total_days': total_days,
+            'completed_days': completed_days,
+            'completion_rate': completion_rate,
+            'current_streak': current_streak
+        }
+    
+    def _count_statements(self, cursor: Any) -> Any:
+        """Wrap a cursor so statement_listener sees its statements, if one is set."""
+        if self.statement_listener is None:
+            return cursor
+        return CountingCursor(cursor, self.statement_listener)
+    
+    @staticmethod
+    def _diff_monthly_stats(expected: Dict[Tuple[int, int, int], int],
+                            actual: Dict[Tuple[int, int, int], int]) -> List[Dict[str, Any]]:
+        """List the (habit_id, year, month) keys whose rollup count is wrong."""
+        mismatches = []
+        for key in sorted(set(expected) | set(actual)):
+            if expected.get(key, 0) != actual.get(key, 0):
+                habit_id, year, month = key
+                mismatches.append({
+                    'habit_id': habit_id,
+                    'year': year,
+                    'month': month,
+                    'expected': expected.get(key, 0),
+                    'actual': actual.get(key, 0)
+                })
+        return mismatches
+
+
+def create_storage(config: Optional[Dict[str, Any]] = None) -> StorageBackend:
+    """
+    Create the storage backend selected in STORAGE_CONFIG.
+    
+    Args:
+        config (dict, optional): Storage configuration, STORAGE_CONFIG if omitted
+    
+    Returns:
+        StorageBackend: Unconnected backend, wrapped by instrumentation.InstrumentedStorage
+        when INSTRUMENTATION_CONFIG is enabled
+    
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    if config is None:
+        config = STORAGE_CONFIG
+    name = config.get('backend', 'mysql')
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown storage backend: {name}")
+    module_name, class_name = BACKENDS[name]
+    backend_class = getattr(importlib.import_module(module_name), class_name)
+    if name == 'sqlite':
+        backend = backend_class(config.get('sqlite_path', 'habit_tracker.db'))
+    else:
+        backend = backend_class()
+    
+    # Imported here because instrumentation builds on this module
+    from instrumentation import INSTRUMENTATION, instrument_storage
+    if INSTRUMENTATION.enabled:
+        return instrument_storage(backend)
+    return backend
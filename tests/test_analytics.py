@@ -0,0 +1,69 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from analytics import completion_matrix, compute_analytics, matrix_from_bitmaps
+from bitmap import HabitLogBitmap
+
+# A Monday, so weekday columns line up with the matrix columns
+START = date(2025, 3, 3)
+END = START + timedelta(days=13)
+
+# Habit 1 completes the whole first week, habit 2 every other day
+COMPLETED = {
+    1: [START + timedelta(days=offset) for offset in range(7)],
+    2: [START + timedelta(days=offset) for offset in range(0, 14, 2)]
+}
+
+
+def test_completion_matrix_rows_follow_habit_order():
+    habit_ids, matrix = completion_matrix(COMPLETED, START, END)
+    
+    assert habit_ids == [1, 2]
+    assert matrix.tolist() == [[1] * 7 + [0] * 7, [1, 0] * 7]
+
+
+def test_completion_matrix_ignores_days_outside_the_window():
+    _, matrix = completion_matrix({1: [START - timedelta(days=1), START, END + timedelta(days=1)]},
+                                  START, END)
+    
+    assert matrix.tolist() == [[1] + [0] * 13]
+
+
+def test_matrix_from_bitmaps_matches_completion_matrix():
+    bitmaps = {habit_id: HabitLogBitmap.from_dates(START - timedelta(days=5), dates)
+               for habit_id, dates in COMPLETED.items()}
+    
+    _, expected = completion_matrix(COMPLETED, START, END)
+    _, matrix = matrix_from_bitmaps(bitmaps, START, END)
+    
+    np.testing.assert_array_equal(matrix, expected)
+
+
+def test_compute_analytics_matches_hand_computed_rates():
+    habit_ids, matrix = completion_matrix(COMPLETED, START, END)
+    
+    analytics = compute_analytics(habit_ids, matrix, START)
+    
+    first, alternate = analytics[1], analytics[2]
+    assert first['completion_rate'] == alternate['completion_rate'] == 50.0
+    # Last 7 days: nothing for habit 1, days 8, 10 and 12 for habit 2
+    assert first['rolling_7'] == 0.0
+    assert alternate['rolling_7'] == 42.9
+    assert first['rolling_30'] == alternate['rolling_30'] == 50.0
+    assert first['weekday_rates'] == [50.0] * 7
+    assert first['monthly'] == [{'month': 'Mar 2025', 'percentage': 50.0, 'delta': 0.0}]
+    # Weekly rates 1 and 0 are as uneven as possible; 4/7 and 3/7 average
+    # 0.5 with a spread of 1/14, giving 50 * (1 - 1/7)
+    assert first['consistency'] == 0.0
+    assert alternate['consistency'] == 42.9
+
+
+def test_days_before_a_habit_started_are_not_counted():
+    habit_ids, matrix = completion_matrix({3: [START + timedelta(days=9), START + timedelta(days=11)]},
+                                          START, END)
+    
+    assert compute_analytics(habit_ids, matrix, START)[3]['completion_rate'] == 14.3
+    # Started on day 7: 2 of the last 7 days
+    analytics = compute_analytics(habit_ids, matrix, START, [START + timedelta(days=7)])
+    assert analytics[3]['completion_rate'] == 28.6
@@ -0,0 +1,89 @@
+from datetime import date, timedelta
+import random
+
+from bitmap import HabitLogBitmap
+
+# Ordinal divisible by 8, so offsets 0-7 share a byte with the origin
+ALIGNED = date.fromordinal(date(2025, 1, 1).toordinal() // 8 * 8)
+
+
+def brute_force_count(completed, start_date, end_date):
+    return sum(1 for day in completed if start_date <= day <= end_date)
+
+
+def test_origin_is_aligned_to_a_byte():
+    bitmap = HabitLogBitmap(ALIGNED + timedelta(days=5))
+    
+    assert bitmap.origin == ALIGNED
+    assert bitmap.nbytes == 0
+
+
+def test_count_and_completed_dates_at_byte_edges():
+    # Last bit of byte 0, both edge bits of byte 1, first bit of byte 3
+    offsets = [7, 8, 15, 24]
+    completed = [ALIGNED + timedelta(days=offset) for offset in offsets]
+    bitmap = HabitLogBitmap.from_dates(ALIGNED, completed)
+    
+    assert bitmap.nbytes == 4
+    assert list(bitmap.completed_dates()) == completed
+    for first in range(0, 26):
+        for last in range(first, 26):
+            start_date = ALIGNED + timedelta(days=first)
+            end_date = ALIGNED + timedelta(days=last)
+            assert bitmap.count(start_date, end_date) == brute_force_count(completed, start_date, end_date)
+            assert list(bitmap.completed_dates(start_date, end_date)) == \
+                [day for day in completed if start_date <= day <= end_date]
+
+
+def test_ranges_outside_the_bitmap():
+    bitmap = HabitLogBitmap.from_dates(ALIGNED, [ALIGNED, ALIGNED + timedelta(days=9)])
+    
+    assert bitmap.count(ALIGNED - timedelta(days=30), ALIGNED + timedelta(days=30)) == 2
+    assert bitmap.count(ALIGNED + timedelta(days=40), ALIGNED + timedelta(days=50)) == 0
+    assert bitmap.count(ALIGNED + timedelta(days=9), ALIGNED) == 0
+    assert list(bitmap.completed_dates(end_date=ALIGNED - timedelta(days=1))) == []
+    assert not bitmap.get(ALIGNED - timedelta(days=1))
+
+
+def test_set_grows_backwards():
+    bitmap = HabitLogBitmap(ALIGNED)
+    bitmap.set(ALIGNED + timedelta(days=3), True)
+    
+    earlier = ALIGNED - timedelta(days=13)
+    bitmap.set(earlier, True)
+    
+    assert bitmap.origin == ALIGNED - timedelta(days=16)
+    assert bitmap.origin_ordinal % 8 == 0
+    assert bitmap.get(earlier)
+    assert bitmap.get(ALIGNED + timedelta(days=3))
+    assert list(bitmap.completed_dates()) == [earlier, ALIGNED + timedelta(days=3)]
+    assert bitmap.count(earlier, ALIGNED + timedelta(days=3)) == 2
+
+
+def test_clearing_outside_the_bitmap_does_not_grow_it():
+    bitmap = HabitLogBitmap.from_dates(ALIGNED, [ALIGNED])
+    
+    bitmap.set(ALIGNED - timedelta(days=100), False)
+    bitmap.set(ALIGNED + timedelta(days=100), False)
+    
+    assert bitmap.origin == ALIGNED
+    assert bitmap.nbytes == 1
+
+
+def test_random_toggles_match_a_set():
+    rng = random.Random(12)
+    bitmap = HabitLogBitmap(ALIGNED)
+    completed = set()
+    for _ in range(1000):
+        day = ALIGNED + timedelta(days=rng.randrange(-60, 60))
+        done = rng.random() < 0.6
+        bitmap.set(day, done)
+        if done:
+            completed.add(day)
+        else:
+            completed.discard(day)
+    
+    assert list(bitmap.completed_dates()) == sorted(completed)
+    assert bitmap.count(ALIGNED - timedelta(days=60), ALIGNED + timedelta(days=60)) == len(completed)
+    assert bitmap.count(ALIGNED - timedelta(days=7), ALIGNED + timedelta(days=7)) == \
+        brute_force_count(completed, ALIGNED - timedelta(days=7), ALIGNED + timedelta(days=7))
@@ -0,0 +1,52 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from analytics import completion_matrix, correlation_matrix, top_pairs
+
+START = date(2025, 3, 3)
+END = START + timedelta(days=13)
+
+
+def test_correlation_matches_hand_computed_example():
+    _, matrix = completion_matrix({
+        1: [START + timedelta(days=offset) for offset in range(7)],
+        2: [START + timedelta(days=offset) for offset in range(0, 14, 2)],
+        3: [],
+        4: [START + timedelta(days=offset) for offset in range(7, 14)]
+    }, START, END)
+    
+    correlation, cooccurrence = correlation_matrix(matrix)
+    
+    # Both rows have mean 1/2, so every centred value is +-1/2. The rows
+    # agree on 8 days and disagree on 6: covariance sum (8 - 6) / 4 = 1/2,
+    # variance sums 14 / 4 = 7/2, correlation 1/7
+    np.testing.assert_allclose([correlation[0, 1], correlation[1, 0]], 1 / 7)
+    assert correlation[0, 3] == -1.0
+    np.testing.assert_array_equal(correlation[2], 0.0)
+    np.testing.assert_allclose(np.diag(correlation)[[0, 1, 3]], 1.0)
+    assert cooccurrence.tolist() == [
+        [7, 4, 0, 0],
+        [4, 7, 0, 3],
+        [0, 0, 0, 0],
+        [0, 3, 0, 7]
+    ]
+
+
+def test_top_pairs_orders_by_correlation():
+    correlation = np.array([
+        [1.0, 0.2, 0.9],
+        [0.2, 1.0, -0.5],
+        [0.9, -0.5, 1.0]
+    ])
+    
+    assert top_pairs(correlation, k=2) == [(0, 2, 0.9), (0, 1, 0.2)]
+    assert top_pairs(correlation, k=10) == [(0, 2, 0.9), (0, 1, 0.2), (1, 2, -0.5)]
+    assert top_pairs(correlation, k=0) == []
+
+
+def test_empty_window_has_no_correlation():
+    correlation, cooccurrence = correlation_matrix(np.zeros((2, 0), dtype=np.uint8))
+    
+    assert correlation.tolist() == [[0.0, 0.0], [0.0, 0.0]]
+    assert cooccurrence.tolist() == [[0, 0], [0, 0]]
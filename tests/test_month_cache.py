@@ -0,0 +1,73 @@
+from datetime import date
+
+import pytest
+
+from habit_manager import HabitManager
+from storage import create_storage
+
+
+@pytest.fixture
+def manager():
+    backend = create_storage({'backend': 'sqlite', 'sqlite_path': ':memory:'})
+    assert backend.connect()
+    manager = HabitManager(backend)
+    assert manager.add_new_habit("Read")
+    yield manager
+    backend.close_connection()
+
+
+def habit_id(manager, name):
+    return manager.db_manager.get_habit_ids_by_name()[name]
+
+
+def test_repeated_month_reads_hit_the_cache(manager):
+    manager.get_month_data(2025, 3)
+    manager.get_month_data(2025, 3)
+    
+    stats = manager.cache_stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+
+def test_toggles_write_through_to_the_cached_month(manager):
+    read = habit_id(manager, "Read")
+    manager.get_month_data(2025, 3)
+    
+    assert manager.toggle_habit_completion(read, date(2025, 3, 4))
+    
+    assert manager.get_month_data(2025, 3)[4][read] is True
+    assert manager.cache_stats()['misses'] == 1
+
+
+def test_refresh_drops_months_changed_outside_the_manager(manager):
+    read = habit_id(manager, "Read")
+    assert manager.get_month_data(2025, 3)[4][read] is False
+    version = manager.data_version(2025, 3)
+    
+    # Written straight to storage, as by another instance or an import
+    manager.db_manager.log_habit_completion(read, date(2025, 3, 4), True)
+    assert manager.get_month_data(2025, 3)[4][read] is False
+    
+    manager.clear_cache()
+    
+    assert manager.data_version(2025, 3) != version
+    assert manager.cache_stats()['entries'] == 0
+    assert manager.get_month_data(2025, 3)[4][read] is True
+
+
+def test_new_habits_invalidate_cached_grids(manager):
+    manager.get_month_data(2025, 3)
+    
+    assert manager.add_new_habit("Run")
+    
+    month_data = manager.get_month_data(2025, 3)
+    assert habit_id(manager, "Run") in month_data[1]
+
+
+def test_grid_built_for_other_habits_is_rebuilt(manager):
+    read = habit_id(manager, "Read")
+    manager.get_month_data(2025, 3, habits=[])
+    
+    month_data = manager.get_month_data(2025, 3, habits=manager.get_habits())
+    
+    assert read in month_data[1]
+    assert manager.cache_stats()['hits'] == 0
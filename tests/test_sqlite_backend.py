@@ -0,0 +1,71 @@
+from datetime import date
+
+import pytest
+
+from storage import create_storage
+
+
+@pytest.fixture
+def storage():
+    backend = create_storage({'backend': 'sqlite', 'sqlite_path': ':memory:'})
+    assert backend.connect()
+    yield backend
+    backend.close_connection()
+
+
+def habit_id(storage, name):
+    return storage.get_habit_ids_by_name()[name]
+
+
+def test_add_toggle_delete_round_trip(storage):
+    assert storage.add_habit("Read", "20 pages")
+    read = habit_id(storage, "Read")
+    
+    assert storage.log_habit_completion(read, date(2025, 3, 4), True)
+    assert storage.get_habit_completion_status(read, date(2025, 3, 4))
+    assert storage.get_completed_dates(read) == [date(2025, 3, 4)]
+    
+    assert storage.log_habit_completion(read, date(2025, 3, 4), False)
+    assert not storage.get_habit_completion_status(read, date(2025, 3, 4))
+    assert storage.get_completed_dates(read) == []
+    
+    assert storage.delete_habit(read)
+    assert [habit['name'] for habit in storage.get_all_habits()] == []
+
+
+def test_logs_are_sparse(storage):
+    storage.add_habit("Run")
+    run = habit_id(storage, "Run")
+    storage.log_habit_completions([(run, date(2025, 3, 1), True),
+                                   (run, date(2025, 3, 2), True),
+                                   (run, date(2025, 3, 3), False)])
+    storage.log_habit_completion(run, date(2025, 3, 2), False)
+    
+    logs = storage.get_habit_logs(run, date(2025, 3, 1), date(2025, 3, 31))
+    assert [(log['completion_date'], bool(log['completed'])) for log in logs] == [(date(2025, 3, 1), True)]
+
+
+def test_monthly_rollup_follows_toggles(storage):
+    storage.add_habit("Stretch")
+    stretch = habit_id(storage, "Stretch")
+    storage.log_habit_completions([(stretch, date(2025, 1, 31), True),
+                                   (stretch, date(2025, 2, 1), True),
+                                   (stretch, date(2025, 2, 2), True)])
+    storage.log_habit_completion(stretch, date(2025, 1, 31), False)
+    
+    stats = storage.get_monthly_stats([stretch], date(2025, 1, 1), date(2025, 2, 28))
+    assert stats[stretch].get((2025, 1), 0) == 0
+    assert stats[stretch][(2025, 2)] == 2
+    assert storage.verify_monthly_stats() == []
+
+
+def test_ensure_habits_folds_case(storage):
+    storage.add_habit("Read")
+    read = habit_id(storage, "Read")
+    
+    ids, created = storage.ensure_habits(["read", "READ", "Swim", "swim"])
+    
+    assert created == 1
+    assert ids["read"] == ids["READ"] == read
+    assert ids["Swim"] == ids["swim"] != read
+    assert not storage.add_habit("rEAD")
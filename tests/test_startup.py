@@ -0,0 +1,8 @@
+from benchmark import measure_startup
+
+
+def test_startup_stays_within_budget():
+    result = measure_startup()
+    
+    assert result['deferred_loaded'] == []
+    assert result['within_budget'], f"median {result['median_ms']:.1f} ms over {result['budget_ms']} ms"
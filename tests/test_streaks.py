@@ -0,0 +1,59 @@
+from datetime import date, timedelta
+import random
+
+from streaks import StreakIndex
+
+START = date(2025, 1, 1)
+DAYS = 120
+
+
+def brute_force_streaks(completed, as_of):
+    longest = run = 0
+    for offset in range(DAYS):
+        run = run + 1 if START + timedelta(days=offset) in completed else 0
+        longest = max(longest, run)
+    
+    day = as_of if as_of in completed else as_of - timedelta(days=1)
+    current = 0
+    while day in completed:
+        current += 1
+        day -= timedelta(days=1)
+    return {'current_streak': current, 'longest_streak': longest}
+
+
+def test_streak_index_matches_brute_force():
+    rng = random.Random(11)
+    completed = {START + timedelta(days=offset) for offset in range(DAYS) if rng.random() < 0.6}
+    index = StreakIndex()
+    index.load(1, completed)
+    
+    for _ in range(2000):
+        day = START + timedelta(days=rng.randrange(DAYS))
+        done = rng.random() < 0.5
+        index.update(1, day, done)
+        if done:
+            completed.add(day)
+        else:
+            completed.discard(day)
+        
+        as_of = START + timedelta(days=rng.randrange(DAYS))
+        assert index.streaks(1, as_of) == brute_force_streaks(completed, as_of)
+
+
+def test_current_streak_survives_an_unfinished_day():
+    index = StreakIndex()
+    index.load(1, [date(2025, 3, 1), date(2025, 3, 2), date(2025, 3, 3)])
+    
+    assert index.streaks(1, date(2025, 3, 4)) == {'current_streak': 3, 'longest_streak': 3}
+    assert index.streaks(1, date(2025, 3, 5))['current_streak'] == 0
+    assert index.streaks(1, date(2025, 3, 2))['current_streak'] == 2
+    
+    index.update(1, date(2025, 3, 2), False)
+    assert index.streaks(1, date(2025, 3, 4)) == {'current_streak': 1, 'longest_streak': 1}
+
+
+def test_unloaded_habits_are_ignored():
+    index = StreakIndex()
+    index.update(7, START, True)
+    
+    assert 7 not in index
@@ -0,0 +1,94 @@
+from datetime import date
+
+import pytest
+
+from storage import create_storage
+from write_queue import ToggleWriteQueue
+
+DAY = date(2025, 3, 4)
+
+
+class RecordingStorage:
+    """Stands in for a storage backend and records every batch it is given."""
+    
+    def __init__(self, succeed=True):
+        self.succeed = succeed
+        self.batches = []
+    
+    def log_habit_completions(self, entries):
+        self.batches.append(sorted(entries))
+        return self.succeed
+
+
+def test_toggles_of_the_same_cell_merge():
+    storage = RecordingStorage()
+    queue = ToggleWriteQueue(storage, max_pending=10)
+    
+    queue.enqueue(1, DAY, True)
+    queue.enqueue(1, DAY, False)
+    queue.enqueue(1, DAY, True)
+    queue.enqueue(2, DAY, True)
+    
+    assert len(queue) == 2
+    assert queue.get_pending(1, DAY) is True
+    assert queue.flush()
+    assert storage.batches == [[(1, DAY, True), (2, DAY, True)]]
+    assert len(queue) == 0
+
+
+def test_reaching_max_pending_flushes():
+    storage = RecordingStorage()
+    queue = ToggleWriteQueue(storage, max_pending=2)
+    
+    queue.enqueue(1, DAY, True)
+    queue.enqueue(1, DAY, False)
+    assert storage.batches == []
+    
+    queue.enqueue(2, DAY, True)
+    assert storage.batches == [[(1, DAY, False), (2, DAY, True)]]
+
+
+def test_failed_flush_keeps_newer_toggles():
+    storage = RecordingStorage(succeed=False)
+    queue = ToggleWriteQueue(storage, max_pending=10)
+    queue.enqueue(1, DAY, True)
+    
+    assert not queue.flush()
+    assert queue.get_pending(1, DAY) is True
+    
+    queue.enqueue(1, DAY, False)
+    storage.succeed = True
+    assert queue.flush()
+    assert storage.batches[-1] == [(1, DAY, False)]
+
+
+def test_discard_habit_drops_its_writes():
+    queue = ToggleWriteQueue(RecordingStorage(), max_pending=10)
+    queue.enqueue(1, DAY, True)
+    queue.enqueue(2, DAY, True)
+    
+    queue.discard_habit(1)
+    
+    assert queue.pending_items() == {(2, DAY): True}
+
+
+@pytest.fixture
+def storage():
+    backend = create_storage({'backend': 'sqlite', 'sqlite_path': ':memory:'})
+    assert backend.connect()
+    yield backend
+    backend.close_connection()
+
+
+def test_merged_toggles_reach_the_database(storage):
+    storage.add_habit("Read")
+    read = storage.get_habit_ids_by_name()["Read"]
+    queue = ToggleWriteQueue(storage, max_pending=10)
+    
+    for completed in (True, False, True):
+        queue.enqueue(read, DAY, completed)
+    queue.enqueue(read, date(2025, 3, 5), True)
+    queue.enqueue(read, date(2025, 3, 5), False)
+    
+    assert queue.flush()
+    assert storage.get_completed_dates(read) == [DAY]
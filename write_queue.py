@@ -0,0 +1,140 @@
+from datetime import date
+from typing import Dict, List, Optional, Tuple, Any
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Try to import configuration
+try:
+    from config import WRITE_BEHIND_CONFIG
+except ImportError:
+    # Default configuration: write-behind disabled
+    WRITE_BEHIND_CONFIG = {
+        'enabled': False,
+        'flush_interval': 2.0,
+        'max_pending': 50
+    }
+
+class ToggleWriteQueue:
+    """Write-behind buffer that coalesces completion toggles before writing them."""
+    
+    def __init__(self, db_manager: Any, flush_interval: float = 2.0, max_pending: int = 50):
+        """
+        Initialize the write-behind queue.
+        
+        Args:
+            db_manager: Database manager used to flush pending writes
+            flush_interval (float): Seconds a pending write may wait before it is due
+            max_pending (int): Number of pending cells that triggers an immediate flush
+        """
+        self.db_manager = db_manager
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[Tuple[int, date], bool] = {}
+        self._oldest: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._pending)
+    
+    def enqueue(self, habit_id: int, completion_date: date, completed: bool) -> None:
+        """
+        Record the latest completion state for a cell.
+        
+        Repeated toggles of the same (habit_id, completion_date) overwrite each
+        other, so only the final state is written. Reaching max_pending
+        flushes the queue straight away.
+        
+        Args:
+            habit_id (int): Habit ID
+            completion_date (date): Date of completion
+            completed (bool): Final completion state
+        """
+        with self._lock:
+            self._pending[(habit_id, completion_date)] = completed
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            full = len(self._pending) >= self.max_pending
+        
+        if full:
+            self.flush()
+    
+    def get_pending(self, habit_id: int, completion_date: date) -> Optional[bool]:
+        """Return the pending state of a cell, or None if nothing is queued for it."""
+        with self._lock:
+            return self._pending.get((habit_id, completion_date))
+    
+    def pending_items(self) -> Dict[Tuple[int, date], bool]:
+        """Return a snapshot of all pending writes."""
+        with self._lock:
+            return dict(self._pending)
+    
+    def discard_habit(self, habit_id: int) -> None:
+        """Drop pending writes for a habit, e.g. after it was deleted."""
+        with self._lock:
+            for key in [key for key in self._pending if key[0] == habit_id]:
+                del self._pending[key]
+            if not self._pending:
+                self._oldest = None
+    
+    def is_due(self) -> bool:
+        """Check whether the oldest pending write has waited flush_interval seconds."""
+        with self._lock:
+            return self._oldest is not None and time.monotonic() - self._oldest >= self.flush_interval
+    
+    def flush(self) -> bool:
+        """
+        Write all pending toggles as one multi-row upsert.
+        
+        On failure the entries are put back, without overwriting toggles
+        queued while the flush was running, so the next flush retries them.
+        
+        Returns:
+            bool: True if the queue was written (or empty), False otherwise
+        """
+        with self._lock:
+            if not self._pending:
+                return True
+            batch = self._pending
+            self._pending = {}
+            self._oldest = None
+        
+        entries: List[Tuple[int, date, bool]] = [
+            (habit_id, completion_date, completed)
+            for (habit_id, completion_date), completed in batch.items()
+        ]
+        if self.db_manager.log_habit_completions(entries):
+            logger.info(f"Flushed {len(entries)} pending habit completion(s)")
+            return True
+        
+        with self._lock:
+            for key, completed in batch.items():
+                self._pending.setdefault(key, completed)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+        return False
+    
+    def flush_if_due(self) -> bool:
+        """Flush only if the oldest pending write is due."""
+        if self.is_due():
+            return self.flush()
+        return True
+
+
+def create_write_queue(db_manager: Any) -> Optional[ToggleWriteQueue]:
+    """
+    Build a write-behind queue from WRITE_BEHIND_CONFIG.
+    
+    Args:
+        db_manager: Database manager used to flush pending writes
+    
+    Returns:
+        Optional[ToggleWriteQueue]: The queue, or None if write-behind is disabled
+    """
+    if not WRITE_BEHIND_CONFIG.get('enabled', False):
+        return None
+    return ToggleWriteQueue(db_manager,
+                            flush_interval=float(WRITE_BEHIND_CONFIG.get('flush_interval', 2.0)),
+                            max_pending=int(WRITE_BEHIND_CONFIG.get('max_pending', 50)))